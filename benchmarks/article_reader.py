@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# Article Reader Benchmark - "tell me more" with and without downloading articles in the background
+#
+# Usage: python benchmarks/article_reader.py [--latency 0.4] [--padding 300] [--think 2]
+#
+# Serves generated article pages from a local stub site: a head, navigation,
+# a teaser card (an <article> of its own), the story's <article> of ten
+# paragraphs with a related-story card nested in it, then --padding KB of
+# comments, related links and scripts, each page taking --latency seconds
+# to start.
+#
+# Extraction: times a full BeautifulSoup parse of a page against
+# extract_article() on the whole page and on the streamed part that is
+# actually read (up to the story's </article>). Every paragraph of the
+# story must be found, nested card or not.
+#
+# Reading: serves the news fixtures (benchmarks/fixtures/news/) with their
+# article URLs pointing at the stub site, reads the digest, waits --think
+# seconds (the headlines being spoken) and asks for three stories. Reports
+# the time from the request to the first paragraph, with the digest's
+# articles downloaded in the background and with each downloaded on demand.
+
+import io
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+from modules.article_reader import extract_article
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "news")
+STORIES_READ = (1, 2, 3)
+
+
+def make_page(number, padding_kb):
+    """An article page with its story near the top and padding_kb KB of everything else after it"""
+    paragraphs = [f"<p>Paragraph {i} of story {number}: the reporter explains what happened, who was "
+                  f"involved and what is expected to happen next in this developing story.</p>"
+                  for i in range(1, 11)]
+    # A related-story card inside the story, after its second paragraph
+    paragraphs.insert(2, '<article class="card"><h3>Related</h3><p>Earlier: the first report</p></article>')
+    comment = ('<div class="comment"><span class="author">reader</span><p>Interesting piece, thanks for '
+               'sharing it with everyone here today.</p><a href="/reply">Reply</a></div>')
+    padding = comment * (padding_kb * 1024 // len(comment))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Story {number}</title>'
+            f'<meta property="og:description" content="Summary of story {number}.">'
+            f'<script>var config = {{"ads": true}};</script></head><body>'
+            f'<nav><a href="/">Home</a><a href="/news">News</a><p>Subscribe to our newsletter</p></nav>'
+            f'<article class="card"><p>Also today: a short teaser</p></article>'
+            f'<article><h1>Story {number}</h1><p class="byline">By A. Reporter</p>{"".join(paragraphs)}</article>'
+            f'<section class="comments">{padding}</section><script src="/app.js"></script></body></html>').encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/article/"):
+            time.sleep(self.server.latency)
+            body = self.server.page(int(url.path.rsplit("/", 1)[1]))
+            content_type = "text/html; charset=utf-8"
+        else:
+            category = parse_qs(url.query).get("category", ["general"])[0]
+            body = json.dumps(self.server.responses[category]).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The reader stopped reading once it had the article
+            pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def median_time(function, repeats=20):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def benchmark_extraction(page):
+    """Time the parsers on a page; returns False if the story's paragraphs weren't all found"""
+    end = b"</article><section"
+    streamed = page[:page.index(end) + len(b"</article>")]
+    full_parse = median_time(lambda: [p.get_text() for p in BeautifulSoup(page, "html.parser").find_all("p")])
+    whole = median_time(lambda: extract_article(page))
+    partial = median_time(lambda: extract_article(streamed))
+    found = len(extract_article(page).paragraphs), len(extract_article(streamed).paragraphs)
+    print(f"page {len(page) / 1024:.0f} KB, article ends at {len(streamed) / 1024:.1f} KB")
+    print(f"BeautifulSoup, full:    {full_parse * 1e3:7.1f} ms")
+    print(f"extract, whole page:    {whole * 1e3:7.1f} ms ({found[0]} paragraphs)")
+    print(f"extract, streamed part: {partial * 1e3:7.1f} ms ({found[1]} paragraphs)")
+    return found == (10, 10)
+
+
+def load_fixtures(base):
+    """The news fixtures with every article's URL on the stub site"""
+    responses = {}
+    number = 0
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path) as f:
+            response = json.load(f)
+        for article in response["articles"]:
+            number += 1
+            article["url"] = f"{base}/article/{number}"
+        responses[os.path.splitext(os.path.basename(path))[0]] = response
+    return responses
+
+
+def read_stories(utility, prefetch, think):
+    """Read the digest, wait, ask for STORIES_READ; returns the seconds to each first paragraph and the paragraphs read"""
+    from modules.headless import HeadlessSpeech
+    output = io.StringIO()
+    assistant = utility.Utility(speech=HeadlessSpeech(io.StringIO(), output))
+    if not prefetch:
+        # Downloads start only when an article is asked for
+        assistant.articles.prefetch = lambda urls: None
+    assistant.get_news_digest()
+    if not prefetch:
+        del assistant.articles.prefetch
+        
+    time.sleep(think)
+    latencies = []
+    for number in STORIES_READ:
+        start = time.perf_counter()
+        assistant.read_headline(number)
+        latencies.append(time.perf_counter() - start)
+    assistant.close()
+    paragraphs = sum(json.loads(line).get("text", "").startswith("Paragraph") for line in output.getvalue().splitlines())
+    return latencies, paragraphs
+
+
+def benchmark_reading(page_for, latency, think):
+    """Time "tell me more" with and without background downloads; returns False if a story came up short"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    # The reader closes a page's connection once it has read the article
+    server.handle_error = lambda request, client_address: None
+    server.latency = latency
+    server.page = page_for
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    server.responses = load_fixtures(base)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Imported here: the utility module needs the speech engine's packages
+    from modules import utility
+    utility.NEWS_URL = f"{base}/news"
+    os.environ["NEWS_API_KEY"] = "stub"
+    
+    print(f"stub site {latency * 1e3:.0f} ms per page, stories asked for {think:.1f} s after the digest")
+    counts = set()
+    for prefetch in (False, True):
+        # A fresh working directory, so the response cache starts empty
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies, paragraphs = read_stories(utility, prefetch, think)
+            os.chdir(ROOT)
+        label = "background" if prefetch else "on demand"
+        print(f"{label:<12}" + "".join(f"  story {number}: {seconds * 1e3:6.1f} ms"
+                                       for number, seconds in zip(STORIES_READ, latencies))
+              + f"  ({paragraphs} paragraphs read)")
+        counts.add(paragraphs)
+    server.shutdown()
+    return counts == {len(STORIES_READ) * utility.ARTICLE_PARAGRAPHS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Article reader benchmark")
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--padding", type=int, default=300, help="KB of comments and scripts after the article")
+    parser.add_argument("--think", type=float, default=2.0)
+    args = parser.parse_args()
+    
+    pages = {}
+    
+    def page_for(number):
+        if number not in pages:
+            pages[number] = make_page(number, args.padding)
+        return pages[number]
+        
+    complete = benchmark_extraction(page_for(1))
+    print()
+    complete = benchmark_reading(page_for, args.latency, args.think) and complete
+    if not complete:
+        print("FAIL: story paragraphs missing")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Calculator Cache Benchmark - repeated voice-session calculations with and without the result cache
+#
+# Usage: python benchmarks/calculator_cache.py [--rounds 500] [--cache-size 256]
+#
+# Replays a session of spoken calculations, many of them repeats or
+# rephrasings of each other, through Calculator.process_calculation. "cold"
+# clears the parse and result caches before every command; "warm" keeps
+# them. Prints per-command times and the cache's hit/miss/eviction counters.
+
+import io
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import math_grammar
+from modules.headless import HeadlessSpeech
+from modules.calculations import Calculator
+
+SESSION = [
+    "what is sine of 30 degrees",
+    "sin 30 degrees",
+    "what is 245 plus 567",
+    "what is the binary of 142",
+    "factorial of 25",
+    "what is 25 factorial",
+    "log of 1000",
+    "square root of 144",
+    "what is twenty five times four",
+    "what is 25 times 4",
+    "cosine of 60 in degrees",
+    "log 8 base 2",
+    "what is the binary of 142",
+    "factorial of 300",
+]
+
+
+def run(calculator, rounds, cold):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for command in SESSION:
+            if cold:
+                calculator.memo.clear()
+                math_grammar.parse.cache_clear()
+            calculator.process_calculation(command)
+    return (time.perf_counter() - start) / (rounds * len(SESSION))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculator result cache benchmark")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--cache-size", type=int, default=256)
+    args = parser.parse_args()
+    
+    os.environ["MATH_CACHE_SIZE"] = str(args.cache_size)
+    calculator = Calculator(speech=HeadlessSpeech(io.StringIO(), io.StringIO()))
+    
+    cold = run(calculator, args.rounds, cold=True)
+    calculator.memo.clear()
+    math_grammar.parse.cache_clear()
+    warm = run(calculator, args.rounds, cold=False)
+    
+    print(f"{'cold:':<8}{cold * 1e6:8.2f} us/command")
+    print(f"{'warm:':<8}{warm * 1e6:8.2f} us/command")
+    print(f"results: {calculator.cache_info()}")
+    print(f"parse:   {math_grammar.parse.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
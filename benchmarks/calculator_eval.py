@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Calculator Eval Benchmark - the spoken math grammar vs the old eval() path
+#
+# Usage: python benchmarks/calculator_eval.py [--rounds 20000] [--timeout 5]
+#
+# Typical expressions are timed in-process with both: eval() on the old
+# word-to-symbol rewriting, math_grammar.parse + evaluate on the spoken text.
+# Pathological ones are run through eval() in a child interpreter with a
+# timeout (they can hang it for minutes or exhaust memory) and through the
+# grammar in-process, which must reject them immediately.
+
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import math_grammar
+from modules.safe_eval import EvaluationError, LimitExceeded
+
+TYPICAL = [
+    "12 plus 30",
+    "7 times 6 minus 4",
+    "100 divided by 8",
+    "2 to the power of 10",
+    "(3 + 4) * 5 / 2",
+    "1.5 times 4 plus 0.25",
+    "245 plus 567 minus 12 times 3",
+    "81 over 9",
+]
+
+PATHOLOGICAL = [
+    "9 power 9 power 9",
+    "10 ** 10 ** 10",
+    "2 ** 100000000",
+    "99999999 ** 99999999",
+]
+
+
+def normalize(expression):
+    """The old word-to-symbol rewriting in front of eval()"""
+    expression = expression.lower().replace('plus', '+').replace('minus', '-')
+    expression = expression.replace('times', '*').replace('multiplied by', '*')
+    expression = expression.replace('divided by', '/').replace('over', '/')
+    expression = expression.replace('to the power of', '**').replace('power', '**')
+    expression = re.sub(r'[^0-9+\-*/%().\s]', '', expression)
+    return expression.replace(' ', '')
+
+
+def legacy_eval(expression):
+    """The old Calculator.evaluate_expression body"""
+    try:
+        return eval(expression)
+    except:
+        return None
+
+
+def grammar(command, parse=math_grammar.parse):
+    try:
+        return math_grammar.evaluate(parse(command))
+    except EvaluationError:
+        return None
+
+
+def grammar_uncached(command):
+    """The same, parsing the command again every time"""
+    return grammar(command, math_grammar.parse.__wrapped__)
+
+
+def time_per_call(function, expressions, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for expression in expressions:
+            function(expression)
+    return (time.perf_counter() - start) / (rounds * len(expressions))
+
+
+def legacy_in_child(expression, timeout):
+    """Run eval() on expression in a fresh interpreter; return seconds or None on timeout"""
+    code = f"eval({expression!r})"
+    start = time.perf_counter()
+    try:
+        subprocess.run([sys.executable, "-c", code], timeout=timeout, capture_output=True)
+    except subprocess.TimeoutExpired:
+        return None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculator evaluator benchmark")
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+    
+    typical = [normalize(command) for command in TYPICAL]
+    
+    # Both must agree on everyday input
+    mismatches = [command for command in TYPICAL if legacy_eval(normalize(command)) != grammar(command)]
+    for command in mismatches:
+        print(f"MISMATCH {command!r}: eval={legacy_eval(normalize(command))} grammar={grammar(command)}")
+        
+    print("typical expressions:")
+    print(f"  eval():             {time_per_call(legacy_eval, typical, args.rounds) * 1e6:8.2f} us/expression")
+    print(f"  grammar, uncached:  {time_per_call(grammar_uncached, TYPICAL, args.rounds) * 1e6:8.2f} us/expression")
+    print(f"  grammar, cached:    {time_per_call(grammar, TYPICAL, args.rounds) * 1e6:8.2f} us/expression")
+    
+    # Every pathological command must be refused, not evaluated
+    accepted = 0
+    print(f"pathological expressions (eval() timeout {args.timeout:.0f} s):")
+    for command in PATHOLOGICAL:
+        start = time.perf_counter()
+        try:
+            math_grammar.evaluate(math_grammar.parse.__wrapped__(command))
+            outcome = "EVALUATED"
+            accepted += 1
+        except LimitExceeded as e:
+            outcome = f"rejected ({e})"
+        grammar_time = time.perf_counter() - start
+        
+        expression = normalize(command)
+        legacy_time = legacy_in_child(expression, args.timeout)
+        legacy = "timed out" if legacy_time is None else f"{legacy_time:.2f} s"
+        print(f"  {expression:<22} eval(): {legacy:>10}   grammar: {grammar_time * 1e6:7.1f} us, {outcome}")
+        
+    if mismatches or accepted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# Dispatch Latency Benchmark - compiled intent router vs the old if/elif chain
+#
+# Usage: python benchmarks/dispatch_latency.py [--rounds 2000]
+#
+# Routes a corpus of real commands with the IntentRouter tables from main.py
+# and smart_reply.py, and with a copy of the substring chains they replaced.
+# Both must agree on the intent (and extracted argument) for every command,
+# except the arguments of WHOLE_COMMAND_INTENTS, whose handlers now read the
+# full command themselves. EXPECTED commands are for intents the old chain
+# never had; the router must send each to the intent listed with it.
+
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.intent_router import IntentRouter
+
+CORPUS = [
+    "search for artificial intelligence news",
+    "play taylor swift music on youtube",
+    "show me images of national parks",
+    "what is the weather today",
+    "give me some news",
+    "who is albert einstein",
+    "take a selfie",
+    "take a screenshot",
+    "increase the volume",
+    "volume up",
+    "give my system information",
+    "what's my battery life",
+    "create a python file",
+    "create an html project",
+    "create html project",
+    "set a timer for 5 minutes",
+    "add buy groceries to my list",
+    "show my list",
+    "what is 245 plus 567",
+    "what is the binary of 142",
+    "what is the value of factorial 10",
+    "what is the value of sine 90",
+    "send an email",
+    "send a whatsapp message",
+    "let's play a game",
+    "tell me a joke",
+    "toss a coin",
+    "roll a dice",
+    "what time is it",
+    "what day is it",
+    "hello there",
+    "goodbye",
+    "thank you so much",
+    "sorry about that",
+    "what can you do",
+    "good job",
+    "when is your birthday",
+    "who made you",
+    "where do you live",
+    "how old are you",
+    "what's your favorite color",
+    "open my notes",
+    "mute",
+    "full volume",
+    "look up the nearest pharmacy",
+    "wikipedia quantum computing",
+    "new text file please",
+    "timer 90 seconds",
+    "set a pasta timer for 10 minutes",
+    "set a timer for half an hour",
+]
+
+# Intents whose handlers are given the whole command instead of the old
+# chain's argument: set_timer reads the timer's name ("a pasta timer") as well
+# as its duration, and stripping "timer for" would cut the name out
+WHOLE_COMMAND_INTENTS = {"timer"}
+
+# (command, intent) for intents added since, which are easily shadowed by
+# greeting ("hi") or calculate ("cos", "log") triggers inside other words,
+# or shadow other intents themselves (None: a smart reply)
+EXPECTED = [
+    ("mark the history essay as done", "todo_complete"),
+    ("mark item 3 as done", "todo_complete"),
+    ("cross off the blog post", "todo_complete"),
+    ("tick off the shipping label", "todo_complete"),
+    ("remove the shirts from my list", "todo_remove"),
+    ("delete item 2", "todo_remove"),
+    ("is the chiropractor on my list", "todo_find"),
+    ("which bills are on my list", "todo_find"),
+    ("cancel the pasta timer", "timer_cancel"),
+    ("cancel all my timers", "timer_cancel"),
+    ("cancel my reminder to call mom", "timer_cancel"),
+    ("cancel the alarm", "timer_cancel"),
+    ("search for cancel culture", "search"),
+    ("cancel my email", None),
+]
+
+
+def legacy_main_route(command):
+    """The substring chain from PersonalAssistant.process_command, returning (intent, argument, choice)"""
+    if "bye" in command or "goodbye" in command or "exit" in command or "quit" in command:
+        return "exit", None, None
+    elif any(greeting in command for greeting in ["hello", "hi", "hey"]):
+        return "greeting", None, None
+    elif "what time" in command or "current time" in command:
+        return "time", None, None
+    elif "what date" in command or "what day" in command or "current date" in command:
+        return "date", None, None
+    elif any(term in command for term in ["calculate", "what is", "solve", "computation", "binary of", "factorial", "sin", "cos", "log"]):
+        return "calculate", None, None
+    elif any(term in command for term in ["search for", "search", "look up", "find", "google"]):
+        return "search", command.replace("search for", "").replace("search", "").replace("look up", "").replace("find", "").replace("google", "").strip(), None
+    elif "wikipedia" in command or "who is" in command:
+        return "wikipedia", command.replace("wikipedia", "").replace("who is", "").strip(), None
+    elif "play" in command and "youtube" in command:
+        return "youtube", command.replace("play", "").replace("on youtube", "").replace("youtube", "").strip(), None
+    elif "send an email" in command or "send email" in command:
+        return "email", None, None
+    elif "send a whatsapp message" in command or "send whatsapp" in command:
+        return "whatsapp", None, None
+    elif any(term in command for term in ["create a file", "create file", "new file"]):
+        if "python" in command:
+            choice = "python"
+        elif "java" in command:
+            choice = "java"
+        elif "html" in command:
+            choice = "html"
+        elif "text" in command or "txt" in command:
+            choice = "text"
+        else:
+            choice = None
+        return "create_file", None, choice
+    elif "create a html project" in command or "create html project" in command:
+        return "html_project", None, None
+    elif "system information" in command or "system info" in command:
+        return "system_info", None, None
+    elif "battery" in command:
+        return "battery", None, None
+    elif "take a selfie" in command or "click a photo" in command or "take photo" in command:
+        return "photo", None, None
+    elif "take a screenshot" in command or "screenshot" in command:
+        return "screenshot", None, None
+    elif "increase volume" in command or "volume up" in command:
+        return "volume_up", None, None
+    elif "decrease volume" in command or "volume down" in command:
+        return "volume_down", None, None
+    elif "mute volume" in command or "mute" in command:
+        return "mute", None, None
+    elif "full volume" in command or "maximum volume" in command:
+        return "volume_max", None, None
+    elif "let's play a game" in command or "play game" in command or "game" in command:
+        return "game", None, None
+    elif "set a timer" in command or "timer" in command:
+        return "timer", command.replace("set a timer for", "").replace("timer for", "").replace("set timer for", "").strip(), None
+    elif "weather" in command:
+        return "weather", None, None
+    elif "news" in command:
+        return "news", None, None
+    elif "joke" in command or "tell me a joke" in command:
+        return "joke", None, None
+    elif "add to my list" in command or "add to list" in command:
+        return "todo_add", command.replace("add to my list", "").replace("add to list", "").strip(), None
+    elif "show my list" in command or "show list" in command:
+        return "todo_show", None, None
+    return legacy_reply_route(command), None, None
+
+
+def legacy_reply_route(query):
+    """The substring chain from SmartReply.generate_response, returning the reply intent"""
+    if any(greeting in query for greeting in ["hello", "hi", "hey", "greetings"]):
+        return "greeting"
+    elif any(farewell in query for farewell in ["bye", "goodbye", "see you", "farewell"]):
+        return "farewell"
+    elif any(thanks in query for thanks in ["thank you", "thanks", "appreciate it"]):
+        return "thanks"
+    elif any(apology in query for apology in ["sorry", "apologize", "my fault"]):
+        return "apology"
+    elif any(identity in query for identity in ["who are you", "what are you", "your name"]):
+        return "identity"
+    elif any(capability in query for capability in ["what can you do", "your abilities", "help me with", "capable of"]):
+        return "capability"
+    elif any(compliment in query for compliment in ["good job", "well done", "you're great", "you're amazing", "smart", "clever"]):
+        return "compliment"
+    elif "birthday" in query or "born" in query:
+        return "birthday"
+    elif "your name" in query:
+        return "name"
+    elif "creator" in query or "who made you" in query:
+        return "creator"
+    elif "favorite" in query or "like best" in query:
+        return "favorite"
+    elif "where do you live" in query or "where are you" in query:
+        return "live"
+    elif "how old" in query or "your age" in query:
+        return "age"
+    elif "current time" in query or "time now" in query or "what time" in query:
+        return "time"
+    elif "today's date" in query or "what day" in query or "what date" in query:
+        return "date"
+    return None
+
+
+def build_routers():
+    """Return the command and reply routers without importing main's dependencies"""
+    import ast
+
+    def load_intents(path, name):
+        # Evaluate just the intent table so the benchmark doesn't need pyttsx3 or dotenv
+        from modules.intent_router import Intent
+        with open(os.path.join(ROOT, path)) as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and node.targets[0].id == name:
+                return eval(compile(ast.Expression(node.value), path, "eval"), {"Intent": Intent})
+        raise LookupError(name)
+
+    command_router = IntentRouter(load_intents("main.py", "COMMAND_INTENTS"))
+    reply_router = IntentRouter(load_intents(os.path.join("modules", "smart_reply.py"), "REPLY_INTENTS"))
+    return command_router, reply_router
+
+
+def compiled_route(command_router, reply_router, command):
+    match = command_router.route(command)
+    if match.intent is None:
+        return reply_router.route(command).intent, None, None
+    return match.intent, match.argument, match.choice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch latency microbenchmark")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    build_start = time.perf_counter()
+    command_router, reply_router = build_routers()
+    build_time = time.perf_counter() - build_start
+
+    # Both paths must agree before we compare their speed
+    mismatches = 0
+    for command in CORPUS:
+        legacy = legacy_main_route(command)
+        compiled = compiled_route(command_router, reply_router, command)
+        if legacy[0] in WHOLE_COMMAND_INTENTS:
+            legacy = (legacy[0], None, legacy[2])
+        if legacy != compiled:
+            mismatches += 1
+            print(f"MISMATCH {command!r}: legacy={legacy} compiled={compiled}")
+    for command, intent in EXPECTED:
+        routed = compiled_route(command_router, reply_router, command)[0]
+        if routed != intent:
+            mismatches += 1
+            print(f"MISROUTED {command!r}: {routed} instead of {intent}")
+
+    timings = {}
+    for label, route in (("legacy chain", legacy_main_route),
+                         ("compiled router", lambda c: compiled_route(command_router, reply_router, c))):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for command in CORPUS:
+                route(command)
+        timings[label] = (time.perf_counter() - start) / (args.rounds * len(CORPUS))
+
+    print(f"router build:    {build_time * 1000:8.2f} ms ({len(command_router.matcher.phrases)} + {len(reply_router.matcher.phrases)} phrases)")
+    for label, per_command in timings.items():
+        print(f"{label + ':':<17}{per_command * 1e6:8.2f} us/command")
+    print(f"corpus: {len(CORPUS)} + {len(EXPECTED)} commands, {mismatches} mismatch(es)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
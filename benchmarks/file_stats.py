@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# File Stats Benchmark - chunked streaming statistics vs loading the whole file
+#
+# Usage: python benchmarks/file_stats.py [--rows 1000000] [--chunk-bytes 4194304]
+#
+# Writes a CSV of random prices to a temporary directory and computes the
+# mean and standard deviation of one column with file_stats.scan_file and
+# with the whole column loaded by the csv module. Both must agree; the
+# streaming pass should need a small, constant amount of memory.
+
+import os
+import sys
+import csv
+import math
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import file_stats
+
+
+def write_csv(path, rows):
+    rng = random.Random(1)
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "item", "price", "quantity"])
+        for i in range(rows):
+            writer.writerow([i, f"item{i % 97}", f"{rng.gauss(100, 15):.2f}", rng.randint(1, 9)])
+
+
+def load_all(path):
+    """The whole-file approach: every value of the column in one list"""
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        next(reader)
+        values = [float(row[2]) for row in reader]
+    return statistics.fmean(values), statistics.stdev(values)
+
+
+def measure(function, *args):
+    """Time one call, then measure its peak memory in a second (slower, traced) call"""
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming file statistics benchmark")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-bytes", type=int, default=file_stats.CHUNK_BYTES)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sales.csv")
+        write_csv(path, args.rows)
+        size = os.path.getsize(path)
+        
+        (stats, rows, _), streamed, streamed_peak = measure(file_stats.scan_file, path, "price", args.chunk_bytes)
+        (mean, std), loaded, loaded_peak = measure(load_all, path)
+        
+    print(f"file: {rows:,} rows, {size / 1e6:.1f} MB, chunks of {args.chunk_bytes / 1e6:.1f} MB")
+    print(f"{'streaming:':<12}{streamed:7.2f} s  {rows / streamed:>12,.0f} rows/s  peak {streamed_peak / 1e6:7.1f} MB")
+    print(f"{'load all:':<12}{loaded:7.2f} s  {rows / loaded:>12,.0f} rows/s  peak {loaded_peak / 1e6:7.1f} MB")
+    print(f"mean {stats.mean:.6f} vs {mean:.6f}, standard deviation {stats.std:.6f} vs {std:.6f}")
+    if not (math.isclose(stats.mean, mean, rel_tol=1e-9) and math.isclose(stats.std, std, rel_tol=1e-9)):
+        print("MISMATCH")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# HTTP Client Benchmark - pooled HttpClient against a local stub server
+#
+# Usage: python benchmarks/http_client.py [--requests 200]
+#
+# Starts a stub HTTP server on localhost and checks the client's behaviour
+# end to end: connection reuse and latency against bare requests.get, a
+# slow endpoint cut off by the read timeout and deadline, a flaky endpoint
+# recovered by retries (streamed 503s handing their connection back), 404s
+# and redirect loops not retried, and the circuit breaker failing fast while
+# a service is down, closing again once it recovers, and not left stuck
+# half-open by a trial request that fails with a redirect loop. Exits with
+# status 1 if any check fails.
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+from modules.http_client import HttpClient, ServiceConfig, ServiceUnavailable
+
+SLOW_SECONDS = 2.0
+
+# Short timeouts so the run takes seconds
+SERVICES = {
+    "stub": ServiceConfig(0.5, 0.3, retries=2, backoff=0.05, deadline=1.0, failure_threshold=3, reset_timeout=0.5),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes: without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+    
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("?")[0]
+        with server.lock:
+            server.hits[path] = server.hits.get(path, 0) + 1
+            hits = server.hits[path]
+            
+        if path == "/slow":
+            time.sleep(SLOW_SECONDS)
+        if path == "/missing":
+            return self.reply(404, {"error": "not found"})
+        if path == "/loop":
+            self.send_response(302)
+            self.send_header("Location", "/loop")
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        if path == "/flaky" and hits % 3:
+            return self.reply(503, {"error": "try again"})
+        if path == "/toggle" and server.down:
+            return self.reply(503, {"error": "down"})
+        self.reply(200, {"ok": True, "path": path})
+    
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (the slow endpoint outlives the timeout)
+            pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    # The client drops the slow endpoint's connection once it times out
+    server.handle_error = lambda request, client_address: None
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.hits = {}
+    server.down = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def closed_port():
+    """A localhost port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def timed(function):
+    start = time.perf_counter()
+    try:
+        result = function()
+    except ServiceUnavailable as e:
+        result = e
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP client benchmark against a local stub server")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    
+    server = start_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    client = HttpClient(services=SERVICES)
+    checks = []
+    
+    def check(label, passed, detail):
+        checks.append(passed)
+        print(f"{'ok  ' if passed else 'FAIL'} {label:<34}{detail}")
+    
+    # Keep-alive: one pooled connection vs a new one per bare requests.get
+    client.get("stub", f"{base}/ok")
+    server.connections = 0
+    _, pooled = timed(lambda: [client.get("stub", f"{base}/ok") for _ in range(args.requests)])
+    pooled_connections = server.connections
+    server.connections = 0
+    _, bare = timed(lambda: [requests.get(f"{base}/ok") for _ in range(args.requests)])
+    bare_connections = server.connections
+    check("pooled session", pooled_connections <= 1,
+          f"{pooled / args.requests * 1e3:.2f} ms/request over {pooled_connections} connection(s); "
+          f"bare requests.get {bare / args.requests * 1e3:.2f} ms/request over {bare_connections}")
+    
+    # A slow endpoint is cut off by the read timeout and the deadline
+    result, elapsed = timed(lambda: client.get("stub", f"{base}/slow"))
+    check("slow endpoint times out", isinstance(result, ServiceUnavailable) and elapsed < SERVICES["stub"].deadline + 0.2,
+          f"gave up after {elapsed:.2f} s (server takes {SLOW_SECONDS:.1f} s; bare requests.get waits it out)")
+    client.breaker("stub").record_success()
+    
+    # Two 503s, then a 200
+    before = client.stats()["stub"]["retries"]
+    result, elapsed = timed(lambda: client.get("stub", f"{base}/flaky"))
+    retries = client.stats()["stub"]["retries"] - before
+    check("flaky endpoint retried", getattr(result, "status_code", None) == 200 and retries == 2,
+          f"200 after {retries} retries in {elapsed * 1e3:.0f} ms")
+    
+    # The same, streamed: each 503 is closed so its connection is reused
+    server.connections = 0
+    result, _ = timed(lambda: client.get("stub", f"{base}/flaky", stream=True))
+    connections = server.connections
+    if hasattr(result, "close"):
+        result.close()
+    check("streamed 503s release connections", getattr(result, "status_code", None) == 200 and connections <= 1,
+          f"3 attempts over {connections} new connection(s)")
+    
+    # Client errors are returned as they are
+    before = client.stats()["stub"]["attempts"]
+    result, _ = timed(lambda: client.get("stub", f"{base}/missing"))
+    attempts = client.stats()["stub"]["attempts"] - before
+    check("404 not retried", getattr(result, "status_code", None) == 404 and attempts == 1, f"{attempts} attempt")
+    
+    # Other request errors fail at once, as ServiceUnavailable
+    before = client.stats()["stub"]["attempts"]
+    result, _ = timed(lambda: client.get("stub", f"{base}/loop"))
+    attempts = client.stats()["stub"]["attempts"] - before
+    check("redirect loop not retried", isinstance(result, ServiceUnavailable) and attempts == 1,
+          f"{attempts} attempt: {type(result.__cause__).__name__ if result.__cause__ else result}")
+    client.breaker("stub").record_success()
+    
+    # Nothing listening: fails fast once the breaker opens
+    down = f"http://127.0.0.1:{closed_port()}/ok"
+    failures = [timed(lambda: client.get("stub", down))[1] for _ in range(SERVICES["stub"].failure_threshold)]
+    results = [timed(lambda: client.get("stub", down)) for _ in range(100)]
+    short_circuited = all(isinstance(result, ServiceUnavailable) for result, _ in results)
+    check("circuit opens", client.breaker("stub").state == "open" and short_circuited,
+          f"{SERVICES['stub'].failure_threshold} failures took {sum(failures) / len(failures) * 1e3:.0f} ms each, "
+          f"then {sum(elapsed for _, elapsed in results) / len(results) * 1e6:.0f} us each while open")
+    
+    # Recovery: after reset_timeout one trial request closes the circuit again
+    client.breaker("stub").record_success()
+    server.down = True
+    for _ in range(SERVICES["stub"].failure_threshold):
+        timed(lambda: client.get("stub", f"{base}/toggle"))
+    opened = client.breaker("stub").state
+    server.down = False
+    time.sleep(SERVICES["stub"].reset_timeout)
+    result, _ = timed(lambda: client.get("stub", f"{base}/toggle"))
+    check("circuit closes after recovery",
+          opened == "open" and getattr(result, "status_code", None) == 200 and client.breaker("stub").state == "closed",
+          f"{opened} -> trial request {getattr(result, 'status_code', result)} -> {client.breaker('stub').state}")
+    
+    # A trial request failing with a redirect loop reopens the circuit instead of keeping the trial forever
+    server.down = True
+    for _ in range(SERVICES["stub"].failure_threshold):
+        timed(lambda: client.get("stub", f"{base}/toggle"))
+    server.down = False
+    time.sleep(SERVICES["stub"].reset_timeout)
+    timed(lambda: client.get("stub", f"{base}/loop"))
+    after_trial = client.breaker("stub").state
+    time.sleep(SERVICES["stub"].reset_timeout)
+    result, _ = timed(lambda: client.get("stub", f"{base}/toggle"))
+    check("failed trial reopens circuit",
+          after_trial == "open" and getattr(result, "status_code", None) == 200 and client.breaker("stub").state == "closed",
+          f"trial redirect loop -> {after_trial} -> trial request {getattr(result, 'status_code', result)} -> "
+          f"{client.breaker('stub').state}")
+          
+    print(f"stats: {client.stats()['stub']}")
+    client.close()
+    server.shutdown()
+    sys.exit(0 if all(checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
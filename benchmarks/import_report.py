@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Import Report - per-module import time, to track cold-start regressions
+#
+# Usage: python benchmarks/import_report.py [--runs 3] [--json report.json]
+#                                           [--baseline old.json] [--threshold 20]
+#
+# Each module is imported in a fresh interpreter (after the interpreter's own
+# startup), so the numbers include every third-party package it pulls in.
+# Pass --baseline with an earlier --json report to flag modules that got
+# slower by more than --threshold percent.
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "main",
+    "modules",
+    "modules.speech_engine",
+    "modules.security",
+    "modules.browser",
+    "modules.os_functions",
+    "modules.utility",
+    "modules.email_sender",
+    "modules.whatsapp_sender",
+    "modules.calculations",
+    "modules.file_operations",
+    "modules.web_automation",
+    "modules.games",
+    "modules.smart_reply",
+]
+
+# Runs inside the child interpreter; prints the import time in milliseconds
+CHILD_CODE = """
+import sys, time, importlib
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def time_import(module, runs):
+    """Return the best import time in ms over several fresh interpreters, or an error"""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD_CODE, module],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            return None, error[-1] if error else "import failed"
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import times")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="percent slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = {}
+    regressions = []
+    print(f"{'module':<28}{'ms':>10}{'baseline':>12}")
+    for module in MODULES:
+        elapsed, error = time_import(module, args.runs)
+        if error:
+            report[module] = None
+            print(f"{module:<28}{'error':>10}  {error}")
+            continue
+
+        report[module] = round(elapsed, 3)
+        previous = baseline.get(module)
+        note = ""
+        if previous:
+            change = (elapsed - previous) / previous * 100
+            note = f"{previous:>10.1f}  {change:+.0f}%"
+            if change > args.threshold:
+                regressions.append(module)
+                note += "  REGRESSION"
+        print(f"{module:<28}{elapsed:>10.1f}  {note}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if regressions:
+        print(f"\n{len(regressions)} module(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
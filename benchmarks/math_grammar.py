@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# Math Grammar Benchmark - single-pass tokenizer and grammar vs the old branch chain
+#
+# Usage: python benchmarks/math_grammar.py [--rounds 2000]
+#
+# Runs a corpus of spoken calculations through a copy of the regex branch
+# chain Calculator.process_calculation used to have and through
+# math_grammar.parse + evaluate. Both must give the same result for CORPUS;
+# GRAMMAR_ONLY lists commands the old chain got wrong or couldn't answer.
+# REFUSED_TABLES are ranges too large to tabulate, which must be refused
+# with LimitExceeded instead of crashing the calculator.
+
+import os
+import re
+import sys
+import math
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import math_grammar
+from modules.safe_eval import EvaluationError, LimitExceeded
+
+CORPUS = [
+    "what is 245 plus 567",
+    "what is 1,000 plus 250",
+    "calculate 1,234,567 times 3",
+    "calculate 7 times 6",
+    "what is 100 divided by 8",
+    "what is 12 plus 30 minus 4",
+    "what is 2 to the power of 10 plus 1",
+    "what is the binary of 142",
+    "binary 255",
+    "what is the value of factorial 10",
+    "factorial of 12",
+    "sin 30 degrees",
+    "what is cos 60 degrees",
+    "tan 45 degrees",
+    "log of 1000",
+    "log 8 base 2",
+    "square root of 144",
+    "right shift 256 by 3",
+    "left shift 5 by 4",
+]
+
+# The old chain has no answer for these, or a wrong one
+GRAMMAR_ONLY = [
+    "what is the value of sine 90",
+    "what is twenty five times four",
+    "one hundred and five minus five",
+    "square root of factorial of 5",
+    "sine of 30 plus cosine of 60 in degrees",
+    "three point five times two",
+    "5 factorial",
+]
+
+REFUSED_TABLES = [
+    "binary of 100000000000000000000 to 100000000000000000005",
+    "binary of 0 to 2 to the power of 2000",
+    "sine of 2 to the power of 2000 to 2 to the power of 2000 in steps of 0.5",
+    "sine of 1 to 100000",
+]
+
+
+def legacy_calculation(command):
+    """The old regex branch chain, returning the value it would have spoken (or None)"""
+    command = command.lower()
+    if any(op in command for op in ['plus', 'minus', 'times', 'divided by', 'multiplied by', 'power']):
+        expression = command.replace("calculate", "").replace("what is", "").strip()
+        expression = expression.replace('plus', '+').replace('minus', '-')
+        expression = expression.replace('times', '*').replace('multiplied by', '*')
+        expression = expression.replace('divided by', '/').replace('over', '/')
+        expression = expression.replace('to the power of', '**').replace('power', '**')
+        expression = re.sub(r'[^0-9+\-*/%().\s]', '', expression).replace(' ', '')
+        # eval() as the chain had it: CORPUS holds no oversized powers
+        try:
+            return eval(expression)
+        except (SyntaxError, ArithmeticError):
+            return None
+    elif "factorial" in command:
+        match = re.search(r'factorial\s+(\d+)', command) or re.search(r'factorial\s+of\s+(\d+)', command)
+        return math.factorial(int(match.group(1))) if match else None
+    elif "binary" in command:
+        match = re.search(r'binary\s+of\s+(\d+)', command) or re.search(r'binary\s+(\d+)', command)
+        return bin(int(match.group(1)))[2:] if match else None
+    elif any(func in command for func in ["sin", "cos", "tan"]):
+        for name, function in (("sin", math.sin), ("cos", math.cos), ("tan", math.tan)):
+            if name in command:
+                match = re.search(name + r'\s+(\d+)', command)
+                if not match:
+                    return None
+                angle = int(match.group(1))
+                return function(math.radians(angle) if "degree" in command else angle)
+    elif "log" in command:
+        match = re.search(r'log\s+of\s+(\d+)', command) or re.search(r'log\s+(\d+)', command)
+        if not match:
+            return None
+        n = float(match.group(1))
+        if "base" in command:
+            base_match = re.search(r'base\s+(\d+)', command)
+            return math.log(n, float(base_match.group(1))) if base_match else None
+        return math.log10(n)
+    elif "square root" in command:
+        match = re.search(r'square\s+root\s+of\s+(\d+)', command) or re.search(r'square\s+root\s+(\d+)', command)
+        return math.sqrt(float(match.group(1))) if match else None
+    elif "shift" in command:
+        direction = "right" if "right shift" in command else "left" if "left shift" in command else None
+        match = direction and re.search(direction + r'\s+shift\s+(\d+)', command)
+        if not match:
+            return None
+        pos_match = re.search(r'by\s+(\d+)', command)
+        positions = int(pos_match.group(1)) if pos_match else 1
+        n = int(match.group(1))
+        return n >> positions if direction == "right" else n << positions
+    return None
+
+
+# The uncached parser, so repeated commands are really parsed again
+parse = math_grammar.parse.__wrapped__
+
+
+def grammar_calculation(command):
+    try:
+        return math_grammar.evaluate(parse(command))
+    except EvaluationError:
+        return None
+
+
+def same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-9)
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spoken math parsing microbenchmark")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    
+    mismatches = 0
+    for command in CORPUS:
+        legacy = legacy_calculation(command)
+        grammar = grammar_calculation(command)
+        if not same(legacy, grammar):
+            mismatches += 1
+            print(f"MISMATCH {command!r}: legacy={legacy} grammar={grammar}")
+            
+    timings = {}
+    for label, calculate in (("branch chain", legacy_calculation),
+                             ("grammar", grammar_calculation),
+                             ("grammar, parse", parse)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for command in CORPUS:
+                calculate(command)
+        timings[label] = (time.perf_counter() - start) / (args.rounds * len(CORPUS))
+        
+    for label, per_command in timings.items():
+        print(f"{label + ':':<16}{per_command * 1e6:8.2f} us/command")
+    print(f"corpus: {len(CORPUS)} commands, {mismatches} mismatch(es)")
+    for command in GRAMMAR_ONLY:
+        print(f"  {command!r}: chain {legacy_calculation(command)}, grammar {grammar_calculation(command)}")
+    
+    # Imported here: tables need NumPy
+    from modules import math_tables
+    failures = 0
+    for command in REFUSED_TABLES:
+        try:
+            math_tables.evaluate_range(parse(command))
+            outcome = "NOT REFUSED"
+        except LimitExceeded as e:
+            outcome = f"refused ({e})"
+        except Exception as e:
+            outcome = f"CRASHED ({type(e).__name__}: {e})"
+        failures += not outcome.startswith("refused")
+        print(f"  table {command!r}: {outcome}")
+    if mismatches or failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# News Digest Benchmark - concurrent category fetches and MinHash/LSH headline clustering
+#
+# Usage: python benchmarks/news_digest.py [--latency 0.3] [--copies 1 4 16] [--show]
+#
+# Reads NewsAPI top-headlines responses for the seven categories from
+# benchmarks/fixtures/news/ (fictional headlines, several stories carried by
+# more than one source and category).
+#
+# Clustering: groups the fixture headlines with the HeadlineClusterer and
+# with an exact all-pairs comparison, then repeats with --copies times as
+# many headlines (each copy renames most words, so copies are different
+# stories that still share some words). Reports the time taken, the number of
+# stories, and how many of the exact similar pairs the LSH clustering also
+# puts in one story.
+#
+# Fetching: serves the fixtures from a local stub API taking --latency
+# seconds per request and times a digest (Utility.get_news_digest, every
+# category at once) against fetching the seven categories one by one.
+
+import io
+import os
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.news_digest import HeadlineClusterer, SIMILARITY, headline_tokens, jaccard
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "news")
+
+
+def load_fixtures():
+    responses = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path) as f:
+            responses[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+    return responses
+
+
+def scale(titles, copies, rng):
+    """The titles plus copies - 1 renamed copies (each word renamed in a copy with probability 0.8)"""
+    scaled = list(titles)
+    for copy in range(1, copies):
+        renamed = {}
+        for title in titles:
+            scaled.append(" ".join(renamed.setdefault(word, word + "x" * copy if rng.random() < 0.8 else word)
+                                   for word in title.split()))
+    return scaled
+
+
+def exact_clusters(titles):
+    """Compare every pair of headlines; returns (clusters, similar pairs)"""
+    token_sets = [headline_tokens(title) for title in titles]
+    parent = list(range(len(titles)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+        
+    pairs = []
+    for i in range(len(titles)):
+        for j in range(i + 1, len(titles)):
+            if jaccard(token_sets[i], token_sets[j]) >= SIMILARITY:
+                pairs.append((i, j))
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+    clusters = {}
+    for i in range(len(titles)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values()), pairs
+
+
+def median_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2], result
+
+
+def benchmark_clustering(responses, copies_list):
+    titles = [article["title"] for response in responses.values() for article in response["articles"]
+              if article["title"] != "[Removed]"]
+    clusterer = HeadlineClusterer()
+    print(f"{'headlines':>10}{'LSH':>11}{'all pairs':>12}{'stories':>9}{'exact':>7}{'pairs kept':>12}")
+    for copies in copies_list:
+        scaled = scale(titles, copies, random.Random(copies))
+        repeats = max(3, 30 // copies)
+        lsh_time, clusters = median_time(lambda: clusterer.cluster(scaled), repeats)
+        exact_time, (exact, pairs) = median_time(lambda: exact_clusters(scaled), 1 if copies > 4 else 3)
+        story = {}
+        for number, cluster in enumerate(clusters):
+            story.update(dict.fromkeys(cluster, number))
+        kept = sum(story[i] == story[j] for i, j in pairs) / max(1, len(pairs))
+        print(f"{len(scaled):>10}{lsh_time * 1e3:8.1f} ms{exact_time * 1e3:9.1f} ms{len(clusters):>9}"
+              f"{len(exact):>7}{kept:>11.1%}")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        category = parse_qs(urlparse(self.path).query).get("category", ["general"])[0]
+        time.sleep(self.server.latency)
+        body = json.dumps(self.server.responses[category]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark_fetching(responses, latency, show):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.responses = responses
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Imported here: the utility module needs requests
+    from modules import utility
+    from modules.headless import HeadlessSpeech
+    utility.NEWS_URL = f"http://127.0.0.1:{server.server_address[1]}/news"
+    os.environ["NEWS_API_KEY"] = "stub"
+    
+    # A fresh working directory, so the response cache starts empty
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assistant = utility.Utility(speech=HeadlessSpeech(io.StringIO(), output))
+            # The fixtures' article URLs aren't real sites (benchmarks/article_reader.py times those)
+            assistant.articles.prefetch = lambda urls: None
+            
+            start = time.perf_counter()
+            for category in utility.NEWS_CATEGORIES:
+                assistant._fetch_news(category)
+            one_by_one = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            assistant.get_news_digest()
+            digest = time.perf_counter() - start
+            assistant.close()
+        os.chdir(ROOT)
+    server.shutdown()
+    
+    headlines = sum(len(story.articles) for story in assistant.last_headlines)
+    print(f"stub API {latency * 1e3:.0f} ms per request, {len(utility.NEWS_CATEGORIES)} categories")
+    print(f"one by one:  {one_by_one * 1e3:7.0f} ms (fetch only)")
+    print(f"digest:      {digest * 1e3:7.0f} ms (fetch, cluster and read {len(assistant.last_headlines)} stories "
+          f"covering {headlines} headlines)")
+    if show:
+        for line in output.getvalue().splitlines():
+            print("  " + json.loads(line)["text"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="News digest benchmark")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--show", action="store_true", help="print the digest as read out")
+    args = parser.parse_args()
+    
+    responses = load_fixtures()
+    benchmark_clustering(responses, args.copies)
+    print()
+    benchmark_fetching(responses, args.latency, args.show)
+
+
+if __name__ == "__main__":
+    main()
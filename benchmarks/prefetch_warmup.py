@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Prefetch Warm-up Benchmark - first weather/news answers with and without the background prefetch
+#
+# Usage: python benchmarks/prefetch_warmup.py [--latency 0.5] [--think 1.5]
+#
+# Points the weather and news URLs at a local stub API that takes --latency
+# seconds per request, then starts a headless PersonalAssistant with
+# HOME_CITY and PREFETCH_NEWS set, once with PREFETCH=0 and once with the
+# prefetcher on. Reports how long startup took (it must not grow), and, after
+# a --think second pause, how long "what's the weather" and the first news
+# headline took to answer.
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import PersonalAssistant
+from modules import utility
+from modules.headless import HeadlessSpeech
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if self.path.startswith("/weather"):
+            payload = {"main": {"temp": 14.2, "feels_like": 13.0, "humidity": 70},
+                       "weather": [{"description": "scattered clouds"}], "wind": {"speed": 4.1}}
+        else:
+            payload = {"status": "ok", "articles": [{"title": f"story {i}", "source": {"name": "Stub News"}}
+                                                    for i in range(5)]}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def run(prefetch, think):
+    """Start an assistant, wait, ask for the weather and the news; returns (startup, weather, news) seconds"""
+    os.environ["PREFETCH"] = "1" if prefetch else "0"
+    output = io.StringIO()
+    # The news command asks for a category, answered by the next input line
+    speech = HeadlessSpeech(io.StringIO("technology\n"), output)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        assistant = PersonalAssistant(speech=speech)
+        startup = time.perf_counter() - start
+        
+        time.sleep(think)
+        start = time.perf_counter()
+        assistant.process_command("what's the weather")
+        weather = time.perf_counter() - start
+        
+        # Time to the first headline (the rest are paced for speech)
+        start = time.perf_counter() - speech._start
+        assistant.process_command("give me the news")
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        first_headline = next(record["t_ms"] for record in records if record.get("text", "").startswith("Headline 1"))
+        news = first_headline / 1000 - start
+        
+        assistant.shutdown()
+    return startup, weather, news
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch warm-up benchmark")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--think", type=float, default=1.5)
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = args.latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    utility.WEATHER_URL = f"{base}/weather"
+    utility.NEWS_URL = f"{base}/news"
+    os.environ.update(WEATHER_API_KEY="stub", NEWS_API_KEY="stub", HOME_CITY="London", PREFETCH_NEWS="technology")
+    
+    print(f"stub API {args.latency * 1e3:.0f} ms per request, first command {args.think:.1f} s after startup")
+    print(f"{'':<14}{'startup':>10}{'weather':>10}{'news':>10}")
+    for prefetch in (False, True):
+        # A fresh working directory each time, so the response cache starts empty
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            startup, weather, news = run(prefetch, args.think)
+            os.chdir(ROOT)
+        label = "prefetch" if prefetch else "no prefetch"
+        print(f"{label:<14}{startup * 1e3:7.1f} ms{weather * 1e3:7.0f} ms{news * 1e3:7.0f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Recognition Throughput Benchmark - listen -> recognize -> dispatch, fully offline
+#
+# Usage: python benchmarks/recognition_throughput.py [--utterances 500]
+#
+# Generates a synthetic WAV corpus with a transcript map, then runs every
+# utterance through a muted SpeechEngine using the corpus backend and a real
+# PersonalAssistant. Only commands without side effects (no browser, files
+# or network) are used.
+
+import io
+import os
+import sys
+import json
+import time
+import wave
+import random
+import argparse
+import tempfile
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COMMANDS = [
+    "what time is it",
+    "what day is it",
+    "hello",
+    "tell me a joke",
+    "what is 12 plus 30",
+    "calculate 7 times 6",
+    "what is the binary of 42",
+    "factorial of 10",
+    "square root of 144",
+    "who are you",
+    "how old are you",
+    "what can you do",
+    "thank you",
+    "good job",
+    "sorry about that",
+]
+
+
+def build_corpus(directory, count, seconds=0.2, rate=16000):
+    """Write count WAV files plus transcripts.json and return the directory"""
+    transcripts = {}
+    for i in range(count):
+        filename = f"utterance_{i:05d}.wav"
+        # Seeded noise gives every file a distinct fingerprint
+        frames = random.Random(i).randbytes(int(seconds * rate) * 2)
+        with wave.open(os.path.join(directory, filename), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(frames)
+        transcripts[filename] = COMMANDS[i % len(COMMANDS)]
+        
+    with open(os.path.join(directory, "transcripts.json"), "w") as f:
+        json.dump(transcripts, f)
+    return directory
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline recognition throughput benchmark")
+    parser.add_argument("--utterances", type=int, default=500)
+    args = parser.parse_args()
+    
+    from main import PersonalAssistant
+    from modules.recognition import CorpusBackend
+    from modules.speech_engine import SpeechEngine
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = os.path.join(workdir, "corpus")
+        os.makedirs(corpus_dir)
+        build_corpus(corpus_dir, args.utterances)
+        
+        # Modules create their asset folders relative to the working directory
+        os.chdir(workdir)
+        
+        load_start = time.perf_counter()
+        backend = CorpusBackend(corpus_dir)
+        load_time = time.perf_counter() - load_start
+        
+        recognize_times = []
+        dispatch_times = []
+        log = io.StringIO()
+        
+        with contextlib.redirect_stdout(log):
+            speech = SpeechEngine(backend=backend, mute=True)
+            assistant = PersonalAssistant(speech=speech)
+            
+            start = time.perf_counter()
+            for _ in range(args.utterances):
+                t0 = time.perf_counter()
+                command = speech.recognize_speech(timeout=0)
+                t1 = time.perf_counter()
+                if command:
+                    assistant.process_command(command)
+                t2 = time.perf_counter()
+                recognize_times.append(t1 - t0)
+                dispatch_times.append(t2 - t1)
+            
+            # Include the time to drain the (muted) speech queue
+            speech.wait_until_done()
+            elapsed = time.perf_counter() - start
+            dispatch_stats = speech.dispatch_latency_stats()
+            speech.close()
+            
+        os.chdir(ROOT)
+        
+    print(f"corpus load:      {load_time * 1000:8.1f} ms for {args.utterances} utterances")
+    print(f"throughput:       {args.utterances / elapsed:8.1f} utterances/s ({elapsed:.2f} s total)")
+    for label, samples in (("recognize", recognize_times), ("dispatch", dispatch_times)):
+        print(f"{label + ':':<17} p50 {percentile(samples, 50) * 1000:7.3f} ms"
+              f"  p95 {percentile(samples, 95) * 1000:7.3f} ms"
+              f"  p99 {percentile(samples, 99) * 1000:7.3f} ms")
+    print(f"speech to dispatch: p50 {dispatch_stats.get('p50_ms', 0):.3f} ms"
+          f"  p95 {dispatch_stats.get('p95_ms', 0):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Response Cache Benchmark - weather/news lookups with and without the TTL response cache
+#
+# Usage: python benchmarks/response_cache.py [--latency 0.2] [--rounds 5]
+#
+# Serves fake weather and news JSON from a local stub server that takes
+# --latency seconds per request, then replays a session of lookups (cities
+# spelled in different ways, a few news categories) --rounds times: once
+# straight through HttpClient and once through a ResponseCache with a short
+# TTL, so later rounds see fresh, stale and refreshed entries. Finally a
+# new cache on the same file shows responses surviving a restart.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.http_client import HttpClient
+from modules.response_cache import ResponseCache, CachePolicy, normalize_key
+
+SESSION = [("weather", "New York"), ("weather", "london"), ("news", "technology"), ("weather", "new york!"),
+           ("weather", "Paris"), ("news", "sports"), ("weather", "London "), ("news", "technology"),
+           ("weather", "NEW YORK"), ("news", "general")]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+        if url.path == "/weather":
+            payload = {"name": query["q"][0], "main": {"temp": 14.2, "feels_like": 13.0, "humidity": 70},
+                       "weather": [{"description": "scattered clouds"}], "wind": {"speed": 4.1}}
+        else:
+            payload = {"status": "ok", "articles": [{"title": f"{query['category'][0]} story {i}",
+                                                     "source": {"name": "Stub News"}} for i in range(20)]}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response cache benchmark")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--ttl", type=float, default=1.0)
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = args.latency
+    server.lock = threading.Lock()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    client = HttpClient()
+    
+    def fetcher(source, text):
+        if source == "weather":
+            return lambda: client.get_json("weather", f"{base}/weather", params={"q": text})
+        return lambda: client.get_json("news", f"{base}/news", params={"category": text})
+    
+    def replay(lookup):
+        latencies = []
+        for round_number in range(args.rounds):
+            for source, text in SESSION:
+                start = time.perf_counter()
+                lookup(source, text)
+                latencies.append(time.perf_counter() - start)
+            # Let the TTL run out between rounds
+            time.sleep(args.ttl * 0.6)
+        return latencies
+    
+    def report(label, latencies, requests):
+        print(f"{label:<12}p50 {percentile(latencies, 50) * 1e3:7.2f} ms, p95 {percentile(latencies, 95) * 1e3:7.2f} ms, "
+              f"mean {sum(latencies) / len(latencies) * 1e3:7.2f} ms, {requests} API requests")
+              
+    print(f"{args.rounds} rounds of {len(SESSION)} lookups, {args.latency * 1e3:.0f} ms per API request, TTL {args.ttl:.1f} s")
+    latencies = replay(lambda source, text: fetcher(source, text)())
+    report("no cache", latencies, server.requests)
+    
+    policies = {source: CachePolicy(ttl=args.ttl, max_stale=args.ttl * 20) for source in ("weather", "news")}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "response_cache.db")
+        cache = ResponseCache(path, policies=policies)
+        server.requests = 0
+        latencies = replay(lambda source, text: cache.get(source, normalize_key(text), fetcher(source, text)))
+        cache.close()
+        report("cache", latencies, server.requests)
+        for source in ("weather", "news"):
+            print(f"  {source}: {cache.cache_info(source)}")
+        
+        # A new process finds the responses on disk
+        cache = ResponseCache(path, policies=policies)
+        server.requests = 0
+        start = time.perf_counter()
+        states = [cache.get(source, normalize_key(text), fetcher(source, text)).state for source, text in SESSION]
+        elapsed = time.perf_counter() - start
+        cache.close()
+        print(f"after restart: {len(SESSION)} lookups in {elapsed * 1e3:.1f} ms "
+              f"({states.count('fresh')} fresh, {states.count('stale')} stale, {states.count('miss')} misses)")
+              
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Startup Benchmark - cold-start time with per-module vs shared speech engines
+#
+# Usage: python benchmarks/startup_benchmark.py [--mode both|legacy|shared]
+#
+# "legacy" gives every module its own SpeechEngine, the way the assistant
+# used to start. "shared" injects one engine into every module. Each mode
+# runs in a fresh interpreter so import caches don't skew the numbers.
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Modules that take a speech engine, in the order PersonalAssistant builds them
+MODULES = [
+    ("modules.browser", "WebBrowser"),
+    ("modules.os_functions", "SystemFunctions"),
+    ("modules.utility", "Utility"),
+    ("modules.email_sender", "EmailSender"),
+    ("modules.whatsapp_sender", "WhatsAppSender"),
+    ("modules.calculations", "Calculator"),
+    ("modules.file_operations", "FileOperations"),
+    ("modules.web_automation", "WebAutomation"),
+    ("modules.games", "Games"),
+    ("modules.smart_reply", "SmartReply"),
+]
+
+
+def run_mode(mode):
+    """Build every module in the given mode and return timings in seconds"""
+    import importlib
+    from modules.speech_engine import SpeechEngine, get_speech_engine
+
+    classes = [getattr(importlib.import_module(name), cls) for name, cls in MODULES]
+
+    start = time.perf_counter()
+    engines = 1
+    speech = get_speech_engine()
+    for cls in classes:
+        if mode == "legacy":
+            cls(speech=SpeechEngine())
+            engines += 1
+        else:
+            cls(speech=speech)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, engines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure assistant cold-start time")
+    parser.add_argument("--mode", choices=["both", "legacy", "shared"], default="both")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+
+    if args.child:
+        elapsed, engines = run_mode(args.mode)
+        print(f"{elapsed:.6f} {engines}")
+        return
+
+    modes = ["legacy", "shared"] if args.mode == "both" else [args.mode]
+    results = {}
+    for mode in modes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--child"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        elapsed, engines = output.split()
+        results[mode] = float(elapsed)
+        print(f"{mode:>7}: {float(elapsed) * 1000:9.1f} ms  ({engines} speech engine(s))")
+
+    if len(results) == 2 and results["shared"] > 0:
+        print(f"speedup: {results['legacy'] / results['shared']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
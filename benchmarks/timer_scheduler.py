@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Timer Scheduler Benchmark - one heap-driven scheduler thread vs a sleeping thread per timer
+#
+# Usage: python benchmarks/timer_scheduler.py [--timers 10000] [--spread 2.0]
+#
+# Schedules --timers timers due at random over the next --spread seconds
+# (cancelling every fourth one), and reports the cost of scheduling, how
+# late timers fire (p50/p95/max), the number of threads alive, and how long
+# the saved timers take to reload. The old design, a daemon thread
+# sleeping for each timer, is run with the same timers for comparison.
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.scheduler import TimerScheduler, SAVE_DELAY
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def run_scheduler(delays, path):
+    lateness = []
+    finished = threading.Event()
+    expected = len(delays) - len(delays[::4])
+    
+    def on_fire(timer, late):
+        lateness.append(late)
+        if len(lateness) == expected:
+            finished.set()
+            
+    scheduler = TimerScheduler(path, on_fire)
+    start = time.perf_counter()
+    for i, delay in enumerate(delays):
+        scheduler.schedule(f"timer {i}", delay)
+    for i in range(0, len(delays), 4):
+        scheduler.cancel(f"timer {i}")
+    schedule = time.perf_counter() - start
+    threads = threading.active_count()
+    
+    # Let the first save land, then time reloading it in a second scheduler
+    time.sleep(SAVE_DELAY * 2)
+    with open(path) as source, open(path + ".copy", "w") as copy:
+        copy.write(source.read())
+    start = time.perf_counter()
+    reloaded = TimerScheduler(path + ".copy", lambda timer, late: None)
+    reload = time.perf_counter() - start
+    pending = len(reloaded)
+    reloaded.cancel_all()
+    reloaded.close()
+    
+    finished.wait(max(delays) + 10)
+    scheduler.close()
+    return schedule, threads, lateness, reload, pending
+
+
+def run_threads(delays):
+    lateness = []
+    lock = threading.Lock()
+    cancelled = set(range(0, len(delays), 4))
+    
+    def run(i, due):
+        time.sleep(max(0.0, due - time.time()))
+        if i not in cancelled:
+            with lock:
+                lateness.append(time.time() - due)
+                
+    start = time.perf_counter()
+    threads = []
+    for i, delay in enumerate(delays):
+        thread = threading.Thread(target=run, args=(i, time.time() + delay), daemon=True)
+        thread.start()
+        threads.append(thread)
+    schedule = time.perf_counter() - start
+    alive = threading.active_count()
+    for thread in threads:
+        thread.join()
+    return schedule, alive, lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timer scheduler benchmark")
+    parser.add_argument("--timers", type=int, default=10000)
+    parser.add_argument("--spread", type=float, default=2.0)
+    args = parser.parse_args()
+    
+    rng = random.Random(3)
+    delays = [0.5 + rng.random() * args.spread for _ in range(args.timers)]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "timers.json")
+        schedule, threads, lateness, reload, pending = run_scheduler(delays, path)
+    print(f"{args.timers:,} timers over {args.spread:.1f} s, every fourth cancelled")
+    print(f"{'':<16}{'schedule':>12}{'threads':>9}{'late p50':>11}{'late p95':>11}{'late max':>11}")
+    print(f"{'TimerScheduler':<16}{schedule * 1e3:9.1f} ms{threads:9d}{percentile(lateness, 50) * 1e3:8.2f} ms"
+          f"{percentile(lateness, 95) * 1e3:8.2f} ms{max(lateness) * 1e3:8.2f} ms")
+          
+    schedule, threads, lateness = run_threads(delays)
+    print(f"{'thread per timer':<16}{schedule * 1e3:9.1f} ms{threads:9d}{percentile(lateness, 50) * 1e3:8.2f} ms"
+          f"{percentile(lateness, 95) * 1e3:8.2f} ms{max(lateness) * 1e3:8.2f} ms")
+    print(f"reloading {pending:,} saved timers: {reload * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
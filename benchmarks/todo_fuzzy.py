@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Todo Fuzzy Benchmark - trigram index vs scanning every item with difflib
+#
+# Usage: python benchmarks/todo_fuzzy.py [--items 50000] [--queries 500]
+#
+# Builds a todo list of --items generated items, then looks items up by a
+# "misheard" version of their text (one word dropped, a letter changed or
+# the words run together differently). Reports build time, search latency
+# percentiles and how often the intended item ranks first, for the
+# TrigramIndex (plain top 3, and only matches within FUZZY_MARGIN of the
+# best, as the todo commands ask for) and for a linear difflib scan on a
+# sample of the queries.
+
+import os
+import sys
+import time
+import random
+import difflib
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.fuzzy_index import TrigramIndex
+
+VERBS = ["buy", "call", "email", "fix", "clean", "book", "pay", "return", "order", "pick up",
+         "send", "check", "renew", "cancel", "schedule", "water", "wash", "print", "sign", "post"]
+# Utility.FUZZY_MARGIN (not imported: the utility module needs the speech engine)
+FUZZY_MARGIN = 0.15
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["ten", "son", "del", "tro", "vin", "mar"]
+
+
+def make_items(count, rng):
+    # A vocabulary of made-up nouns; the verbs, "the" and "for" give every
+    # item some very common trigrams
+    nouns = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(3000)})
+    return [f"{rng.choice(VERBS)} the {rng.choice(nouns)} {rng.choice(nouns)}" +
+            (f" for {rng.choice(nouns)}" if rng.random() < 0.5 else "") for _ in range(count)]
+
+
+def mishear(text, rng):
+    words = text.split()
+    choice = rng.random()
+    if choice < 0.4 and len(words) > 3:
+        del words[rng.randrange(len(words))]
+    elif choice < 0.8:
+        i = rng.randrange(len(words))
+        word = words[i]
+        j = rng.randrange(len(word))
+        words[i] = word[:j] + rng.choice("aeiou") + word[j + 1:]
+    else:
+        words = [word for word in words if word not in ("the", "for")]
+    return " ".join(words)
+
+
+def difflib_search(items, query):
+    best = max(range(len(items)), key=lambda i: difflib.SequenceMatcher(None, query, items[i]).ratio())
+    return best
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy todo lookup benchmark")
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--difflib-queries", type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(7)
+    items = make_items(args.items, rng)
+    targets = [rng.randrange(len(items)) for _ in range(args.queries)]
+    queries = [mishear(items[i], rng) for i in targets]
+    
+    start = time.perf_counter()
+    index = TrigramIndex(enumerate(items))
+    build = time.perf_counter() - start
+    
+    # As Utility builds it in the background: every posting array up front
+    start = time.perf_counter()
+    index.prepare()
+    prepare = time.perf_counter() - start
+    
+    results = {}
+    for label, options in (("top 3", {}), ("within margin", {"margin": FUZZY_MARGIN})):
+        latencies = []
+        hits = 0
+        for target, query in zip(targets, queries):
+            start = time.perf_counter()
+            matches = index.search(query, limit=3, **options)
+            latencies.append(time.perf_counter() - start)
+            # Generated lists contain duplicates: any item with the same text counts
+            hits += bool(matches) and items[matches[0].key] == items[target]
+        results[label] = (latencies, hits)
+        
+    scan_latencies = []
+    scan_hits = 0
+    for target, query in list(zip(targets, queries))[:args.difflib_queries]:
+        start = time.perf_counter()
+        best = difflib_search(items, query)
+        scan_latencies.append(time.perf_counter() - start)
+        scan_hits += items[best] == items[target]
+        
+    print(f"{len(items):,} items, index built in {build * 1e3:.0f} ms, posting arrays in {prepare * 1e3:.0f} ms")
+    for label, (latencies, hits) in results.items():
+        print(f"{label + ':':<15}p50 {percentile(latencies, 50) * 1e3:.3f} ms, p95 {percentile(latencies, 95) * 1e3:.3f} ms, "
+              f"mean {statistics.fmean(latencies) * 1e3:.3f} ms, top-1 {hits}/{len(queries)}")
+    print(f"{'difflib scan:':<15}mean {statistics.fmean(scan_latencies) * 1e3:.1f} ms, top-1 {scan_hits}/{len(scan_latencies)}")
+
+
+if __name__ == "__main__":
+    main()
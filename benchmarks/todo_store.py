@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Todo Store Benchmark - SQLite todo store vs rewriting todo_list.json
+#
+# Usage: python benchmarks/todo_store.py [--items 100000] [--ops 20]
+#
+# Fills a todo list with --items entries (a third of them completed) both as
+# the old JSON file and as a TodoStore migrated from it, then times single
+# adds, listing the pending items (all of them, and the count plus the
+# oldest ten that "show my list" reads out), and completing and deleting by id.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.todo_store import TodoStore
+
+
+def json_add(path, item):
+    """The old Utility.add_to_todo: load everything, append, rewrite with indent=4"""
+    with open(path, 'r') as f:
+        todo_list = json.load(f)
+    todo_list.append({"item": item, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "completed": False})
+    with open(path, 'w') as f:
+        json.dump(todo_list, f, indent=4)
+
+
+def json_pending(path):
+    """The old Utility.show_todo: load everything and filter"""
+    with open(path, 'r') as f:
+        todo_list = json.load(f)
+    return [item for item in todo_list if not item["completed"]]
+
+
+def json_complete(path, index):
+    """Completing an item in the old format: load, change one entry, rewrite"""
+    with open(path, 'r') as f:
+        todo_list = json.load(f)
+    todo_list[index]["completed"] = True
+    with open(path, 'w') as f:
+        json.dump(todo_list, f, indent=4)
+
+
+def per_op(function, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        function(*args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Todo storage benchmark")
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--ops", type=int, default=20)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "todo_list.json")
+        todo_list = [{"item": f"task number {i}", "timestamp": f"2022-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+                      "completed": i % 3 == 0} for i in range(args.items)]
+        with open(json_path, 'w') as f:
+            json.dump(todo_list, f, indent=4)
+        json_size = os.path.getsize(json_path)
+        
+        # The store imports a copy, so both formats hold the same list
+        migrate_path = os.path.join(directory, "legacy.json")
+        with open(migrate_path, 'w') as f:
+            json.dump(todo_list, f)
+        start = time.perf_counter()
+        store = TodoStore(os.path.join(directory, "todo.db"), legacy_json=migrate_path)
+        migrate = time.perf_counter() - start
+        
+        ops = [(f"new task {i}",) for i in range(args.ops)]
+        ids = [(i,) for i in range(2, 3 * args.ops, 3)]
+        rows = [
+            ("add", per_op(json_add, [(json_path,) + op for op in ops]), per_op(store.add, ops)),
+            ("list pending", per_op(json_pending, [(json_path,)] * 3), per_op(store.pending, [()] * 3)),
+            ("count + oldest 10", None, per_op(lambda: (store.count(completed=False), store.pending(limit=10)), [()] * 3)),
+            ("complete by id", per_op(json_complete, [(json_path, i - 1) for (i,) in ids]), per_op(store.complete, ids)),
+            ("delete by id", None, per_op(store.delete, [(i + 1,) for (i,) in ids])),
+        ]
+        pending = store.count(completed=False)
+        store.close()
+        db_size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                      if name.startswith("todo.db"))
+                      
+    print(f"{args.items:,} items; JSON {json_size / 1e6:.1f} MB, SQLite {db_size / 1e6:.1f} MB; "
+          f"migration {migrate * 1e3:.0f} ms; {pending:,} pending at the end")
+    print(f"{'':<18}{'JSON file':>14}{'TodoStore':>14}")
+    for label, legacy, store_time in rows:
+        legacy_text = f"{legacy * 1e3:11.2f} ms" if legacy is not None else f"{'-':>14}"
+        print(f"{label:<18}{legacy_text}{store_time * 1e3:11.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
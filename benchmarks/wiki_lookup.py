@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# Wiki Lookup Benchmark - single-request cached Wikipedia lookups vs wikipedia.summary() + wikipedia.page()
+#
+# Usage: python benchmarks/wiki_lookup.py [--latency 0.15] [--rounds 3]
+#
+# Serves a few pages (with redirects and a disambiguation page) from a local
+# stub MediaWiki API that takes --latency seconds per request, then replays a
+# session of "who is" questions, several asking for the same page in
+# different words, --rounds times:
+#
+#   old       the request sequence the wikipedia package makes for
+#             summary(query) then page(query): search, page info and
+#             extract, then search and page info again, each on a new
+#             connection, nothing remembered
+#   lookup    WikiLookup: one API request per new topic, then the cache
+#
+# Finally the stub is stopped and the session replayed against the cache
+# with every page past its TTL, as if offline a month later.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.http_client import HttpClient, ServiceConfig, ServiceUnavailable
+from modules.response_cache import normalize_key
+from modules.wiki_lookup import WikiLookup
+
+PAGES = {
+    "Albert Einstein": "Albert Einstein was a German-born theoretical physicist who is best known for developing "
+                       "the theory of relativity. He also made important contributions to quantum mechanics. "
+                       "His mass-energy equivalence formula E = mc2 has been called the world's most famous equation.",
+    "Marie Curie": "Marie Salomea Sklodowska-Curie was a Polish and naturalised-French physicist and chemist who "
+                   "conducted pioneering research on radioactivity. She was the first woman to win a Nobel Prize. "
+                   "She was the first person to win a Nobel Prize twice.",
+    "Ada Lovelace": "Augusta Ada King, Countess of Lovelace was an English mathematician and writer, chiefly known "
+                    "for her work on Charles Babbage's proposed mechanical general-purpose computer, the Analytical "
+                    "Engine. She was the first to recognise that the machine had applications beyond pure calculation.",
+    "Mercury": None,
+}
+REDIRECTS = {"Einstein": "Albert Einstein", "Madame Curie": "Marie Curie", "Lady Lovelace": "Ada Lovelace"}
+OPTIONS = ["Mercury (planet)", "Mercury (element)", "Mercury (mythology)", "Freddie Mercury"]
+
+SESSION = ["Albert Einstein", "Einstein", "marie curie", "who was Ada Lovelace", "albert einstein?",
+           "Madame Curie", "Mercury", "Ada Lovelace", "Lady Lovelace", "EINSTEIN"]
+
+
+def search(text):
+    """The stub's search: the page or redirect whose words all appear in the text"""
+    words = set(normalize_key(text).split())
+    for title in list(PAGES) + list(REDIRECTS):
+        if set(normalize_key(title).split()) <= words:
+            return title
+    return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+            
+        if query.get("list") == "search":
+            found = search(query["srsearch"])
+            payload = {"query": {"search": [{"title": found}] if found else []}}
+        else:
+            title = search(query["gsrsearch"]) if "gsrsearch" in query else query.get("titles")
+            payload = {"batchcomplete": True, "query": {}}
+            if title in REDIRECTS:
+                payload["query"]["redirects"] = [{"from": title, "to": REDIRECTS[title]}]
+                title = REDIRECTS[title]
+            if title in PAGES:
+                page = {"pageid": 1, "ns": 0, "title": title,
+                        "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}
+                if PAGES[title] is None:
+                    page["pageprops"] = {"disambiguation": ""}
+                    page["links"] = [{"ns": 0, "title": option} for option in OPTIONS]
+                else:
+                    page["extract"] = PAGES[title]
+                payload["query"]["pages"] = [page]
+            else:
+                payload["query"]["pages"] = [{"title": title, "missing": True}]
+                
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def old_lookup(api, query):
+    """The requests wikipedia.summary(query, sentences=3) and wikipedia.page(query) make"""
+    for _ in range(2):
+        found = requests.get(api, params={"list": "search", "srsearch": query}).json()["query"]["search"]
+        if not found:
+            return None
+        title = found[0]["title"]
+        page = requests.get(api, params={"prop": "info|pageprops", "titles": title}).json()
+        if "pageprops" in page["query"]["pages"][0]:
+            return None
+        if _ == 0:
+            requests.get(api, params={"prop": "extracts", "titles": title, "exsentences": 3}).json()
+    return title
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def report(label, latencies, requests_made):
+    print(f"{label:<10}p50 {percentile(latencies, 50) * 1e3:8.2f} ms, p95 {percentile(latencies, 95) * 1e3:8.2f} ms, "
+          f"mean {sum(latencies) / len(latencies) * 1e3:8.2f} ms, {requests_made} API requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wikipedia lookup benchmark")
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = args.latency
+    server.lock = threading.Lock()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api = f"http://127.0.0.1:{server.server_address[1]}/w/api.php"
+    
+    print(f"{args.rounds} rounds of {len(SESSION)} questions, {args.latency * 1e3:.0f} ms per API request")
+    latencies = []
+    for _ in range(args.rounds):
+        for query in SESSION:
+            start = time.perf_counter()
+            old_lookup(api, query)
+            latencies.append(time.perf_counter() - start)
+    report("old", latencies, server.requests)
+    
+    # Fail fast once the stub is gone (no retries, short timeouts)
+    offline_config = ServiceConfig(0.5, 2, retries=0, backoff=0, deadline=2, failure_threshold=3, reset_timeout=30)
+    client = HttpClient(services={"wikipedia": offline_config})
+    with tempfile.TemporaryDirectory() as directory:
+        wiki = WikiLookup(client, os.path.join(directory, "wiki_cache.db"), url=api)
+        server.requests = 0
+        latencies = []
+        for _ in range(args.rounds):
+            for query in SESSION:
+                start = time.perf_counter()
+                wiki.lookup(query)
+                latencies.append(time.perf_counter() - start)
+        report("lookup", latencies, server.requests)
+        
+        # Stop the stub and drop the kept-alive connections to it
+        wiki.close()
+        client.close()
+        server.shutdown()
+        server.server_close()
+        client = HttpClient(services={"wikipedia": offline_config})
+        wiki = WikiLookup(client, os.path.join(directory, "wiki_cache.db"), ttl=0, url=api)
+        answered = 0
+        latencies = []
+        for query in SESSION:
+            start = time.perf_counter()
+            try:
+                answered += wiki.lookup(query).state == "stale"
+            except ServiceUnavailable:
+                pass
+            latencies.append(time.perf_counter() - start)
+        print(f"offline:  {answered}/{len(SESSION)} questions answered from the cache, "
+              f"p50 {percentile(latencies, 50) * 1e3:.2f} ms")
+        wiki.close()
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Wiki Offline Benchmark - building and querying the local Wikipedia abstracts index
+#
+# Usage: python benchmarks/wiki_offline.py [--articles 200000] [--queries 2000]
+#
+# Fixture: indexes benchmarks/fixtures/wiki_abstracts.xml (a few dozen
+# articles in the enwiki-latest-abstract.xml format, with disambiguation and
+# template-only entries that are left out) and checks the article each of
+# a set of questions is answered with.
+#
+# Scale: writes a generated dump of --articles articles (gzipped, random
+# words with a Zipf-like frequency), then reports:
+#
+#   import    articles per second and how much the process grew while
+#             streaming the dump into the index
+#   size      the index on disk against the uncompressed dump
+#   queries   p50/p95 latency of --queries title, abstract and no-match
+#             questions, against a LIKE scan of the same rows in a plain table
+#             (--scan-queries of them, it is slow)
+
+import os
+import sys
+import gzip
+import time
+import random
+import sqlite3
+import argparse
+import resource
+import itertools
+import tempfile
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.wiki_offline import OfflineWiki, build_index, read_abstracts, query_words
+
+FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "wiki_abstracts.xml")
+
+# Questions about the fixture and the article that should answer each
+QUESTIONS = [
+    ("Ada Lovelace", "Ada Lovelace"),
+    ("einstein", "Albert Einstein"),
+    ("the planet mercury", "Mercury (planet)"),
+    ("mercury element", "Mercury (element)"),
+    ("python programming language", "Python (programming language)"),
+    ("Everest", "Mount Everest"),
+    ("largest river", "Amazon River"),
+    ("who painted the Mona Lisa", "Mona Lisa"),
+    ("the inventor of the phonograph", "Thomas Edison"),
+    ("Turing machine", "Turing machine"),
+    ("honey bees", "Honey bee"),
+    ("capital of Japan", "Tokyo"),
+]
+
+
+def benchmark_fixture(directory):
+    path = os.path.join(directory, "fixture.db")
+    start = time.perf_counter()
+    count = build_index(FIXTURE, path)
+    print(f"fixture: {count} articles indexed in {(time.perf_counter() - start) * 1e3:.1f} ms, "
+          f"{os.path.getsize(path) / 1024:.0f} KB")
+    wiki = OfflineWiki(path)
+    right = 0
+    for question, expected in QUESTIONS:
+        pages = wiki.search(question)
+        answer = pages[0].title if pages else None
+        right += answer == expected
+        print(f"  {question!r:<36} -> {answer}" + ("" if answer == expected else f"  (expected {expected})"))
+    print(f"  {right}/{len(QUESTIONS)} answered with the expected article")
+    wiki.close()
+
+
+def make_vocabulary(rng, size):
+    syllables = ["ka", "lo", "mi", "ren", "tu", "sha", "vel", "dor", "pi", "an", "qu", "ber", "ix", "no", "sel", "ga"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def write_dump(path, articles, vocabulary, rng):
+    """Write a gzipped abstracts dump; returns its uncompressed size and the titles written"""
+    # Word rank r is picked with probability ~ 1/r
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    titles = []
+    size = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as f:
+        f.write("<feed>\n")
+        for number in range(articles):
+            title = " ".join(rng.choices(vocabulary, k=rng.randint(1, 3))).title()
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(20, 60))
+            url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}_{number}"
+            doc = (f"<doc>\n<title>Wikipedia: {escape(title)}</title>\n<url>{url}</url>\n"
+                   f"<abstract>{escape(title)} is {' '.join(words)}.</abstract>\n<links>\n"
+                   f'<sublink linktype="nav"><anchor>History</anchor><link>{url}#History</link></sublink>\n'
+                   f"</links>\n</doc>\n")
+            f.write(doc)
+            size += len(doc.encode())
+            titles.append(title)
+        f.write("</feed>\n")
+    return size, titles
+
+
+def make_queries(titles, vocabulary, count, rng):
+    """(kind, question) pairs: titles, a few abstract words, and words that appear nowhere"""
+    queries = []
+    for _ in range(count):
+        kind = rng.choice(["title", "abstract", "missing"])
+        if kind == "title":
+            queries.append((kind, rng.choice(titles)))
+        elif kind == "abstract":
+            queries.append((kind, " ".join(rng.sample(vocabulary[:2000], 2))))
+        else:
+            queries.append((kind, f"zzq{rng.randint(0, 10 ** 6)} ywx{rng.randint(0, 10 ** 6)}"))
+    return queries
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def time_queries(search, queries):
+    latencies = {}
+    for kind, question in queries:
+        start = time.perf_counter()
+        search(question)
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label, latencies):
+    print(f"{label:<8}" + "".join(f"  {kind} p50 {percentile(samples, 50) * 1e3:7.2f} ms p95 "
+                                   f"{percentile(samples, 95) * 1e3:7.2f} ms"
+                                   for kind, samples in sorted(latencies.items())))
+
+
+def scan_table(dump, path):
+    """The dump's articles in a plain table, searched with LIKE"""
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute("CREATE TABLE abstracts (title TEXT, abstract TEXT, url TEXT)")
+    db.execute("BEGIN")
+    db.executemany("INSERT INTO abstracts VALUES (?, ?, ?)", read_abstracts(dump))
+    db.execute("COMMIT")
+    
+    def search(question):
+        words = query_words(question)
+        where = " AND ".join("(title LIKE ? OR abstract LIKE ?)" for _ in words)
+        return db.execute(f"SELECT title, abstract, url FROM abstracts WHERE {where} LIMIT 1",
+                          [f"%{word}%" for word in words for _ in range(2)]).fetchall()
+                          
+    return db, search
+
+
+def benchmark_scale(directory, articles, query_count, scan_count):
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, 50000)
+    dump = os.path.join(directory, "abstracts.xml.gz")
+    start = time.perf_counter()
+    dump_size, titles = write_dump(dump, articles, vocabulary, rng)
+    print(f"generated {articles} articles in {time.perf_counter() - start:.1f} s: dump {dump_size / 2 ** 20:.1f} MB "
+          f"({os.path.getsize(dump) / 2 ** 20:.1f} MB gzipped)")
+          
+    index = os.path.join(directory, "wiki_index.db")
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = build_index(dump, index)
+    elapsed = time.perf_counter() - start
+    grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    index_size = os.path.getsize(index)
+    print(f"import:  {count} articles in {elapsed:.1f} s ({count / elapsed:,.0f} per second), "
+          f"peak memory grew {grown / 1024:.1f} MB")
+    print(f"size:    index {index_size / 2 ** 20:.1f} MB, {index_size / dump_size:.0%} of the dump")
+    
+    queries = make_queries(titles, vocabulary, query_count, rng)
+    wiki = OfflineWiki(index)
+    found = sum(bool(wiki.search(question)) for kind, question in queries if kind != "missing")
+    report("fts5", time_queries(wiki.search, queries))
+    print(f"         {found}/{sum(kind != 'missing' for kind, _ in queries)} title and abstract questions answered")
+    wiki.close()
+    
+    db, search = scan_table(dump, os.path.join(directory, "scan.db"))
+    report("scan", time_queries(search, queries[:scan_count]))
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Wikipedia index benchmark")
+    parser.add_argument("--articles", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=30)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark_fixture(directory)
+        print()
+        benchmark_scale(directory, args.articles, args.queries, args.scan_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,42 +7,123 @@ import sys
 import time
 import random
 import datetime
+import argparse
+import importlib
+import threading
 from dotenv import load_dotenv
 
-# Import modules
-from modules.speech_engine import SpeechEngine
-from modules.security import FaceSecurity
-from modules.browser import WebBrowser
-from modules.os_functions import SystemFunctions
-from modules.utility import Utility
-from modules.email_sender import EmailSender
-from modules.whatsapp_sender import WhatsAppSender
-from modules.calculations import Calculator
-from modules.file_operations import FileOperations
-from modules.web_automation import WebAutomation
-from modules.games import Games
-from modules.smart_reply import SmartReply
+# Import modules (feature modules are loaded lazily, see PersonalAssistant._subsystems)
+from modules.speech_engine import get_speech_engine, shutdown_speech_engine, BARGE_IN_PHRASES
+from modules.intent_router import Intent, IntentRouter
+from modules.scheduler import TIMERS_FILE
+from modules import prefetch
+from modules import metrics
+
+# Command intents in precedence order: the first intent whose trigger
+# phrases occur in the command wins, so keep more specific intents first
+COMMAND_INTENTS = [
+    # Exit commands
+    Intent("exit", ["bye", "goodbye", "exit", "quit"]),
+    # Statistics over files (ahead of greetings, as file names can contain "hi")
+    Intent("file_stats", ["average", "mean of", "standard deviation", "variance",
+                          "sum of", "total of", "minimum of", "maximum of"]),
+    # Timers and reminders (ahead of greetings, time queries and
+    # calculations: "which timers" contains "hi", reminder text can contain "sin")
+    # ("cancel" only with a timer, reminder or alarm: "cancel my email" is not
+    # one; require needs all its phrases, so one entry per word)
+    Intent("timer_cancel", ["cancel"], require=["timer"]),
+    Intent("timer_cancel", ["cancel"], require=["reminder"]),
+    Intent("timer_cancel", ["cancel"], require=["alarm"]),
+    Intent("timer_snooze", ["snooze"]),
+    Intent("timer_list", ["list timers", "list my timers", "what timers", "which timers", "my timers",
+                          "my reminders", "how long is left", "time left"]),
+    Intent("reminder", ["remind me", "set a reminder"]),
+    # (no strip: set_timer reads the name as well as the duration from the whole command)
+    Intent("timer", ["set a timer", "timer"]),
+    # Follow-ups to the news (ahead of greetings: "the third story" contains "hi")
+    Intent("read_article", ["tell me more", "read story", "read headline", "read me story", "read me headline",
+                            "more about story", "more about headline", "read the article"]),
+    # Todo items named by their text (ahead of greetings and calculations:
+    # "the history essay" contains "hi", "which" contains "hi", "blog" contains "log")
+    Intent("todo_find", ["on my list", "in my list", "on my todo list"]),
+    Intent("todo_complete", ["complete item", "mark item", "finish item", "as done", "as complete",
+                             "as finished", "tick off", "cross off"]),
+    Intent("todo_remove", ["remove item", "delete item", "from my list", "from my todo list"]),
+    # Basic greeting responses
+    Intent("greeting", ["hello", "hi", "hey"]),
+    # Time and date queries
+    Intent("time", ["what time", "current time"]),
+    Intent("date", ["what date", "what day", "current date"]),
+    # Math calculations
+    Intent("calculate", ["calculate", "what is", "solve", "computation", "binary of", "factorial", "sin", "cos", "log"]),
+    # Web, Wikipedia and YouTube searches
+    Intent("search", ["search for", "search", "look up", "find", "google"],
+           strip=["search for", "search", "look up", "find", "google"]),
+    Intent("wikipedia", ["wikipedia", "who is"], strip=["wikipedia", "who is"]),
+    Intent("youtube", ["play"], require=["youtube"], strip=["play", "on youtube", "youtube"]),
+    # Email and WhatsApp messaging
+    Intent("email", ["send an email", "send email"]),
+    Intent("whatsapp", ["send a whatsapp message", "send whatsapp"]),
+    # File operations and web automation
+    Intent("create_file", ["create a file", "create file", "new file"],
+           choices=[("python", "python"), ("java", "java"), ("html", "html"), ("text", "text"), ("txt", "text")]),
+    Intent("html_project", ["create a html project", "create html project"]),
+    # System information, camera and screenshots
+    Intent("system_info", ["system information", "system info"]),
+    Intent("battery", ["battery"]),
+    Intent("photo", ["take a selfie", "click a photo", "take photo"]),
+    Intent("screenshot", ["take a screenshot", "screenshot"]),
+    # Volume control
+    Intent("volume_up", ["increase volume", "volume up"]),
+    Intent("volume_down", ["decrease volume", "volume down"]),
+    Intent("mute", ["mute volume", "mute"]),
+    Intent("volume_max", ["full volume", "maximum volume"]),
+    # Games
+    Intent("game", ["let's play a game", "play game", "game"]),
+    # Weather, news and jokes
+    Intent("weather", ["weather"]),
+    Intent("news_digest", ["news digest", "news briefing", "news summary", "news roundup", "all the news",
+                           "all news", "news from every"]),
+    Intent("news", ["news"]),
+    Intent("joke", ["joke", "tell me a joke"]),
+    # Todo list
+    Intent("todo_add", ["add to my list", "add to list"], strip=["add to my list", "add to list"]),
+    Intent("todo_show", ["show my list", "show list"]),
+]
+
+# Compiled once at import; unknown commands route to None (smart replies)
+COMMAND_ROUTER = IntentRouter(COMMAND_INTENTS)
 
 class PersonalAssistant:
-    def __init__(self):
+    # Subsystems created on the first command routed to them:
+    # attribute name -> (module, class name, takes a speech engine)
+    _subsystems = {
+        "security": ("modules.security", "FaceSecurity", False),
+        "browser": ("modules.browser", "WebBrowser", True),
+        "system": ("modules.os_functions", "SystemFunctions", True),
+        "utility": ("modules.utility", "Utility", True),
+        "email": ("modules.email_sender", "EmailSender", True),
+        "whatsapp": ("modules.whatsapp_sender", "WhatsAppSender", True),
+        "calculator": ("modules.calculations", "Calculator", True),
+        "file_ops": ("modules.file_operations", "FileOperations", True),
+        "web_auto": ("modules.web_automation", "WebAutomation", True),
+        "games": ("modules.games", "Games", True),
+        "smart_reply": ("modules.smart_reply", "SmartReply", True),
+    }
+    
+    def __init__(self, speech=None):
         # Load environment variables
         load_dotenv()
         
         print("Initializing Personal Assistant...")
         
-        # Initialize modules
-        self.speech = SpeechEngine()
-        self.security = FaceSecurity()
-        self.browser = WebBrowser()
-        self.system = SystemFunctions()
-        self.utility = Utility()
-        self.email = EmailSender()
-        self.whatsapp = WhatsAppSender()
-        self.calculator = Calculator()
-        self.file_ops = FileOperations()
-        self.web_auto = WebAutomation()
-        self.games = Games()
-        self.smart_reply = SmartReply()
+        # Subsystems may be created by the prefetch thread as well as by commands
+        self._subsystem_locks = {name: threading.Lock() for name in self._subsystems}
+        
+        # Initialize the speech engine (or use the injected one); every other
+        # module is created on first use and shares this engine
+        self._owns_speech = speech is None
+        self.speech = speech or get_speech_engine()
         
         # Assistant properties
         self.name = "Jarvis"  # You can change the name
@@ -51,8 +132,52 @@ class PersonalAssistant:
         # Command history
         self.command_history = []
         
-        # Welcome message
-        self.speech.speak(f"Hello, I am {self.name}, your personal assistant. How can I help you today?")
+        # Intent name -> handler, and the span each handler is traced under
+        self._handlers = self._build_handlers()
+        self._handler_spans = {intent: f"handler.{intent or 'smart_reply'}" for intent in self._handlers}
+        
+        # Optional Prometheus endpoint (ASSISTANT_METRICS_PORT, needs ASSISTANT_METRICS=1)
+        port = os.getenv('ASSISTANT_METRICS_PORT')
+        if port and metrics.is_enabled():
+            metrics.start_http_server(int(port))
+        
+        # Welcome message (rendered to the phrase cache for the next start)
+        greeting = f"Hello, I am {self.name}, your personal assistant. How can I help you today?"
+        self.speech.speak(greeting)
+        self.speech.warm_phrases([greeting])
+        
+        # Timers saved by the last run only fire once the utility module
+        # (and its scheduler) exists, so load it now if there are any
+        if os.path.exists(TIMERS_FILE):
+            self.utility
+        
+        # Optional warm-up of the weather and news cache (HOME_CITY, PREFETCH_NEWS), run
+        # entirely in the background so the greeting and first command never wait for it
+        self.prefetcher = None
+        config = prefetch.config_from_env()
+        if config:
+            self.prefetcher = prefetch.Prefetcher(
+                lambda: self.utility.prefetch_jobs(config.home_city, config.categories, within=config.interval),
+                config.interval).start()
+    
+    def __getattr__(self, name):
+        """Create a subsystem the first time a command is routed to it"""
+        subsystems = type(self)._subsystems
+        if name not in subsystems:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        
+        with self._subsystem_locks[name]:
+            # Another thread may have created it while this one waited
+            if name in self.__dict__:
+                return self.__dict__[name]
+                
+            module_name, class_name, takes_speech = subsystems[name]
+            cls = getattr(importlib.import_module(module_name), class_name)
+            instance = cls(speech=self.speech) if takes_speech else cls()
+            
+            # Cache on the instance so __getattr__ isn't hit again
+            setattr(self, name, instance)
+            return instance
     
     def listen(self):
         """Listen for user commands"""
@@ -69,126 +194,155 @@ class PersonalAssistant:
         # Log the command
         print(f"Command: {command}")
         
-        # Check for exit commands
-        if "bye" in command or "goodbye" in command or "exit" in command or "quit" in command:
-            self.speech.speak(f"Goodbye {self.user}. Have a nice day!")
-            sys.exit()
-        
-        # Basic greeting responses
-        elif any(greeting in command for greeting in ["hello", "hi", "hey"]):
-            self.speech.speak(f"Hello {self.user}. How can I help you?")
-        
-        # Time queries
-        elif "what time" in command or "current time" in command:
-            current_time = datetime.datetime.now().strftime("%I:%M %p")
-            self.speech.speak(f"The current time is {current_time}")
-        
-        # Date queries
-        elif "what date" in command or "what day" in command or "current date" in command:
-            current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
-            self.speech.speak(f"Today is {current_date}")
-        
-        # Math calculations
-        elif any(term in command for term in ["calculate", "what is", "solve", "computation", "binary of", "factorial", "sin", "cos", "log"]):
-            self.calculator.process_calculation(command)
-        
-        # Web searches
-        elif any(term in command for term in ["search for", "search", "look up", "find", "google"]):
-            search_query = command.replace("search for", "").replace("search", "").replace("look up", "").replace("find", "").replace("google", "").strip()
-            self.browser.google_search(search_query)
-        
-        # Wikipedia searches
-        elif "wikipedia" in command or "who is" in command:
-            search_query = command.replace("wikipedia", "").replace("who is", "").strip()
-            self.browser.wikipedia_search(search_query)
-        
-        # YouTube playback
-        elif "play" in command and "youtube" in command:
-            video_query = command.replace("play", "").replace("on youtube", "").replace("youtube", "").strip()
-            self.browser.play_youtube(video_query)
-        
-        # Email functionality
-        elif "send an email" in command or "send email" in command:
-            self.email.send_email_workflow()
-        
-        # WhatsApp messaging
-        elif "send a whatsapp message" in command or "send whatsapp" in command:
-            self.whatsapp.send_whatsapp_workflow()
-        
-        # File operations
-        elif any(term in command for term in ["create a file", "create file", "new file"]):
-            if "python" in command:
-                self.file_ops.create_file("python")
-            elif "java" in command:
-                self.file_ops.create_file("java")
-            elif "html" in command:
-                self.file_ops.create_file("html")
-            elif "text" in command or "txt" in command:
-                self.file_ops.create_file("text")
-            else:
-                self.speech.speak("What type of file would you like to create? Python, Java, HTML, or Text?")
-        
-        # Web automation
-        elif "create a html project" in command or "create html project" in command:
-            self.web_auto.create_html_project()
-        
-        # System information
-        elif "system information" in command or "system info" in command:
-            self.system.get_system_info()
-        
-        # Battery information
-        elif "battery" in command:
-            self.system.get_battery_info()
-        
-        # Take photo/selfie
-        elif "take a selfie" in command or "click a photo" in command or "take photo" in command:
-            self.system.take_photo()
-        
-        # Screenshot
-        elif "take a screenshot" in command or "screenshot" in command:
-            self.system.take_screenshot()
-        
-        # Volume control
-        elif "increase volume" in command or "volume up" in command:
-            self.system.adjust_volume("up")
-        elif "decrease volume" in command or "volume down" in command:
-            self.system.adjust_volume("down")
-        elif "mute volume" in command or "mute" in command:
-            self.system.adjust_volume("mute")
-        elif "full volume" in command or "maximum volume" in command:
-            self.system.adjust_volume("max")
-        
-        # Games
-        elif "let's play a game" in command or "play game" in command or "game" in command:
-            self.games.choose_game()
-        
-        # Timer functionality
-        elif "set a timer" in command or "timer" in command:
-            time_str = command.replace("set a timer for", "").replace("timer for", "").replace("set timer for", "").strip()
-            self.utility.set_timer(time_str)
-        
-        # Weather information
-        elif "weather" in command:
-            self.utility.get_weather()
-        
-        # News updates
-        elif "news" in command:
-            self.utility.get_news()
-        
-        # Jokes
-        elif "joke" in command or "tell me a joke" in command:
-            self.utility.tell_joke()
-        
-        # Todo list
-        elif "add to my list" in command or "add to list" in command:
-            item = command.replace("add to my list", "").replace("add to list", "").strip()
-            self.utility.add_to_todo(item)
-        elif "show my list" in command or "show list" in command:
-            self.utility.show_todo()
-        
-        # Handle unknown commands with smart replies
+        # Barge-in: cut the current utterance short
+        if command.strip(" .!") in BARGE_IN_PHRASES:
+            self.speech.stop_speaking()
+            return
+        
+        with metrics.span("process_command"):
+            # Route to the first matching intent (a single scan of the command)
+            with metrics.span("route"):
+                match = COMMAND_ROUTER.route(command)
+            with metrics.span(self._handler_spans[match.intent]):
+                self._handlers[match.intent](match)
+    
+    def _build_handlers(self):
+        """Map intent names to handlers; subsystems are resolved lazily at call time"""
+        return {
+            "exit": self.exit,
+            "greeting": lambda match: self.speech.speak(f"Hello {self.user}. How can I help you?"),
+            "time": self.tell_time,
+            "date": self.tell_date,
+            "calculate": lambda match: self.calculator.process_calculation(match.command),
+            "file_stats": lambda match: self.calculator.process_file_statistics(match.command),
+            "search": lambda match: self.browser.google_search(match.argument),
+            "wikipedia": lambda match: self.browser.wikipedia_search(match.argument),
+            "youtube": lambda match: self.browser.play_youtube(match.argument),
+            "email": lambda match: self.email.send_email_workflow(),
+            "whatsapp": lambda match: self.whatsapp.send_whatsapp_workflow(),
+            "create_file": self.create_file,
+            "html_project": lambda match: self.web_auto.create_html_project(),
+            "system_info": lambda match: self.system.get_system_info(),
+            "battery": lambda match: self.system.get_battery_info(),
+            "photo": lambda match: self.system.take_photo(),
+            "screenshot": lambda match: self.system.take_screenshot(),
+            "volume_up": lambda match: self.system.adjust_volume("up"),
+            "volume_down": lambda match: self.system.adjust_volume("down"),
+            "mute": lambda match: self.system.adjust_volume("mute"),
+            "volume_max": lambda match: self.system.adjust_volume("max"),
+            "game": lambda match: self.games.choose_game(),
+            "timer": lambda match: self.utility.set_timer(match.command),
+            "timer_cancel": lambda match: self.utility.cancel_timer(match.command),
+            "timer_snooze": lambda match: self.utility.snooze_timer(match.command),
+            "timer_list": lambda match: self.utility.list_timers(),
+            "reminder": lambda match: self.utility.set_reminder(match.command),
+            "weather": lambda match: self.utility.get_weather(match.command),
+            "news_digest": lambda match: self.utility.get_news_digest(),
+            "read_article": lambda match: self.utility.read_article(match.command),
+            "news": lambda match: self.utility.get_news(),
+            "joke": lambda match: self.utility.tell_joke(),
+            "todo_add": lambda match: self.utility.add_to_todo(match.argument),
+            "todo_show": lambda match: self.utility.show_todo(),
+            "todo_complete": lambda match: self.utility.complete_todo(match.command),
+            "todo_remove": lambda match: self.utility.remove_todo(match.command),
+            "todo_find": lambda match: self.utility.find_todo(match.command),
+            # Handle unknown commands with smart replies
+            None: lambda match: self.smart_reply.generate_response(match.command),
+        }
+    
+    def exit(self, match=None):
+        """Say goodbye and exit"""
+        self.speech.speak(f"Goodbye {self.user}. Have a nice day!")
+        self.shutdown()
+        sys.exit()
+    
+    def tell_time(self, match=None):
+        """Speak the current time"""
+        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        self.speech.speak(f"The current time is {current_time}")
+    
+    def tell_date(self, match=None):
+        """Speak the current date"""
+        current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
+        self.speech.speak(f"Today is {current_date}")
+    
+    def create_file(self, match):
+        """Create a file of the type named in the command"""
+        if match.choice:
+            self.file_ops.create_file(match.choice)
         else:
-            self.smart_reply.generate_response(command)
+            self.speech.speak("What type of file would you like to create? Python, Java, HTML, or Text?")
+    
+    def shutdown(self):
+        """Release shared resources before exiting"""
+        stats = self.speech.latency_stats()
+        if stats["count"]:
+            print(f"Time to first audio: p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms over {stats['count']} utterances")
+        stats = self.speech.dispatch_latency_stats()
+        if stats["count"]:
+            print(f"End of speech to dispatch: p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms over {stats['count']} commands")
+        calculator = self.__dict__.get("calculator")
+        if calculator is not None:
+            info = calculator.cache_info()
+            if info.hits or info.misses:
+                print(f"Calculator cache: {info.hits} hits, {info.misses} misses, {info.evictions} evictions, {info.currsize}/{info.maxsize} entries")
+        utility = self.__dict__.get("utility")
+        if utility is not None:
+            for source in utility.responses.sources():
+                info = utility.responses.cache_info(source)
+                print(f"{source.capitalize()} cache: {info.hits} hits, {info.stale_hits} stale hits, {info.misses} misses, "
+                      f"{info.refreshes} background refreshes, {info.errors} errors")
+        
+        # Snapshot the traced stages (ASSISTANT_METRICS_FILE)
+        if metrics.is_enabled():
+            metrics.registry.write_json(os.getenv('ASSISTANT_METRICS_FILE', os.path.join("assets", "data", "metrics.json")))
+        
+        # Stop refreshing the cache before the utility module closes it
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        
+        # Save pending timers and close the todo and response databases if the utility module was loaded
+        utility = self.__dict__.get("utility")
+        if utility is not None:
+            utility.close()
+        
+        # Close the Wikipedia cache if the browser module was loaded
+        browser = self.__dict__.get("browser")
+        if browser is not None:
+            browser.close()
+        
+        # Close pooled HTTP connections if any module made a request
+        http_client = sys.modules.get("modules.http_client")
+        if http_client is not None:
+            http_client.close_http_client()
+        
+        # Stop the math worker processes if a heavy calculation started them
+        heavy_math = sys.modules.get("modules.heavy_math")
+        if heavy_math is not None:
+            heavy_math.shutdown_math_pool()
+        
+        # An injected engine is closed by whoever created it
+        if self._owns_speech:
+            shutdown_speech_engine()
+    
+    def run_headless(self):
+        """Process every command from the headless input stream, then exit"""
+        while True:
+            start = time.perf_counter()
+            try:
+                command = self.listen()
+            except Exception as e:
+                # One bad command shouldn't stop a batch run
+                self.speech.record("error", error=f"{type(e).__name__}: {e}")
+                continue
+                
+            if command is None:
+                if self.speech.exhausted:
+                    break
+                continue
+            self.speech.record("done", elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
+            
+        self.shutdown()
     
     def run(self):
         """Main execution loop"""
@@ -201,15 +355,31 @@ class PersonalAssistant:
         
         # Main loop
         try:
+            # The background listener queues phrases, so no pause between turns
             while True:
-                command = self.listen()
-                if not command:
-                    # If no command was detected, wait a bit
-                    time.sleep(0.5)
+                self.listen()
         except KeyboardInterrupt:
             print("\nExiting Personal Assistant...")
             self.speech.speak("Goodbye!")
+            self.shutdown()
 
 if __name__ == "__main__":
-    assistant = PersonalAssistant()
-    assistant.run()
+    parser = argparse.ArgumentParser(description="Voice-controlled personal assistant")
+    parser.add_argument("--headless", action="store_true",
+                        help="read commands as text and write responses as JSON records to stdout")
+    parser.add_argument("--input", help="headless command file (plain text or JSONL); defaults to stdin")
+    args = parser.parse_args()
+    
+    if args.headless:
+        from modules.headless import HeadlessSpeech
+        
+        # stdout carries only the JSON records; other output goes to stderr
+        records = sys.stdout
+        sys.stdout = sys.stderr
+        
+        input_stream = open(args.input) if args.input else sys.stdin
+        assistant = PersonalAssistant(speech=HeadlessSpeech(input_stream, records))
+        assistant.run_headless()
+    else:
+        assistant = PersonalAssistant()
+        assistant.run()
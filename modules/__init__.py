@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 # __init__.py makes the directory a Python package
 
-# Import all modules to make them available
-from . import speech_engine
-from . import security
-from . import browser
-from . import os_functions
-from . import utility
-from . import email_sender
-from . import whatsapp_sender
-from . import calculations
-from . import file_operations
-from . import web_automation
-from . import games
-from . import smart_reply
+import importlib
+
+# Feature modules are imported on first access so that heavy dependencies
+# (cv2, tkinter, wikipedia, bs4, ...) are only loaded when actually needed
+_submodules = (
+    "speech_engine",
+    "security",
+    "browser",
+    "os_functions",
+    "utility",
+    "email_sender",
+    "whatsapp_sender",
+    "calculations",
+    "file_operations",
+    "web_automation",
+    "games",
+    "smart_reply",
+)
+
+def __getattr__(name):
+    """Import a feature module the first time it is accessed"""
+    if name in _submodules:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_submodules))
 
 # Version information
 __version__ = "1.0.0"
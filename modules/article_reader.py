@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# Article Reader Module - Background download and text extraction of news articles
+
+import re
+import codecs
+import threading
+from collections import namedtuple
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeout
+from modules.memo import LRUCache, MISSING
+
+# The readable part of an article page: its body paragraphs and the page's
+# own summary (og:description), read when no paragraphs were found
+Article = namedtuple("Article", "url paragraphs description")
+
+# Articles (or their downloads in progress) kept for follow-up questions
+CACHED_ARTICLES = 32
+
+# Most bytes read from a page: the story comes long before the comments,
+# related links and scripts that fill the rest of it
+MAX_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+
+# Shorter paragraphs are captions, bylines and buttons
+MIN_PARAGRAPH_WORDS = 8
+
+# An <article> with fewer words of paragraphs is a card or teaser, not the story
+MIN_STORY_WORDS = 50
+
+_BOILERPLATE = re.compile(r"cookie|subscribe|sign up|newsletter|all rights reserved|enable javascript|"
+                          r"advertisement|your browser", re.I)
+_SPACES = re.compile(r"\s+")
+_CHARSET = re.compile(r"""charset=["']?([\w-]+)""", re.I)
+
+def _page_encoding(head, charset=None):
+    """The charset given (from the Content-Type header), else the one the page's <meta> declares, else UTF-8"""
+    if not charset:
+        declared = _CHARSET.search(head[:2048].decode("ascii", "ignore"))
+        charset = declared.group(1) if declared else "utf-8"
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return "utf-8"
+
+class _ArticleParser(HTMLParser):
+    """Collects the paragraphs and summary of an article page as it is fed, chunk by chunk
+    
+    Paragraphs are grouped by the outermost <article> they are in: nested
+    ones (related-story cards) are part of it, not its end. complete is set
+    once an outermost <article> holding MIN_STORY_WORDS words has closed,
+    so the rest of the page needn't be read.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.complete = False
+        self.description = None
+        # Paragraphs per outermost <article>, then in <main>, then anywhere else
+        self._articles = []
+        self._main = []
+        self._other = []
+        self._article_depth = 0
+        self._main_depth = 0
+        self._paragraph = None
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == "p":
+            self._end_paragraph()
+            self._paragraph = []
+        elif tag == "br" and self._paragraph is not None:
+            self._paragraph.append(" ")
+        elif tag == "article":
+            self._end_paragraph()
+            if not self._article_depth:
+                self._articles.append([])
+            self._article_depth += 1
+        elif tag == "main":
+            self._main_depth += 1
+        elif tag == "meta" and self.description is None:
+            attrs = dict(attrs)
+            if attrs.get("property") == "og:description" or attrs.get("name") == "description":
+                self.description = _SPACES.sub(" ", attrs.get("content") or "").strip() or None
+    
+    def handle_endtag(self, tag):
+        if tag == "p":
+            self._end_paragraph()
+        elif tag == "article" and self._article_depth:
+            self._end_paragraph()
+            self._article_depth -= 1
+            if not self._article_depth and _words(self._articles[-1]) >= MIN_STORY_WORDS:
+                self.complete = True
+        elif tag == "main" and self._main_depth:
+            self._end_paragraph()
+            self._main_depth -= 1
+    
+    def handle_data(self, data):
+        if self._paragraph is not None:
+            self._paragraph.append(data)
+    
+    def _end_paragraph(self):
+        if self._paragraph is None:
+            return
+        text = _SPACES.sub(" ", "".join(self._paragraph)).strip()
+        self._paragraph = None
+        if len(text.split()) < MIN_PARAGRAPH_WORDS or _BOILERPLATE.search(text):
+            return
+        if self._article_depth:
+            self._articles[-1].append(text)
+        elif self._main_depth:
+            self._main.append(text)
+        else:
+            self._other.append(text)
+    
+    def article(self, url):
+        """The Article read so far: the largest <article>, else <main>, else every paragraph"""
+        self._end_paragraph()
+        story = max(self._articles, key=_words, default=None)
+        paragraphs = story or self._main or self._other
+        return Article(url, list(dict.fromkeys(paragraphs)), self.description)
+
+def _words(paragraphs):
+    return sum(len(text.split()) for text in paragraphs)
+
+def extract_article(html, url=None, encoding=None):
+    """Return the Article in an HTML page (bytes or text)"""
+    if isinstance(html, bytes):
+        html = html.decode(_page_encoding(html, encoding), errors="replace")
+    parser = _ArticleParser()
+    parser.feed(html)
+    parser.close()
+    return parser.article(url)
+
+class ArticleReader:
+    """Downloads articles on a small thread pool before they are asked for
+    
+    prefetch() starts downloading the pages behind headlines as soon as
+    they are known; get() returns the extracted Article, waiting only if
+    its download is still running. Pages are streamed into the parser as
+    they arrive and only read up to the end of their story's <article> (or
+    MAX_BYTES).
+    """
+    
+    def __init__(self, http, workers=4, cached=CACHED_ARTICLES):
+        self.http = http
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="articles")
+        # url -> Future of its Article (None if it couldn't be read)
+        self._downloads = LRUCache(cached)
+        self._lock = threading.Lock()
+    
+    def prefetch(self, urls):
+        """Start downloading every URL not already downloaded or downloading (failed ones are tried again)"""
+        with self._lock:
+            for url in urls:
+                if not url:
+                    continue
+                future = self._downloads.get(url)
+                if future is not MISSING and not (future.done() and (future.cancelled() or future.result() is None)):
+                    continue
+                try:
+                    self._downloads.put(url, self._executor.submit(self._download, url))
+                except RuntimeError:
+                    # Shutting down
+                    return
+    
+    def get(self, url, timeout=None):
+        """Return the Article for a URL, or None if it couldn't be read in time"""
+        self.prefetch([url])
+        future = self._downloads.get(url)
+        if future is MISSING:
+            return None
+        try:
+            return future.result(timeout)
+        except (FutureTimeout, CancelledError):
+            return None
+    
+    def _download(self, url):
+        try:
+            response = self.http.get("articles", url, stream=True)
+        except Exception as e:
+            print(f"Article error ({url}): {e}")
+            return None
+            
+        try:
+            content_type = response.headers.get("Content-Type", "text/html")
+            if response.status_code != 200 or "html" not in content_type:
+                return None
+            
+            # Parse each chunk as it arrives, until the story's </article> has gone by (or MAX_BYTES)
+            charset = _CHARSET.search(content_type)
+            parser = _ArticleParser()
+            decoder = None
+            size = 0
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if decoder is None:
+                    encoding = _page_encoding(chunk, charset.group(1) if charset else None)
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                parser.feed(decoder.decode(chunk))
+                size += len(chunk)
+                if parser.complete or size >= MAX_BYTES:
+                    break
+            parser.close()
+            return parser.article(url)
+        except Exception as e:
+            print(f"Article error ({url}): {e}")
+            return None
+        finally:
+            response.close()
+    
+    def close(self):
+        """Cancel queued downloads (running ones end at their HTTP deadline on their own)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -2,18 +2,35 @@
 # Browser Module - Web-related functionality
 
 import webbrowser
-import wikipedia
 import requests
 from youtube_search import YoutubeSearch
 import time
 import os
 from bs4 import BeautifulSoup
+from modules.http_client import get_http_client, ServiceUnavailable
+from modules.wiki_lookup import WikiLookup
+from modules.wiki_offline import OfflineWiki, WIKI_INDEX_FILE
 
 class WebBrowser:
-    def __init__(self):
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
+        
         # Set up the default browser
         self.browser = webbrowser.get()
         
+        # Wikipedia summaries, one request per new topic and remembered on disk
+        self.wiki = WikiLookup(get_http_client())
+        
+        # The local abstracts index answers when Wikipedia can't be reached
+        # (built with python -m modules.wiki_offline), and only it with WIKI_OFFLINE=1
+        index = os.getenv("WIKI_OFFLINE_INDEX", WIKI_INDEX_FILE)
+        self.offline_wiki = OfflineWiki(index) if os.path.exists(index) else None
+        self.offline_only = os.getenv("WIKI_OFFLINE") == "1"
+        
         # Common URLs
         self.urls = {
             'google': 'https://www.google.com/search?q=',
@@ -24,48 +41,78 @@ class WebBrowser:
     
     def google_search(self, query):
         """Search Google for a query"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         search_url = self.urls['google'] + query.replace(' ', '+')
-        speech.speak(f"Searching Google for {query}")
+        self.speech.speak(f"Searching Google for {query}")
         self.browser.open(search_url)
     
     def wikipedia_search(self, query):
         """Search Wikipedia for a query"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         try:
-            speech.speak(f"Searching Wikipedia for {query}")
-            result = wikipedia.summary(query, sentences=3)
-            speech.speak("According to Wikipedia:")
-            speech.speak(result)
-            
-            # Open the Wikipedia page in browser
-            page = wikipedia.page(query)
-            self.browser.open(page.url)
+            # Topics asked about before are answered from the cache, without a request
+            page = self.wiki.cached(query)
+            if self.offline_only:
+                # No network: what was looked up before, otherwise the offline index
+                if page is None:
+                    page = self._offline_lookup(query)
+            elif page is None or page.state != "fresh":
+                self.speech.speak(f"Searching Wikipedia for {query}")
+                try:
+                    page = self.wiki.lookup(query)
+                except ServiceUnavailable:
+                    # Never looked up before: the offline index, if it has the topic
+                    page = self._offline_lookup(query)
+                    if page is None:
+                        raise
             
-        except wikipedia.exceptions.DisambiguationError as e:
-            speech.speak("There are multiple results for your query. Please be more specific.")
-            options = e.options[:5]  # First 5 options
-            speech.speak("Some options are: " + ", ".join(options))
-            
-        except wikipedia.exceptions.PageError:
-            speech.speak(f"Sorry, I couldn't find any Wikipedia page for {query}")
-            self.google_search(query)  # Fall back to Google search
+            if page is None and self.offline_only:
+                self.speech.speak(f"Sorry, {query} isn't in my offline copy of Wikipedia")
+                
+            elif page is None:
+                self.speech.speak(f"Sorry, I couldn't find any Wikipedia page for {query}")
+                self.google_search(query)  # Fall back to Google search
+                
+            elif page.disambiguation:
+                self.speech.speak("There are multiple results for your query. Please be more specific.")
+                options = page.options[:5]  # First 5 options
+                self.speech.speak("Some options are: " + ", ".join(options))
+                
+            else:
+                if page.state == "offline":
+                    self.speech.speak(f"From my offline copy of Wikipedia, on {page.title}:")
+                    self.speech.speak(page.summary)
+                    return
+                    
+                if page.state == "stale" and not self.offline_only:
+                    self.speech.speak("I can't reach Wikipedia right now, but I looked this up before.")
+                if page.summary:
+                    self.speech.speak("According to Wikipedia:")
+                    self.speech.speak(page.summary)
+                else:
+                    self.speech.speak(f"Wikipedia has a page on {page.title}, but it has no summary I can read.")
+                
+                # Open the Wikipedia page in browser
+                if not self.offline_only:
+                    self.browser.open(page.url)
+                
+        except ServiceUnavailable as e:
+            self.speech.speak("Wikipedia isn't responding right now. Please try again in a little while.")
+            print(f"Wikipedia search error: {e}")
             
         except Exception as e:
-            speech.speak("I encountered an error while searching Wikipedia.")
+            self.speech.speak("I encountered an error while searching Wikipedia.")
             print(f"Wikipedia search error: {e}")
     
+    def _offline_lookup(self, query):
+        """The best page in the offline index for a query, or None"""
+        if self.offline_wiki is None:
+            return None
+        pages = self.offline_wiki.search(query)
+        return pages[0] if pages else None
+    
     def play_youtube(self, query):
         """Search YouTube and play the first result"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         try:
-            speech.speak(f"Searching YouTube for {query}")
+            self.speech.speak(f"Searching YouTube for {query}")
             
             # Search for videos
             results = YoutubeSearch(query, max_results=1).to_dict()
@@ -75,55 +122,43 @@ class WebBrowser:
                 video_url = f"https://www.youtube.com/watch?v={video_id}"
                 video_title = results[0]['title']
                 
-                speech.speak(f"Playing {video_title} on YouTube")
+                self.speech.speak(f"Playing {video_title} on YouTube")
                 self.browser.open(video_url)
             else:
-                speech.speak(f"Sorry, I couldn't find any YouTube videos for {query}")
+                self.speech.speak(f"Sorry, I couldn't find any YouTube videos for {query}")
                 
         except Exception as e:
-            speech.speak("I encountered an error while searching YouTube.")
+            self.speech.speak("I encountered an error while searching YouTube.")
             print(f"YouTube search error: {e}")
     
     def show_images(self, query):
         """Search for images"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         search_url = self.urls['images'] + query.replace(' ', '+')
-        speech.speak(f"Showing images of {query}")
+        self.speech.speak(f"Showing images of {query}")
         self.browser.open(search_url)
     
     def open_maps(self, location):
         """Open Google Maps with a location"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         maps_url = self.urls['maps'] + location.replace(' ', '+')
-        speech.speak(f"Opening Google Maps for {location}")
+        self.speech.speak(f"Opening Google Maps for {location}")
         self.browser.open(maps_url)
     
     def get_directions(self, origin=None, destination=None):
         """Get directions from origin to destination"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         if not origin:
-            speech.speak("What is your starting location?")
-            origin = input("Starting location: ")  # For simplicity, using input() instead of speech recognition
+            self.speech.speak("What is your starting location?")
+            origin = self.speech.ask("Starting location: ")
         
         if not destination:
-            speech.speak("What is your destination?")
-            destination = input("Destination: ")
+            self.speech.speak("What is your destination?")
+            destination = self.speech.ask("Destination: ")
         
         directions_url = f"https://www.google.com/maps/dir/{origin.replace(' ', '+')}/{destination.replace(' ', '+')}"
-        speech.speak(f"Getting directions from {origin} to {destination}")
+        self.speech.speak(f"Getting directions from {origin} to {destination}")
         self.browser.open(directions_url)
     
     def open_website(self, site_name):
         """Open a specific website"""
-        from modules.speech_engine import SpeechEngine
-        speech = SpeechEngine()
-        
         # Dictionary of common websites
         websites = {
             'google': 'https://www.google.com',
@@ -141,9 +176,15 @@ class WebBrowser:
         site_name = site_name.lower()
         if site_name in websites:
             url = websites[site_name]
-            speech.speak(f"Opening {site_name}")
+            self.speech.speak(f"Opening {site_name}")
             self.browser.open(url)
         else:
             # If not found, try to guess the URL
-            speech.speak(f"Opening {site_name}")
+            self.speech.speak(f"Opening {site_name}")
             self.browser.open(f"https://www.{site_name}.com")
+    
+    def close(self):
+        """Close the Wikipedia cache and offline index"""
+        self.wiki.close()
+        if self.offline_wiki is not None:
+            self.offline_wiki.close()
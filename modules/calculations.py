@@ -1,207 +1,231 @@
 #!/usr/bin/env python3
 # Calculations Module - Math operations
 
+import os
 import math
-import re
+from modules import heavy_math
+from modules import math_grammar
+from modules.math_grammar import Number, Call, Log, Shift, Range
+from modules.safe_eval import EvaluationError, LimitExceeded
+from modules.heavy_math import describe, NumberSummary
+from modules.memo import LRUCache, MISSING
+
+# Spoken names for calls and angle units
+_CALL_NAMES = {"sin": "sine", "cos": "cosine", "tan": "tangent", "sqrt": "square root"}
+_UNIT_NAMES = {"deg": "degrees", "rad": "radians", None: "radians"}
 
 class Calculator:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
+        
+        # Results of earlier calculations, keyed on their expression trees
+        # (MATH_CACHE_SIZE entries; 0 turns it off)
+        self.memo = LRUCache(int(os.getenv('MATH_CACHE_SIZE', '256')))
+    
+    def cache_info(self):
+        """Return the result cache's hit, miss and eviction counters"""
+        return self.memo.cache_info()
+    
+    def memoized(self, tree, compute):
+        """Return compute(tree), reusing the result of an earlier calculation of the same tree"""
+        return self.memo.get_or_compute(math_grammar.cache_key(tree), lambda: compute(tree))
     
     def evaluate_expression(self, expression):
-        """Safely evaluate a mathematical expression"""
-        # Replace words with symbols
-        expression = expression.lower().replace('plus', '+').replace('minus', '-')
-        expression = expression.replace('times', '*').replace('multiplied by', '*')
-        expression = expression.replace('divided by', '/').replace('over', '/')
-        expression = expression.replace('power', '**').replace('to the power of', '**')
-        
-        # Remove any characters that aren't digits, operators, or decimals
-        expression = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-        
-        # Remove extra spaces
-        expression = expression.replace(' ', '')
-        
+        """Safely evaluate a mathematical expression (raises LimitExceeded if it is too large)"""
         try:
-            # Evaluate the expression
-            result = eval(expression)
-            return result
-        except:
+            result = self.memoized(math_grammar.parse(expression), math_grammar.evaluate)
+        except LimitExceeded:
+            raise
+        except EvaluationError:
             return None
+        # A summary cached by calculate() is too large for in-line evaluation
+        if isinstance(result, NumberSummary):
+            raise LimitExceeded("result too large")
+        return result
     
     def factorial(self, n):
-        """Calculate the factorial of a number"""
+        """Calculate the factorial of a number (a NumberSummary if it is too large to write out), or None"""
         try:
-            n = int(n)
-            if n < 0:
-                return None
-            return math.factorial(n)
-        except:
+            return self.calculate(Call("factorial", Number(int(n)), None))
+        except (TypeError, ValueError):
+            # EvaluationError and LimitExceeded are ValueErrors too
             return None
     
+    def run_heavy(self, job, *args, estimate=None):
+        """Run a CPU-heavy job in the math process pool
+        
+        Returns the job's result (big integers come back summarized), or the
+        estimate if the job times out. Returns None if there is no estimate.
+        """
+        pool = heavy_math.get_math_pool()
+        try:
+            return pool.run(job, *args, on_slow=lambda: self.speech.speak("That's a big one, give me a moment."))
+        except TimeoutError:
+            return estimate() if estimate else None
+    
     def binary(self, n):
         """Convert a number to binary"""
         try:
-            n = int(n)
-            return bin(n)[2:]  # Remove the '0b' prefix
-        except:
+            return self.calculate(Call("binary", Number(int(n)), None))
+        except (TypeError, ValueError):
             return None
     
+    def calculate(self, tree):
+        """Evaluate an expression tree, reusing earlier results and moving ones too big for in-line work to the math pool
+        
+        Raises LimitExceeded if the result is too large even for the pool and
+        can't be estimated.
+        """
+        key = math_grammar.cache_key(tree)
+        result = self.memo.get(key)
+        if result is MISSING:
+            result = self._calculate(tree)
+            # Estimates stand in for jobs that ran out of time, which depends
+            # on the machine's load: only exact results are reused
+            if not (isinstance(result, NumberSummary) and result.approximate):
+                self.memo.put(key, result)
+        return result
+    
+    def _calculate(self, tree):
+        """Evaluate an expression tree in-line, then in the math pool, then by estimate"""
+        try:
+            return math_grammar.evaluate(tree)
+        except LimitExceeded:
+            pass
+        
+        # Retry with the larger limits in a worker process
+        try:
+            result = self.run_heavy(heavy_math.evaluate_job, tree, estimate=lambda: heavy_math.estimate(tree))
+        except LimitExceeded:
+            result = heavy_math.estimate(tree)
+        if result is None:
+            raise LimitExceeded("result too large")
+        return result
+    
     def process_calculation(self, command):
         """Process various math calculations based on the command"""
-        command = command.lower()
-        result = None
-        
-        # Basic arithmetic
-        if any(op in command for op in ['plus', 'minus', 'times', 'divided by', 'multiplied by']):
-            # Extract the expression from the command
-            expression = command.replace("calculate", "").replace("what is", "").strip()
-            result = self.evaluate_expression(expression)
+        try:
+            tree = math_grammar.parse(command)
+        except EvaluationError:
+            self.speech.speak("I couldn't understand what calculation you want me to perform.")
+            return
             
-            if result is not None:
-                self.speech.speak(f"The result is {result}")
-            else:
-                self.speech.speak("I couldn't calculate that. Please try again.")
-        
-        # Factorial
-        elif "factorial" in command:
-            match = re.search(r'factorial\s+(\d+)', command)
-            if not match:
-                match = re.search(r'factorial\s+of\s+(\d+)', command)
+        # "sine of 0 to 90 in steps of 15": a whole table at once
+        if isinstance(tree, Range):
+            self.process_table(tree)
+            return
             
-            if match:
-                n = int(match.group(1))
-                result = self.factorial(n)
-                if result is not None:
-                    self.speech.speak(f"The factorial of {n} is {result}")
-                else:
-                    self.speech.speak("I couldn't calculate that factorial.")
-            else:
-                self.speech.speak("Please specify a number for the factorial calculation.")
+        try:
+            result = self.calculate(tree)
+        except LimitExceeded:
+            self.speech.speak("That number is too large for me to calculate.")
+            return
+        except EvaluationError:
+            self.speech.speak("I couldn't calculate that. Please try again.")
+            return
+            
+        self.speech.speak(self.spoken_result(tree, result))
+    
+    def process_table(self, tree):
+        """Evaluate a function over a range in one vectorized call, show the table and speak a summary"""
+        # NumPy is only loaded by the first table
+        from modules import math_tables
         
-        # Binary conversion
-        elif "binary" in command:
-            match = re.search(r'binary\s+of\s+(\d+)', command)
-            if not match:
-                match = re.search(r'binary\s+(\d+)', command)
+        try:
+            x, values = math_tables.evaluate_range(tree)
+        except LimitExceeded:
+            self.speech.speak("That range is too large for me to calculate.")
+            return
+        except EvaluationError:
+            self.speech.speak("I couldn't calculate that range. Please try again.")
+            return
             
-            if match:
-                n = int(match.group(1))
-                result = self.binary(n)
-                if result is not None:
-                    self.speech.speak(f"The binary representation of {n} is {result}")
-                else:
-                    self.speech.speak("I couldn't convert that number to binary.")
-            else:
-                self.speech.speak("Please specify a number for the binary conversion.")
+        self.speech.show(math_tables.format_table(tree, x, values))
+        self.speech.speak(math_tables.spoken_summary(tree, x, values))
+    
+    def process_file_statistics(self, command):
+        """Stream a statistic over the numbers in a file ("average of column price in sales.csv")"""
+        # NumPy is only loaded by the first file statistic; file contents
+        # change between commands, so these results are never memoized
+        from modules import file_stats
+        from modules.file_operations import FILES_DIR
         
-        # Trigonometric functions
-        elif any(func in command for func in ["sin", "cos", "tan"]):
-            # Sine
-            if "sin" in command:
-                match = re.search(r'sin\s+(\d+)', command)
-                if match:
-                    angle = int(match.group(1))
-                    # Convert to radians if in degrees
-                    if "degree" in command or "degrees" in command:
-                        angle_rad = math.radians(angle)
-                    else:
-                        angle_rad = angle
-                    
-                    result = math.sin(angle_rad)
-                    self.speech.speak(f"The sine of {angle} {'degrees' if 'degree' in command else 'radians'} is {result:.4f}")
+        request = file_stats.parse_command(command)
+        if request is None:
+            # "average" without a file name: treat it as a calculation
+            self.process_calculation(command)
+            return
             
-            # Cosine
-            elif "cos" in command:
-                match = re.search(r'cos\s+(\d+)', command)
-                if match:
-                    angle = int(match.group(1))
-                    # Convert to radians if in degrees
-                    if "degree" in command or "degrees" in command:
-                        angle_rad = math.radians(angle)
-                    else:
-                        angle_rad = angle
-                    
-                    result = math.cos(angle_rad)
-                    self.speech.speak(f"The cosine of {angle} {'degrees' if 'degree' in command else 'radians'} is {result:.4f}")
+        try:
+            path = file_stats.resolve_path(FILES_DIR, request.filename)
+            stats, rows, seconds = file_stats.scan_file(path, request.column)
+        except FileNotFoundError:
+            self.speech.speak(f"I couldn't find {request.filename} in your files.")
+            return
+        except file_stats.FileStatsError as error:
+            self.speech.speak(f"Sorry, {error}.")
+            return
+        except OSError:
+            self.speech.speak(f"I couldn't read {request.filename}.")
+            return
             
-            # Tangent
-            elif "tan" in command:
-                match = re.search(r'tan\s+(\d+)', command)
-                if match:
-                    angle = int(match.group(1))
-                    # Convert to radians if in degrees
-                    if "degree" in command or "degrees" in command:
-                        angle_rad = math.radians(angle)
-                    else:
-                        angle_rad = angle
-                    
-                    result = math.tan(angle_rad)
-                    self.speech.speak(f"The tangent of {angle} {'degrees' if 'degree' in command else 'radians'} is {result:.4f}")
-        
-        # Logarithm
-        elif "log" in command:
-            match = re.search(r'log\s+of\s+(\d+)', command)
-            if not match:
-                match = re.search(r'log\s+(\d+)', command)
+        what = f"column {request.column}" if request.column else "the numbers"
+        if not stats.count:
+            self.speech.speak(f"I didn't find any numbers in {what} of {request.filename}.")
+            return
             
-            if match:
-                n = float(match.group(1))
-                if "base" in command:
-                    base_match = re.search(r'base\s+(\d+)', command)
-                    if base_match:
-                        base = float(base_match.group(1))
-                        result = math.log(n, base)
-                        self.speech.speak(f"The logarithm of {n} with base {base} is {result:.4f}")
-                else:
-                    result = math.log10(n)
-                    self.speech.speak(f"The logarithm (base 10) of {n} is {result:.4f}")
-            else:
-                self.speech.speak("Please specify a number for the logarithm calculation.")
-        
-        # Square root
-        elif "square root" in command:
-            match = re.search(r'square\s+root\s+of\s+(\d+)', command)
-            if not match:
-                match = re.search(r'square\s+root\s+(\d+)', command)
+        rate = rows / seconds if seconds > 0 else float("inf")
+        self.speech.show(f"{stats.count:,} values from {rows:,} rows in {seconds:.2f} s ({rate:,.0f} rows per second)")
+        value = getattr(stats, file_stats.STATISTICS[request.statistic])
+        self.speech.speak(f"The {request.statistic} of {what} in {request.filename} is {_spoken_number(round(value, 4))}")
+    
+    def spoken_result(self, tree, result):
+        """Phrase the result of a calculation, naming the operation when it is a simple one"""
+        # Binary conversions
+        if isinstance(tree, Call) and tree.name == "binary" and isinstance(tree.argument, Number):
+            return f"The binary representation of {_spoken_number(tree.argument.value)} is {result}"
             
-            if match:
-                n = float(match.group(1))
-                result = math.sqrt(n)
-                self.speech.speak(f"The square root of {n} is {result:.4f}")
-            else:
-                self.speech.speak("Please specify a number for the square root calculation.")
+        if isinstance(result, float):
+            text = f"{result:.4f}"
+        else:
+            text = describe(result)
         
-        # Bit shifting
-        elif "shift" in command:
-            # Right shift
-            if "right shift" in command:
-                match = re.search(r'right\s+shift\s+(\d+)', command)
-                if match:
-                    n = int(match.group(1))
-                    positions = 1  # Default
-                    pos_match = re.search(r'by\s+(\d+)', command)
-                    if pos_match:
-                        positions = int(pos_match.group(1))
-                    
-                    result = n >> positions
-                    self.speech.speak(f"{n} right-shifted by {positions} is {result}")
-            
-            # Left shift
-            elif "left shift" in command:
-                match = re.search(r'left\s+shift\s+(\d+)', command)
-                if match:
-                    n = int(match.group(1))
-                    positions = 1  # Default
-                    pos_match = re.search(r'by\s+(\d+)', command)
-                    if pos_match:
-                        positions = int(pos_match.group(1))
-                    
-                    result = n << positions
-                    self.speech.speak(f"{n} left-shifted by {positions} is {result}")
+        # Factorials, square roots and trigonometric functions of a number
+        if isinstance(tree, Call) and isinstance(tree.argument, Number):
+            n = _spoken_number(tree.argument.value)
+            if tree.name == "factorial":
+                return f"The factorial of {n} is {text}"
+            if tree.name == "sqrt":
+                return f"The square root of {n} is {text}"
+            return f"The {_CALL_NAMES[tree.name]} of {n} {_UNIT_NAMES[tree.unit]} is {text}"
         
-        # If no specific calculation was detected
-        else:
-            self.speech.speak("I couldn't understand what calculation you want me to perform.")
+        # Logarithms
+        if isinstance(tree, Log) and isinstance(tree.argument, Number):
+            n = _spoken_number(tree.argument.value)
+            if tree.base is None:
+                return f"The logarithm (base 10) of {n} is {text}"
+            if tree.base == Number(math.e):
+                return f"The natural logarithm of {n} is {text}"
+            if isinstance(tree.base, Number):
+                return f"The logarithm of {n} with base {_spoken_number(tree.base.value)} is {text}"
+        
+        # Bit shifts
+        if isinstance(tree, Shift) and isinstance(tree.value, Number) and isinstance(tree.positions, Number):
+            return f"{_spoken_number(tree.value.value)} {tree.direction}-shifted by {_spoken_number(tree.positions.value)} is {text}"
+        
+        # Arithmetic keeps full float precision
+        if isinstance(result, float):
+            text = _spoken_number(result)
+        return f"The result is {text}"
+
+def _spoken_number(value):
+    """Format a number for speech, dropping a trailing .0 and float noise"""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    return describe(value)
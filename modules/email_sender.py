@@ -9,10 +9,12 @@ from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 
 class EmailSender:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # Load environment variables for email credentials
         load_dotenv()
@@ -66,23 +68,23 @@ class EmailSender:
     def send_email_workflow(self):
         """Interactive workflow for sending an email"""
         self.speech.speak("Who would you like to send an email to?")
-        to_email = input("Recipient's email: ")  # For simplicity, using input() instead of speech recognition
+        to_email = self.speech.ask("Recipient's email: ")
         
         if not self.validate_email(to_email):
             self.speech.speak("The email address is not valid. Please try again.")
             return
         
         self.speech.speak("What is the subject of your email?")
-        subject = input("Subject: ")  # For simplicity, using input() instead of speech recognition
+        subject = self.speech.ask("Subject: ")
         
         self.speech.speak("What message would you like to send?")
-        message = input("Message: ")  # For simplicity, using input() instead of speech recognition
+        message = self.speech.ask("Message: ")
         
         # Confirm before sending
         self.speech.speak(f"I'm about to send an email to {to_email} with the subject: {subject}")
         self.speech.speak("Should I send it? Say yes or no.")
         
-        confirmation = input("Confirm (yes/no): ").lower()  # For simplicity, using input() instead of speech recognition
+        confirmation = self.speech.ask("Confirm (yes/no): ").lower()
         
         if confirmation == "yes":
             self.speech.speak("Sending email...")
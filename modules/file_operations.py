@@ -5,14 +5,19 @@ import os
 import datetime
 import platform
 
+# Where created files live (also read by the calculator's file statistics)
+FILES_DIR = os.path.join("assets", "files")
+
 class FileOperations:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # Create directories if they don't exist
-        self.files_dir = os.path.join("assets", "files")
+        self.files_dir = FILES_DIR
         os.makedirs(self.files_dir, exist_ok=True)
         
         # File templates
@@ -54,7 +59,7 @@ class FileOperations:
         
         # Ask for file name
         self.speech.speak(f"What would you like to name your {file_type} file?")
-        filename = input("Filename (without extension): ")  # For simplicity, using input() instead of speech recognition
+        filename = self.speech.ask("Filename (without extension): ")
         
         # Add extension if not provided
         if not filename.endswith(extension):
@@ -66,7 +71,7 @@ class FileOperations:
         # Check if file already exists
         if os.path.exists(file_path):
             self.speech.speak(f"A file named {filename} already exists. Would you like to overwrite it? Say yes or no.")
-            confirmation = input("Overwrite (yes/no): ").lower()  # For simplicity, using input() instead of speech recognition
+            confirmation = self.speech.ask("Overwrite (yes/no): ").lower()
             
             if confirmation != "yes":
                 self.speech.speak("File creation cancelled.")
@@ -93,7 +98,7 @@ class FileOperations:
         """Create a new directory"""
         if not directory_name:
             self.speech.speak("What would you like to name your new directory?")
-            directory_name = input("Directory name: ")  # For simplicity, using input() instead of speech recognition
+            directory_name = self.speech.ask("Directory name: ")
         
         # Create the directory path
         dir_path = os.path.join(self.files_dir, directory_name)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# File Stats Module - Streaming statistics over numeric files ("average of column price in sales.csv")
+
+import io
+import os
+import re
+import csv
+import time
+from collections import namedtuple
+import numpy as np
+
+# Bytes read per chunk; memory use is a small multiple of this whatever the file size
+CHUNK_BYTES = int(os.getenv('FILE_STATS_CHUNK_BYTES', str(1024 * 1024)))
+
+# Spoken statistic -> RunningStats attribute
+STATISTICS = {
+    "average": "mean", "mean": "mean",
+    "standard deviation": "std", "variance": "variance",
+    "sum": "total", "total": "total",
+    "minimum": "minimum", "maximum": "maximum",
+}
+_STATISTIC_RE = re.compile(r"\b(" + "|".join(sorted(STATISTICS, key=len, reverse=True)) + r")\b")
+_FILENAME_RE = re.compile(r"\b(?:in|from)\s+(?:the\s+)?(?:file\s+)?([\w\-./]+\.\w+)")
+_COLUMN_RE = re.compile(r"\bcolumn\s+(.+?)\s+(?:in|from)\s|\bof\s+(?:the\s+)?(.+?)\s+column\b")
+
+# What a command asked for: a STATISTICS key, a column name or number (None
+# for every number in the file) and the file name
+StatsRequest = namedtuple("StatsRequest", "statistic column filename")
+
+class FileStatsError(ValueError):
+    """The file can't be read the way the command asked (the message is spoken)"""
+
+def parse_command(command):
+    """Return the StatsRequest in a command, or None if it doesn't name a statistic and a file"""
+    command = command.lower().replace(" dot ", ".").strip(" ?!")
+    statistic = _STATISTIC_RE.search(command)
+    filename = _FILENAME_RE.findall(command)
+    if statistic is None or not filename:
+        return None
+        
+    column = _COLUMN_RE.search(command, statistic.end())
+    if column:
+        column = (column.group(1) or column.group(2)).strip()
+    return StatsRequest(statistic.group(1), column or None, filename[-1].rstrip("."))
+
+def resolve_path(files_dir, filename):
+    """Return the path of a file under files_dir, refusing names that lead outside it"""
+    root = os.path.realpath(files_dir)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root:
+        raise FileStatsError(f"{filename} is not in your files folder")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    return path
+
+class RunningStats:
+    """Count, mean, variance, sum, minimum and maximum accumulated one chunk at a time
+    
+    Each chunk is reduced with NumPy and merged with Chan et al.'s parallel
+    form of Welford's update, so the mean and variance stay accurate without
+    keeping the values or summing their squares.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+    
+    def update(self, values):
+        """Add a chunk of values (non-finite ones such as nan are skipped)"""
+        values = values[np.isfinite(values)]
+        n = values.size
+        if n == 0:
+            return
+        
+        # Reduce the chunk on its own...
+        total = float(values.sum())
+        mean = total / n
+        m2 = float(np.square(values - mean).sum())
+        
+        # ...then merge it into the running values
+        count = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / count
+        self.m2 += m2 + delta * delta * self.count * n / count
+        self.count = count
+        self.total += total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+    
+    @property
+    def variance(self):
+        """Sample variance (n - 1 in the denominator)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std(self):
+        """Sample standard deviation"""
+        return self.variance ** 0.5
+
+def read_chunks(file, chunk_bytes=CHUNK_BYTES):
+    """Yield blocks of whole lines from a binary file, about chunk_bytes at a time"""
+    rest = b""
+    while True:
+        data = file.read(chunk_bytes)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind(b"\n") + 1
+        rest = data[cut:]
+        if cut:
+            yield data[:cut]
+    if rest:
+        yield rest
+
+def _floats(fields):
+    """Convert a list of byte strings to a float array, dropping fields that aren't numbers"""
+    if not fields:
+        return np.empty(0)
+    try:
+        # One C-level conversion for the whole chunk
+        return np.array(fields).astype(np.float64)
+    except ValueError:
+        pass
+    
+    # Slow path for chunks with blanks, words or other stray text
+    values = []
+    for field in fields:
+        try:
+            values.append(float(field))
+        except ValueError:
+            continue
+    return np.array(values, dtype=np.float64)
+
+_EXTENSION_DELIMITERS = {".csv": b",", ".tsv": b"\t"}
+
+def _delimiter(path, header):
+    """Guess the field delimiter from the file extension and header line (None means whitespace)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in _EXTENSION_DELIMITERS:
+        return _EXTENSION_DELIMITERS[extension]
+    for delimiter in (b",", b"\t", b";"):
+        if delimiter in header:
+            return delimiter
+    return None
+
+def _column_index(column, header, delimiter):
+    """Return (index, header is data) for a column name or 1-based number"""
+    names = [name.strip().strip(b'"').decode("utf-8", "replace").lower() for name in header.split(delimiter)]
+    if column in names:
+        return names.index(column), False
+    if column.isdigit() and 0 < int(column):
+        # A header made of numbers is the first row of data
+        return int(column) - 1, _floats(header.split(delimiter)).size == len(names)
+    raise FileStatsError(f"there is no column called {column}")
+
+def _column_fields(block, index, delimiter):
+    """The fields of one column in a block of lines"""
+    if b'"' in block and delimiter is not None:
+        # Quoted fields may contain the delimiter: let the csv module split them
+        reader = csv.reader(io.StringIO(block.decode("utf-8", "replace")), delimiter=delimiter.decode())
+        return [row[index].encode() for row in reader if len(row) > index]
+    fields = []
+    for line in block.splitlines():
+        parts = line.split(delimiter)
+        if len(parts) > index:
+            fields.append(parts[index].strip())
+    return fields
+
+_SEPARATORS = bytes.maketrans(b",;", b"  ")
+
+def scan_file(path, column=None, chunk_bytes=CHUNK_BYTES):
+    """Stream a file through a RunningStats
+    
+    With a column, the first line is the header and the column's values are
+    used; without one, every number in the file is. Returns (stats, rows,
+    seconds).
+    """
+    stats = RunningStats()
+    rows = 0
+    start = time.perf_counter()
+    with open(path, "rb") as file:
+        index = delimiter = None
+        if column is not None:
+            header = file.readline()
+            delimiter = _delimiter(path, header)
+            index, header_is_data = _column_index(column, header, delimiter)
+            if header_is_data:
+                file.seek(0)
+                
+        for block in read_chunks(file, chunk_bytes):
+            rows += block.count(b"\n") + (not block.endswith(b"\n"))
+            if index is None:
+                fields = block.translate(_SEPARATORS).split()
+            else:
+                fields = _column_fields(block, index, delimiter)
+            stats.update(_floats(fields))
+    return stats, rows, time.perf_counter() - start
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Fuzzy Index Module - Trigram index for approximate matching of spoken text
+
+import re
+import math
+import heapq
+from collections import namedtuple
+import numpy as np
+
+# A search result: the indexed key, its similarity to the query (0..1) and its text
+FuzzyMatch = namedtuple("FuzzyMatch", "key score text")
+
+# Postings counted per search before the most common trigrams are left out
+# (their contribution is then bounded instead of counted)
+READ_BUDGET = 20000
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def trigrams(text):
+    """Return the set of word trigrams of a text, padded like pg_trgm ("  m", " mi", "mil", ...)"""
+    grams = set()
+    for word in _NON_WORD.sub(" ", text.lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramIndex:
+    """Inverted trigram index ranking integer keys by Jaccard similarity to a query
+    
+    A search counts, with one NumPy bincount, how many of the query's
+    trigrams each entry shares, reading the rarest trigrams first. Entries
+    are then checked exactly in order of their best possible score, and the
+    bar they must clear rises with the results found so far, so only a
+    handful are ever looked at in Python.
+    """
+    
+    def __init__(self, entries=()):
+        # trigram -> set of slots, and the same as an array (rebuilt after changes)
+        self._postings = {}
+        self._arrays = {}
+        # Per slot: key, trigram set, text and (as an array) trigram count
+        self._keys = []
+        self._grams = []
+        self._texts = []
+        self._sizes = np.zeros(64, dtype=np.int64)
+        self._slots = {}
+        self._free = []
+        for key, text in entries:
+            self.add(key, text)
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def __contains__(self, key):
+        return key in self._slots
+    
+    def add(self, key, text):
+        """Index a text under key (replacing any earlier text for that key)"""
+        self.remove(key)
+        grams = frozenset(trigrams(text))
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot], self._grams[slot], self._texts[slot] = key, grams, text
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._grams.append(grams)
+            self._texts.append(text)
+            if slot == len(self._sizes):
+                self._sizes = np.concatenate([self._sizes, np.zeros_like(self._sizes)])
+        self._sizes[slot] = len(grams)
+        self._slots[key] = slot
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(slot)
+            self._arrays.pop(gram, None)
+    
+    def remove(self, key):
+        """Drop a key from the index (no error if it isn't there)"""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        for gram in self._grams[slot]:
+            posting = self._postings[gram]
+            posting.discard(slot)
+            self._arrays.pop(gram, None)
+            if not posting:
+                del self._postings[gram]
+        self._keys[slot], self._grams[slot], self._texts[slot] = None, frozenset(), None
+        self._sizes[slot] = 0
+        self._free.append(slot)
+    
+    def prepare(self):
+        """Build every posting array now, so no search has to (changes later rebuild only theirs)"""
+        for gram in self._postings:
+            self._posting_array(gram)
+    
+    def _posting_array(self, gram):
+        """The slots containing a trigram as an int array"""
+        array = self._arrays.get(gram)
+        if array is None:
+            posting = self._postings[gram]
+            array = self._arrays[gram] = np.fromiter(posting, dtype=np.int64, count=len(posting))
+        return array
+    
+    def search(self, query, limit=5, threshold=0.3, exclude=None, margin=None):
+        """Return up to limit FuzzyMatches scoring at least threshold, best first
+        
+        Keys in exclude (a set), if given, are left out. With a margin, only
+        matches within margin of the best score are returned, which lets
+        the search stop much sooner.
+        """
+        grams = trigrams(query)
+        size = len(grams)
+        if not size or limit <= 0:
+            return []
+        
+        # Rarest trigrams first. Enough must be read that an entry missing
+        # all of them can't reach the threshold; after that, stop at the budget
+        postings = self._postings
+        ordered = sorted(grams, key=lambda gram: len(postings.get(gram, ())))
+        needed = max(1, math.ceil(threshold * size))
+        read = total = 0
+        while read < size:
+            length = len(postings.get(ordered[read], ()))
+            if read > size - needed and total + length > READ_BUDGET:
+                break
+            total += length
+            read += 1
+        arrays = [self._posting_array(gram) for gram in ordered[:read] if gram in postings]
+        if not arrays:
+            return []
+        
+        # Shared trigrams per slot, counting only the ones read
+        counts = np.bincount(np.concatenate(arrays), minlength=len(self._keys))
+        unread = frozenset(ordered[read:])
+        missing = len(unread)
+        
+        best = []
+        top = 0.0
+        floor = threshold
+        checked = set()
+        bar = int(counts.max())
+        while True:
+            # Upper bounds on the score of every slot sharing at least bar trigrams
+            slots = np.flatnonzero(counts >= bar)
+            sizes = self._sizes[slots]
+            overlap = np.minimum(np.minimum(counts[slots] + missing, sizes), size)
+            bounds = overlap / (size + sizes - overlap)
+            for i in np.argsort(-bounds, kind="stable").tolist():
+                if bounds[i] < floor:
+                    break
+                slot = int(slots[i])
+                if slot in checked:
+                    continue
+                checked.add(slot)
+                key = self._keys[slot]
+                if exclude and key in exclude:
+                    continue
+                
+                # Exact score: counted trigrams plus the unread ones it has
+                shared = int(counts[slot]) + (len(unread & self._grams[slot]) if missing else 0)
+                score = shared / (size + int(self._sizes[slot]) - shared)
+                if score < floor:
+                    continue
+                # Ties go to the lower (older) key
+                heapq.heappush(best, (score, -key))
+                if len(best) > limit:
+                    heapq.heappop(best)
+                top = max(top, score)
+                if margin is not None:
+                    floor = max(floor, top - margin)
+                if len(best) == limit:
+                    floor = max(floor, best[0][0])
+            
+            # Slots below the bar share at most bar - 1 + missing trigrams:
+            # stop once that can't reach the floor
+            required = max(1, math.ceil(floor * size) - missing)
+            if bar <= required:
+                break
+            bar = required
+            
+        return [FuzzyMatch(-neg_key, score, self._texts[self._slots[-neg_key]])
+                for score, neg_key in sorted(best, reverse=True) if score >= floor]
@@ -9,10 +9,12 @@ import os
 import webbrowser
 
 class Games:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # URLs for online games
         self.online_games = {
@@ -29,7 +31,7 @@ class Games:
         self.speech.speak("Which game would you like to play?")
         self.speech.speak("I have Rock Paper Scissors or I can open online games for you.")
         
-        game_choice = input("Choose a game: ").lower()  # For simplicity, using input() instead of speech recognition
+        game_choice = self.speech.ask("Choose a game: ").lower()
         
         if "rock" in game_choice or "paper" in game_choice or "scissors" in game_choice or "scissor" in game_choice:
             self.rock_paper_scissors()
@@ -190,7 +192,7 @@ class Games:
         
         # Get user choice
         self.speech.speak("Which game would you like to play? Please say the number or name.")
-        game_choice = input("Choose a game: ").lower()  # For simplicity, using input() instead of speech recognition
+        game_choice = self.speech.ask("Choose a game: ").lower()
         
         # Process the choice
         selected_game = None
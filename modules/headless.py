@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Headless Module - Text-only stand-in for the speech engine
+
+import json
+import time
+import threading
+from collections import deque
+
+class _CompletedHandle:
+    """Speech handle for output that is written immediately"""
+    
+    time_to_first_audio = 0.0
+    
+    def wait(self, timeout=None):
+        return True
+    
+    def done(self):
+        return True
+    
+    def cancel(self):
+        pass
+
+class HeadlessSpeech:
+    """Reads commands and prompt answers from a text stream and writes JSON records
+    
+    Each input line is either plain text or a JSON object:
+        {"command": "what time is it"}
+        {"command": "create a file of type text", "answers": ["notes"]}
+        {"answer": "notes"}
+    Commands are returned by recognize_speech(); prompts from ask() are
+    answered first from the current command's "answers", then from the next
+    line of the stream. Every response, prompt and command is written to the
+    output stream as one JSON record per line.
+    """
+    
+    def __init__(self, input_stream, output_stream):
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.exhausted = False
+        self.command_index = 0
+        self._answers = deque()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        
+        # Same attributes callers of SpeechEngine may read
+        self.not_understood_responses = []
+        self.muted = True
+    
+    def record(self, record_type, **fields):
+        """Write one JSON record to the output stream"""
+        record = {"type": record_type, "index": self.command_index, "t_ms": round((time.perf_counter() - self._start) * 1000, 3)}
+        record.update(fields)
+        with self._lock:
+            self.output_stream.write(json.dumps(record) + "\n")
+            self.output_stream.flush()
+    
+    def _read_entry(self):
+        """Return the next non-empty input line as a dict, or None at end of input"""
+        for line in self.input_stream:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    return json.loads(line)
+                except ValueError:
+                    pass
+            return {"text": line}
+        self.exhausted = True
+        return None
+    
+    def speak(self, text, priority=None):
+        """Write a response record instead of speaking"""
+        self.record("response", text=text)
+        return _CompletedHandle()
+    
+    def show(self, text):
+        """Write a display record for text that isn't spoken"""
+        self.record("display", text=text)
+    
+    def ask(self, prompt):
+        """Answer a prompt from the command's answers or the next input line"""
+        if self._answers:
+            answer = self._answers.popleft()
+        else:
+            entry = self._read_entry()
+            if entry is None:
+                answer = ""
+            else:
+                answer = str(entry.get("answer", entry.get("command", entry.get("text", ""))))
+        self.record("prompt", prompt=prompt, answer=answer)
+        return answer
+    
+    def recognize_speech(self, timeout=None):
+        """Return the next command from the input stream, or None at end of input"""
+        entry = self._read_entry()
+        if entry is None:
+            return None
+            
+        self.command_index += 1
+        self._answers = deque(str(answer) for answer in entry.get("answers", []))
+        command = str(entry.get("command", entry.get("text", entry.get("answer", ""))))
+        self.record("command", text=command)
+        return command
+    
+    def stop_speaking(self):
+        pass
+    
+    def wait_until_done(self, timeout=None):
+        return True
+    
+    def warm_phrases(self, phrases):
+        pass
+    
+    def change_voice(self, gender="male"):
+        self.record("voice", gender=gender)
+    
+    def latency_stats(self):
+        return {"count": 0}
+    
+    def dispatch_latency_stats(self):
+        return {"count": 0}
+    
+    def close(self):
+        pass
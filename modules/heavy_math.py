@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Heavy Math Module - Process pool for expensive integer math and big-number summaries
+
+import os
+import math
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from modules.safe_eval import Limits
+from modules import math_grammar
+
+# Integers with more digits than this are summarized instead of spoken in full
+SPOKEN_DIGITS = int(os.getenv('MATH_SPOKEN_DIGITS', '30'))
+# Significant digits given in a summary
+LEADING_DIGITS = 6
+
+# Seconds before a slow job is announced
+SLOW_NOTICE = 0.5
+
+# Limits for expressions evaluated in the pool (results are summarized, so
+# they may exceed the int-to-str limit)
+HEAVY_LIMITS = Limits(max_exponent=10 ** 8, max_digits=10 ** 7)
+
+_LOG10_2 = math.log10(2)
+
+# A big number described by its size: sign, exact digit count, leading
+# digits and log10 of its magnitude
+NumberSummary = namedtuple("NumberSummary", "negative digits leading log10 approximate")
+
+def summarize_log10(log10_value, negative=False, approximate=False):
+    """Summarize a number from log10 of its magnitude"""
+    exponent = math.floor(log10_value)
+    # Leading digits are truncated, not rounded, so they never carry into
+    # the next power of ten
+    scale = 10 ** (LEADING_DIGITS - 1)
+    leading = min(math.floor(10 ** (log10_value - exponent) * scale), 10 * scale - 1)
+    return NumberSummary(negative, exponent + 1, f"{leading / scale:.{LEADING_DIGITS - 1}f}", log10_value, approximate)
+
+def summarize_int(n):
+    """Summarize an integer without building its decimal string"""
+    magnitude = abs(n)
+    if magnitude == 0:
+        return summarize_log10(0.0)
+    
+    # math.log10 works from the top bits of big ints, accurate to well
+    # within LEADING_DIGITS
+    log10_value = math.log10(magnitude)
+    
+    # Close to a power of ten the float can land on the wrong side: check exactly
+    exponent = round(log10_value)
+    if abs(log10_value - exponent) < 1e-9:
+        log10_value = exponent if magnitude >= 10 ** exponent else math.nextafter(exponent, 0)
+    return summarize_log10(log10_value, n < 0)
+
+def describe(value):
+    """Return the text to speak for a calculation result"""
+    if isinstance(value, NumberSummary):
+        sign = "negative " if value.negative else ""
+        about = "approximately " if value.approximate else ""
+        return (f"a {sign}number with {about}{value.digits:,} digits, "
+                f"about {value.leading} times 10 to the power of {value.digits - 1}")
+    if isinstance(value, int) and value.bit_length() > SPOKEN_DIGITS * 3.33:
+        return describe(summarize_int(value))
+    return str(value)
+
+def _result(value):
+    """Return small results as they are and summarize big integers (runs in the worker)"""
+    if isinstance(value, int) and value.bit_length() > SPOKEN_DIGITS * 3.33:
+        return summarize_int(value)
+    return value
+
+# Jobs run in the worker processes (module-level so they can be pickled)
+
+def evaluate_job(tree):
+    """Evaluate a math_grammar tree with the larger pool limits"""
+    return _result(math_grammar.evaluate(tree, HEAVY_LIMITS))
+
+# Closed-form estimates used when a job is too big to run or times out
+
+def factorial_estimate(n):
+    """log10(n!) via lgamma, without computing n!"""
+    return summarize_log10(math.lgamma(n + 1) / math.log(10), approximate=True)
+
+def left_shift_estimate(n, positions):
+    """log10(n * 2**positions) without computing it"""
+    if n == 0:
+        return 0
+    return summarize_log10(math.log10(abs(n)) + positions * _LOG10_2, n < 0, approximate=True)
+
+def power_estimate(base, exponent):
+    """log10(base ** exponent) for a positive integer exponent, without computing it"""
+    if base == 0:
+        return 0
+    return summarize_log10(exponent * math.log10(abs(base)), base < 0 and exponent % 2 == 1, approximate=True)
+
+def estimate(tree):
+    """Return an estimate for a factorial, left shift or power of plain numbers, else None"""
+    Number = math_grammar.Number
+    if isinstance(tree, math_grammar.Call) and tree.name == "factorial" and isinstance(tree.argument, Number):
+        n = tree.argument.value
+        if isinstance(n, int) and n >= 0:
+            return factorial_estimate(n)
+    elif isinstance(tree, math_grammar.Shift) and tree.direction == "left":
+        if isinstance(tree.value, Number) and isinstance(tree.positions, Number):
+            n, positions = tree.value.value, tree.positions.value
+            if isinstance(n, int) and isinstance(positions, int) and positions >= 0:
+                return left_shift_estimate(n, positions)
+    elif isinstance(tree, math_grammar.BinaryOp) and tree.op == "**":
+        if isinstance(tree.left, Number) and isinstance(tree.right, Number):
+            base, exponent = tree.left.value, tree.right.value
+            if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+                return power_estimate(base, exponent)
+    return None
+
+class MathPool:
+    """Bounded process pool for CPU-heavy calculations, with timeouts and cancellation"""
+    
+    def __init__(self, workers=None, timeout=None):
+        self.workers = workers or int(os.getenv('MATH_WORKERS', '1'))
+        self.timeout = timeout or float(os.getenv('MATH_TIMEOUT', '10'))
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        # Worker processes are only started by the first heavy calculation
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+    
+    def submit(self, job, *args):
+        """Start a job in a worker process and return its Future"""
+        return self._get_executor().submit(job, *args)
+    
+    def run(self, job, *args, timeout=None, on_slow=None):
+        """Run a job and return its result; cancel it and raise TimeoutError on timeout
+        
+        on_slow is called once if the job is still running after SLOW_NOTICE seconds.
+        """
+        timeout = timeout or self.timeout
+        future = self.submit(job, *args)
+        if on_slow is not None:
+            try:
+                return future.result(timeout=min(SLOW_NOTICE, timeout))
+            except FutureTimeout:
+                on_slow()
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            self.cancel()
+            raise TimeoutError(f"calculation did not finish within {timeout:.0f} seconds")
+    
+    def cancel(self):
+        """Stop every running and queued job by terminating the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        
+        # A running future can't be cancelled, so stop its process instead
+        if hasattr(executor, "terminate_workers"):
+            executor.terminate_workers()
+            return
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self):
+        """Stop the worker processes, abandoning any running job"""
+        self.cancel()
+
+# Shared pool, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_math_pool():
+    """Return the process-wide MathPool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MathPool()
+        return _pool
+
+def shutdown_math_pool():
+    """Stop the shared pool's worker processes, if any were started"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# HTTP Client Module - Pooled session with per-service timeouts, retries and circuit breaking
+
+import time
+import random
+import threading
+from collections import namedtuple
+import requests
+from requests.adapters import HTTPAdapter
+
+# Per-service policy. Timeouts are in seconds; a request (with its retries)
+# never takes longer than deadline, so a slow API can't stall the voice loop
+ServiceConfig = namedtuple("ServiceConfig",
+                           "connect_timeout read_timeout retries backoff deadline failure_threshold reset_timeout")
+
+SERVICES = {
+    "weather": ServiceConfig(3.05, 5, retries=2, backoff=0.3, deadline=8, failure_threshold=3, reset_timeout=30),
+    "news": ServiceConfig(3.05, 6, retries=2, backoff=0.3, deadline=10, failure_threshold=3, reset_timeout=30),
+    "wikipedia": ServiceConfig(3.05, 6, retries=2, backoff=0.3, deadline=10, failure_threshold=3, reset_timeout=30),
+    # News articles on many different sites: one slow site shouldn't trip the breaker for the rest
+    "articles": ServiceConfig(3.05, 5, retries=1, backoff=0.3, deadline=8, failure_threshold=8, reset_timeout=30),
+    "default": ServiceConfig(3.05, 10, retries=1, backoff=0.5, deadline=15, failure_threshold=5, reset_timeout=60),
+}
+
+# Responses worth another attempt (the request itself was fine)
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Errors worth another attempt; any other requests error (a redirect loop, an
+# invalid URL) fails the call at once
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# Most bytes read from a retryable error response to reuse its connection
+MAX_DRAIN = 64 * 1024
+
+# Longest wait between attempts, whatever the backoff or a Retry-After header says
+MAX_BACKOFF = 5.0
+
+class ServiceUnavailable(Exception):
+    """A service failed every attempt, or its circuit is open after repeated failures"""
+    
+    def __init__(self, service, message, retry_after=None):
+        super().__init__(message)
+        self.service = service
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Stops calling a service after consecutive failures, then lets one trial call through
+    
+    closed     calls go through; failure_threshold failures in a row open it
+    open       calls fail at once until reset_timeout has passed
+    half-open  one trial call: success closes the circuit, failure reopens it
+    """
+    
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._trial or self.retry_after() == 0 else "open"
+    
+    def retry_after(self):
+        """Seconds until the circuit lets a trial call through (0 if it would now)"""
+        if self._opened_at is None:
+            return 0
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+    
+    def allow(self):
+        """Return True if a call may go ahead (claiming the trial call when half-open)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self.retry_after() > 0:
+                return False
+            self._trial = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+            self._trial = False
+
+class HttpClient:
+    """One pooled requests.Session shared by every service
+    
+    Connections are kept alive and reused per host, so only the first
+    call to an API pays for the TCP and TLS handshakes. Each call gets
+    the service's connect/read timeouts, is retried with jittered
+    exponential backoff on connection errors, timeouts and 429/5xx
+    responses, and goes through the service's circuit breaker (other
+    request errors fail the call without retrying).
+    """
+    
+    def __init__(self, services=None, pool_size=10):
+        self.services = dict(SERVICES, **(services or {}))
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "PersonalAssistant/1.0"
+        # Retries are done here (with the deadline and breaker), not by urllib3
+        adapter = HTTPAdapter(pool_connections=len(self.services), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        self._breakers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    def breaker(self, service):
+        """Return the circuit breaker for a service"""
+        with self._lock:
+            breaker = self._breakers.get(service)
+            if breaker is None:
+                config = self._config(service)
+                breaker = self._breakers[service] = CircuitBreaker(config.failure_threshold, config.reset_timeout)
+            return breaker
+    
+    def _config(self, service):
+        return self.services.get(service) or self.services["default"]
+    
+    def _count(self, service, counter):
+        with self._lock:
+            counters = self._counters.setdefault(service, dict.fromkeys(
+                ("requests", "attempts", "retries", "failures", "short_circuits"), 0))
+            counters[counter] += 1
+    
+    def stats(self):
+        """Counters per service: requests, attempts, retries, failures and short_circuits"""
+        with self._lock:
+            return {service: dict(counters) for service, counters in self._counters.items()}
+    
+    def get(self, service, url, params=None, **kwargs):
+        """GET a URL on behalf of a service and return the response
+        
+        Returns the first response that isn't worth retrying (including
+        404s and other client errors, which the caller handles). Raises
+        ServiceUnavailable when the circuit is open or every attempt
+        failed.
+        """
+        config = self._config(service)
+        breaker = self.breaker(service)
+        self._count(service, "requests")
+        if not breaker.allow():
+            self._count(service, "short_circuits")
+            raise ServiceUnavailable(service, f"{service} is unavailable (circuit open)", breaker.retry_after())
+            
+        try:
+            response, error = self._attempts(service, config, url, params, kwargs)
+        except BaseException:
+            # Whatever went wrong, the call is over: a half-open trial must not stay claimed
+            breaker.record_failure()
+            raise
+        if response is not None:
+            breaker.record_success()
+            return response
+            
+        self._count(service, "failures")
+        breaker.record_failure()
+        raise ServiceUnavailable(service, f"{service} failed: {error}", breaker.retry_after()) from error
+    
+    def _attempts(self, service, config, url, params, kwargs):
+        """Try a GET until a response isn't worth retrying; returns (response, None) or (None, the last error)"""
+        deadline = time.monotonic() + config.deadline
+        error = None
+        for attempt in range(config.retries + 1):
+            # Never let the read timeout run past the deadline
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = (min(config.connect_timeout, remaining), min(config.read_timeout, remaining))
+            self._count(service, "attempts")
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                response, error = None, e
+            except requests.RequestException as e:
+                # Trying again would fail the same way
+                return None, e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response, None
+                error = requests.HTTPError(f"{response.status_code} from {service}", response=response)
+                # Read the (short) error body so a streamed response's connection
+                # goes back to the pool for the next attempt, instead of being dropped
+                _release(response)
+            
+            # Back off (or wait as asked by Retry-After) if there's time for another attempt
+            delay = min(MAX_BACKOFF, random.uniform(0, config.backoff * 2 ** attempt))
+            if response is not None:
+                delay = max(delay, _retry_after(response))
+            if attempt == config.retries or time.monotonic() + delay >= deadline - 0.05:
+                break
+            self._count(service, "retries")
+            time.sleep(delay)
+        return None, error
+    
+    def get_json(self, service, url, params=None, **kwargs):
+        """GET a URL and return (status code, decoded JSON or None)"""
+        response = self.get(service, url, params=params, **kwargs)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+    
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+
+def _release(response):
+    """Drain up to MAX_DRAIN bytes of a response and close it, keeping its connection alive when it was all read"""
+    try:
+        for _ in response.iter_content(MAX_DRAIN):
+            break
+    except requests.RequestException:
+        pass
+    response.close()
+
+def _retry_after(response):
+    """Seconds asked for by a Retry-After header (0 if absent or a date)"""
+    try:
+        return min(MAX_BACKOFF, max(0.0, float(response.headers.get("Retry-After", 0))))
+    except ValueError:
+        return 0.0
+
+# Shared client used by every module
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_http_client():
+    """Return the shared HTTP client, creating it on first use"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
+
+def close_http_client():
+    """Close the shared HTTP client's connections"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+            _shared_client = None
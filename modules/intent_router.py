@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# Intent Router Module - Single-pass trigger phrase matching for commands
+
+class PhraseMatcher:
+    """Aho-Corasick automaton that finds every occurrence of a fixed set of phrases
+    
+    The automaton is compiled into a full transition table (no failure links
+    to follow at match time), so scanning a command is a single dictionary
+    lookup per character.
+    """
+    
+    def __init__(self, phrases):
+        self.phrases = sorted(set(phrases))
+        
+        # Build the trie: one transition dict and one output list per state
+        goto = [{}]
+        outputs = [[]]
+        for phrase in self.phrases:
+            state = 0
+            for char in phrase:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(phrase)
+        
+        # Breadth-first pass: compute failure links and fold them into a
+        # complete transition table over the phrase alphabet
+        alphabet = {char for phrase in self.phrases for char in phrase}
+        fail = [0] * len(goto)
+        delta = [dict() for _ in goto]
+        queue = []
+        for char in alphabet:
+            child = goto[0].get(char)
+            if child is None:
+                continue
+            delta[0][char] = child
+            queue.append(child)
+            
+        for state in queue:
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char in alphabet:
+                child = goto[state].get(char)
+                if child is None:
+                    # Borrow the failure state's transition
+                    target = delta[fail[state]].get(char)
+                    if target:
+                        delta[state][char] = target
+                    continue
+                fail[child] = delta[fail[state]].get(char, 0)
+                delta[state][char] = child
+                queue.append(child)
+                
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+    
+    def scan(self, text):
+        """Return (end, state) for every position where at least one phrase ends"""
+        delta = self._delta
+        outputs = self._outputs
+        hits = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                hits.append((end, state))
+        return hits
+    
+    def phrases_at(self, state):
+        """Return the phrases that end in the given state"""
+        return self._outputs[state]
+    
+    def occurrences(self, hits):
+        """Expand scan() hits into (start, end, phrase) tuples"""
+        outputs = self._outputs
+        return [(end - len(phrase), end, phrase) for end, state in hits for phrase in outputs[state]]
+    
+    def find_all(self, text):
+        """Return (start, end, phrase) for every occurrence, including overlapping ones"""
+        return self.occurrences(self.scan(text))
+
+class Intent:
+    """A command intent, matched when any trigger phrase occurs in the command
+    
+    require   phrases that must also all occur (e.g. "play" needs "youtube")
+    strip     phrases removed from the command to produce the argument
+    choices   (phrase, value) pairs; the first phrase present sets match.choice
+    """
+    
+    def __init__(self, name, triggers, require=(), strip=(), choices=()):
+        self.name = name
+        self.triggers = tuple(triggers)
+        self.require = tuple(require)
+        self.strip = tuple(strip)
+        self.choices = tuple(choices)
+
+class IntentMatch:
+    """Result of routing a command"""
+    
+    def __init__(self, intent, command, argument=None, choice=None):
+        self.intent = intent
+        self.command = command
+        self.argument = argument
+        self.choice = choice
+    
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r}, argument={self.argument!r}, choice={self.choice!r})"
+
+class IntentRouter:
+    """Routes commands to the first matching intent, in list order
+    
+    All trigger, required, strip and choice phrases are compiled into one
+    PhraseMatcher, so a command is scanned once; picking the intent and
+    extracting its argument reuse the matches from that scan.
+    """
+    
+    def __init__(self, intents, default=None):
+        self.intents = list(intents)
+        self.default = default
+        
+        phrases = set()
+        # phrase -> indices of the intents it triggers
+        triggered_by = {}
+        for index, intent in enumerate(self.intents):
+            for phrase in intent.triggers:
+                triggered_by.setdefault(phrase, set()).add(index)
+            phrases.update(intent.triggers, intent.require, intent.strip)
+            phrases.update(phrase for phrase, _ in intent.choices)
+            
+        self.matcher = PhraseMatcher(phrases)
+        
+        # For every automaton state, the intents triggered by the phrases
+        # ending there, in precedence order (empty for most states)
+        self._state_intents = [
+            tuple(sorted(set().union(*(triggered_by.get(phrase, ()) for phrase in outputs))))
+            for outputs in self.matcher._outputs
+        ]
+    
+    def route(self, command):
+        """Return the IntentMatch for a (lower-cased) command"""
+        hits = self.matcher.scan(command)
+        
+        # Highest-precedence intent triggered anywhere in the command
+        state_intents = self._state_intents
+        best = None
+        for _, state in hits:
+            triggered = state_intents[state]
+            if triggered and (best is None or triggered[0] < best):
+                best = triggered[0]
+                
+        if best is None:
+            return IntentMatch(self.default, command)
+            
+        intent = self.intents[best]
+        if not intent.require:
+            return self._build_match(intent, command, hits)
+        
+        # Intents with required phrases: walk the candidates in order
+        present = {phrase for _, state in hits for phrase in self.matcher.phrases_at(state)}
+        candidates = sorted({index for _, state in hits for index in state_intents[state]})
+        for index in candidates:
+            intent = self.intents[index]
+            if all(phrase in present for phrase in intent.require):
+                return self._build_match(intent, command, hits)
+                
+        return IntentMatch(self.default, command)
+    
+    def _build_match(self, intent, command, hits):
+        """Extract the argument and choice for a matched intent from the scan hits"""
+        if not intent.strip and not intent.choices:
+            return IntentMatch(intent.name, command)
+            
+        matches = self.matcher.occurrences(hits)
+        
+        argument = None
+        if intent.strip:
+            argument = self._strip(command, matches, intent.strip)
+            
+        choice = None
+        present = {phrase for _, _, phrase in matches}
+        for phrase, value in intent.choices:
+            if phrase in present:
+                choice = value
+                break
+                
+        return IntentMatch(intent.name, command, argument, choice)
+    
+    def _strip(self, command, matches, strip):
+        """Remove strip phrases from the command, earlier phrases in the list first"""
+        removed = [False] * len(command)
+        for phrase in strip:
+            for start, end, found in matches:
+                if found == phrase and not any(removed[start:end]):
+                    removed[start:end] = [True] * (end - start)
+        return "".join(char for char, gone in zip(command, removed) if not gone).strip()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# Listener Module - Continuous microphone capture with energy-based segmentation
+
+import sys
+import math
+import time
+import array
+import queue
+import threading
+import collections
+import speech_recognition as sr
+
+# Signed sample typecodes by sample width in bytes (3-byte samples are widened to 4)
+_SAMPLE_TYPECODES = {1: "b", 2: "h", 3: "i", 4: "i"}
+
+def _rms(buffer, width):
+    """Root-mean-square level of little-endian signed samples, as audioop.rms gave (gone in Python 3.13)"""
+    if width == 3:
+        # A zero low byte makes each sample a 4-byte one, 256 times as large
+        buffer = b"".join(b"\0" + buffer[i:i + 3] for i in range(0, len(buffer) - 2, 3))
+    samples = array.array(_SAMPLE_TYPECODES[width])
+    samples.frombytes(buffer[:len(buffer) - len(buffer) % samples.itemsize])
+    if not samples:
+        return 0
+    if sys.byteorder == "big":
+        samples.byteswap()
+    level = int(math.sqrt(sum(sample * sample for sample in samples) / len(samples)))
+    return level // 256 if width == 3 else level
+
+class Phrase:
+    """A complete utterance captured by the listener"""
+    
+    def __init__(self, audio, ended_at, during_playback=False):
+        self.audio = audio
+        # perf_counter() timestamp of the last voiced audio in the phrase
+        self.ended_at = ended_at
+        # Captured (at least partly) while the assistant was speaking, so it
+        # may be the assistant's own voice picked up by the microphone
+        self.during_playback = during_playback
+
+class StreamingListener:
+    """Keeps the microphone stream open and queues complete phrases
+    
+    is_playing, if given, tells whether the assistant's speech is playing.
+    Phrases overlapping playback are flagged (Phrase.during_playback) for the
+    recognizer to filter, and the noise floor isn't tracked during playback.
+    """
+    
+    def __init__(self, microphone, recognizer, max_phrase_seconds=10, max_queued=8, is_playing=None):
+        self.microphone = microphone
+        self.recognizer = recognizer
+        self.max_phrase_seconds = max_phrase_seconds
+        self.is_playing = is_playing or (lambda: False)
+        
+        # Complete phrases waiting for the dispatcher (oldest are dropped when full)
+        self.phrases = queue.Queue(maxsize=max_queued)
+        
+        self._running = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Open the microphone and start segmenting in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture_loop, name="speech-listener")
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def stop(self):
+        """Stop capturing and close the microphone stream"""
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def get(self, timeout=None):
+        """Return the next complete Phrase, or None if none arrives in time"""
+        try:
+            return self.phrases.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def _push(self, phrase):
+        """Queue a phrase, dropping the oldest one if the dispatcher fell behind"""
+        while True:
+            try:
+                self.phrases.put_nowait(phrase)
+                return
+            except queue.Full:
+                try:
+                    self.phrases.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _capture_loop(self):
+        """Read the open stream chunk by chunk and split it into phrases"""
+        recognizer = self.recognizer
+        is_playing = self.is_playing
+        
+        try:
+            with self.microphone as source:
+                seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+                
+                # Audio kept from before speech starts, so word onsets aren't clipped
+                preroll = collections.deque(
+                    maxlen=max(1, int(recognizer.non_speaking_duration / seconds_per_buffer))
+                )
+                frames = []
+                speaking = False
+                overlapped = False
+                voiced_seconds = 0.0
+                silence_seconds = 0.0
+                last_voiced_at = 0.0
+                
+                print("Listening...")
+                while self._running.is_set():
+                    buffer = source.stream.read(source.CHUNK)
+                    if not buffer:
+                        break
+                    energy = _rms(buffer, source.SAMPLE_WIDTH)
+                    playing = is_playing()
+                    
+                    if not speaking:
+                        preroll.append(buffer)
+                        if energy > recognizer.energy_threshold:
+                            # Speech started
+                            speaking = True
+                            overlapped = playing
+                            frames = list(preroll)
+                            preroll.clear()
+                            voiced_seconds = seconds_per_buffer
+                            silence_seconds = 0.0
+                            last_voiced_at = time.perf_counter()
+                        elif recognizer.dynamic_energy_threshold and not playing:
+                            # Track the ambient noise floor while nobody (not even the assistant) is talking
+                            damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_buffer
+                            target = energy * recognizer.dynamic_energy_ratio
+                            recognizer.energy_threshold = recognizer.energy_threshold * damping + target * (1 - damping)
+                        continue
+                        
+                    frames.append(buffer)
+                    overlapped = overlapped or playing
+                    if energy > recognizer.energy_threshold:
+                        voiced_seconds += seconds_per_buffer
+                        silence_seconds = 0.0
+                        last_voiced_at = time.perf_counter()
+                    else:
+                        silence_seconds += seconds_per_buffer
+                        
+                    phrase_seconds = len(frames) * seconds_per_buffer
+                    if silence_seconds < recognizer.pause_threshold and phrase_seconds < self.max_phrase_seconds:
+                        continue
+                    
+                    # End of phrase: ignore clicks and bumps that are too short to be speech
+                    if voiced_seconds >= recognizer.phrase_threshold:
+                        audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                        self._push(Phrase(audio, last_voiced_at, overlapped))
+                        
+                    speaking = False
+                    frames = []
+                    
+        except Exception as e:
+            print(f"Error in microphone capture: {e}")
+            
+        finally:
+            self._running.clear()
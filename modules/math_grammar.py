@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# Math Grammar Module - Spoken math to expression trees in a single pass
+#
+# tokenize() scans a command once with a precompiled regex and a phrase
+# table; parse() turns the tokens into a tree of hashable namedtuples by
+# precedence climbing; evaluate() computes it under the safe_eval limits.
+#
+#   shift    := sum (SHIFT ["by"] sum)*
+#   sum      := product (("+" | "-") product)*
+#   product  := unary (("*" | "/" | "%") unary)*
+#   unary    := ("-" | "+") unary | postfix ["**" unary]
+#   postfix  := primary ("factorial" | "squared" | "cubed")*
+#   primary  := number | "(" shift ")" | FUNCTION ["of"] unary [UNIT]
+#             | "log" ["base" unary] unary ["base" unary]
+#             | SHIFT unary ["by" unary]
+#             | (FUNCTION | "log") ["of"] unary ("to" | "through") unary ["step" unary]
+
+import re
+import math
+from functools import lru_cache
+from collections import namedtuple
+from modules.safe_eval import apply_operator, check_size, EvaluationError, LimitExceeded, DEFAULT_LIMITS
+
+# Expression tree nodes
+Number = namedtuple("Number", "value")
+BinaryOp = namedtuple("BinaryOp", "op left right")
+Negate = namedtuple("Negate", "operand")
+# name: sin, cos, tan, sqrt, factorial or binary; unit: "deg", "rad" or None
+Call = namedtuple("Call", "name argument unit")
+# base None means base 10
+Log = namedtuple("Log", "argument base")
+# direction: "left" or "right"
+Shift = namedtuple("Shift", "direction value positions")
+# A function over start..stop (inclusive); name is a Call name, "log" or "ln"
+Range = namedtuple("Range", "name start stop step unit")
+
+class GrammarError(EvaluationError):
+    """The command does not contain a calculation the grammar understands"""
+
+_ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+         "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+_TENS = ["twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+
+# Spoken words and phrases -> (token kind, value)
+_WORDS = {}
+_WORDS.update((word, ("numword", value)) for value, word in enumerate(_ONES))
+_WORDS.update((word, ("numword", 20 + 10 * i)) for i, word in enumerate(_TENS))
+_WORDS.update({
+    "hundred": ("scale", 100), "thousand": ("scale", 1000),
+    "million": ("scale", 10 ** 6), "billion": ("scale", 10 ** 9),
+    "point": ("point", None), "and": ("and", None),
+    "plus": ("op", "+"), "minus": ("op", "-"), "negative": ("op", "-"),
+    "times": ("op", "*"), "multiplied by": ("op", "*"),
+    "divided by": ("op", "/"), "over": ("op", "/"),
+    "mod": ("op", "%"), "modulo": ("op", "%"),
+    "to the power of": ("op", "**"), "raised to the power of": ("op", "**"), "power": ("op", "**"),
+    "squared": ("postfix", 2), "cubed": ("postfix", 3), "factorial": ("function", "factorial"),
+    "sine": ("function", "sin"), "sin": ("function", "sin"),
+    "cosine": ("function", "cos"), "cos": ("function", "cos"),
+    "tangent": ("function", "tan"), "tan": ("function", "tan"),
+    "square root": ("function", "sqrt"), "sqrt": ("function", "sqrt"),
+    "binary": ("function", "binary"),
+    "logarithm": ("log", None), "log": ("log", None),
+    "natural logarithm": ("log", math.e), "natural log": ("log", math.e), "ln": ("log", math.e),
+    "base": ("base", None), "by": ("by", None),
+    "to": ("range", None), "through": ("range", None), "thru": ("range", None),
+    "step": ("step", None), "steps": ("step", None), "every": ("step", None),
+    "left shift": ("shift", "left"), "shift left": ("shift", "left"), "shifted left": ("shift", "left"),
+    "right shift": ("shift", "right"), "shift right": ("shift", "right"), "shifted right": ("shift", "right"),
+    "degree": ("unit", "deg"), "degrees": ("unit", "deg"),
+    "radian": ("unit", "rad"), "radians": ("unit", "rad"),
+})
+
+_SYMBOLS = {
+    "+": ("op", "+"), "-": ("op", "-"), "*": ("op", "*"), "/": ("op", "/"), "%": ("op", "%"),
+    "**": ("op", "**"), "^": ("op", "**"), "(": ("(", None), ")": (")", None),
+}
+
+# Words, numbers and operator symbols; everything else is ignored
+_SCAN_RE = re.compile(r"\d+(?:\.\d+)?|\.\d+|[a-z']+|\*\*|[-+*/%^()]")
+
+# Thousands separators, as speech recognition writes "1,000"
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+
+# First word -> [(phrase words, token)], longest phrase first
+_PHRASES = {}
+for _phrase, _token in sorted(_WORDS.items(), key=lambda item: -len(item[0].split())):
+    _words = tuple(_phrase.split())
+    _PHRASES.setdefault(_words[0], []).append((_words, _token))
+for _symbol, _token in _SYMBOLS.items():
+    _PHRASES[_symbol] = [((_symbol,), _token)]
+
+_TRIG = ("sin", "cos", "tan")
+
+# Binary operator tokens -> (precedence, left-associative node builder);
+# "**" is handled separately since it is right-associative
+_BINARY = {
+    ("shift", "left"): (1, lambda left, right: Shift("left", left, right)),
+    ("shift", "right"): (1, lambda left, right: Shift("right", left, right)),
+    ("op", "+"): (2, lambda left, right: BinaryOp("+", left, right)),
+    ("op", "-"): (2, lambda left, right: BinaryOp("-", left, right)),
+    ("op", "*"): (3, lambda left, right: BinaryOp("*", left, right)),
+    ("op", "/"): (3, lambda left, right: BinaryOp("/", left, right)),
+    ("op", "%"): (3, lambda left, right: BinaryOp("%", left, right)),
+}
+
+_END = (None, None)
+
+def tokenize(command):
+    """Return the (kind, value) tokens in a command and the units that follow them
+    
+    Words that aren't math are skipped. Unit words are returned separately
+    as {index of the next token: unit} so the parser can attach a unit to
+    the call whose argument it follows.
+    """
+    words = _SCAN_RE.findall(_THOUSANDS.sub("", command.lower()))
+    tokens = []
+    units = {}
+    i = 0
+    count = len(words)
+    while i < count:
+        word = words[i]
+        i += 1
+        if word[0].isdigit() or word[0] == ".":
+            tokens.append(("number", float(word) if "." in word else int(word)))
+            continue
+        candidates = _PHRASES.get(word)
+        if candidates is None:
+            continue
+        for phrase, token in candidates:
+            size = len(phrase)
+            if size == 1 or tuple(words[i - 1:i - 1 + size]) == phrase:
+                i += size - 1
+                if token[0] == "unit":
+                    units[len(tokens)] = token[1]
+                else:
+                    tokens.append(token)
+                break
+    return tokens, units
+
+class _Parser:
+    """Precedence-climbing parser over a token list"""
+    
+    def __init__(self, tokens, units):
+        self.tokens = tokens + [_END, _END]
+        self.units = units
+        self.pos = 0
+    
+    def parse(self):
+        if len(self.tokens) == 2:
+            raise GrammarError("no calculation found")
+        # A unit ending the command ("... in degrees") applies to every
+        # trig function without its own
+        trailing = self.units.pop(len(self.tokens) - 2, None)
+        tree = self.expression(1)
+        if self.tokens[self.pos] is not _END:
+            raise GrammarError(f"unexpected {self.tokens[self.pos][0]!r}")
+        if trailing:
+            tree = _apply_unit(tree, trailing)
+        return tree
+    
+    def expression(self, min_precedence):
+        """Binary operators at or above min_precedence, left to right"""
+        tree = self.unary()
+        tokens = self.tokens
+        while True:
+            operator = _BINARY.get(tokens[self.pos])
+            if operator is None or operator[0] < min_precedence:
+                return tree
+            self.pos += 1
+            if tokens[self.pos][0] == "by":
+                self.pos += 1
+            tree = operator[1](tree, self.expression(operator[0] + 1))
+    
+    def unary(self):
+        token = self.tokens[self.pos]
+        if token == ("op", "-"):
+            self.pos += 1
+            return Negate(self.unary())
+        if token == ("op", "+"):
+            self.pos += 1
+            return self.unary()
+        tree = self.postfix()
+        if self.tokens[self.pos] == ("op", "**"):
+            # Right-associative, and binds tighter than a unary minus on its left
+            self.pos += 1
+            return BinaryOp("**", tree, self.unary())
+        return tree
+    
+    def postfix(self):
+        tree = self.primary()
+        while True:
+            kind, value = self.tokens[self.pos]
+            if kind == "postfix":
+                tree = BinaryOp("**", tree, Number(value))
+            elif kind == "function" and value == "factorial":
+                tree = Call("factorial", tree, None)
+            else:
+                return tree
+            self.pos += 1
+    
+    def primary(self):
+        kind, value = self.tokens[self.pos]
+        if kind in ("number", "numword", "scale", "point"):
+            return self.number()
+        self.pos += 1
+        
+        if kind == "(":
+            tree = self.expression(1)
+            if self.tokens[self.pos][0] != ")":
+                raise GrammarError("missing closing parenthesis")
+            self.pos += 1
+            return tree
+            
+        if kind == "function":
+            argument = self.unary()
+            # A unit right after the argument belongs to this call
+            unit = self.units.pop(self.pos, None) if value in _TRIG else None
+            if self.tokens[self.pos][0] == "range":
+                return self.range(value, argument, unit)
+            return Call(value, argument, unit)
+            
+        if kind == "log":
+            base = Number(value) if value else None
+            if self.tokens[self.pos][0] == "base":
+                self.pos += 1
+                base = self.unary()
+            argument = self.unary()
+            if self.tokens[self.pos][0] == "range":
+                if base is not None and base != Number(math.e):
+                    raise GrammarError("ranges of logarithms support base 10 and e only")
+                return self.range("ln" if base else "log", argument, None)
+            if self.tokens[self.pos][0] == "base":
+                self.pos += 1
+                base = self.unary()
+            return Log(argument, base)
+            
+        if kind == "shift":
+            number = self.unary()
+            positions = Number(1)
+            if self.tokens[self.pos][0] == "by":
+                self.pos += 1
+                positions = self.unary()
+            return Shift(value, number, positions)
+            
+        raise GrammarError("expected a number" if kind is None else f"unexpected {kind!r}")
+    
+    def range(self, name, start, unit):
+        """The rest of "<function> of <start> to <stop> [in steps of <step>]" """
+        self.pos += 1
+        stop = self.unary()
+        unit = self.units.pop(self.pos, None) or unit
+        step = Number(1)
+        if self.tokens[self.pos][0] == "step":
+            self.pos += 1
+            step = self.unary()
+            unit = self.units.pop(self.pos, None) or unit
+        return Range(name, start, stop, step, unit if name in _TRIG else None)
+    
+    def number(self):
+        """Digits and number words: "42", "twenty five", "one hundred and five", "three point one four" """
+        tokens = self.tokens
+        total = 0
+        current = 0
+        seen = False
+        while True:
+            kind, value = tokens[self.pos]
+            if kind == "number" and not seen:
+                current = value
+            elif kind == "numword":
+                current += value
+            elif kind == "scale":
+                current = (current or 1) * value
+                if value >= 1000:
+                    total += current
+                    current = 0
+            elif kind == "and" and seen and tokens[self.pos + 1][0] == "numword":
+                pass
+            elif kind == "point":
+                self.pos += 1
+                return Number(total + current + self.fraction())
+            else:
+                break
+            seen = True
+            self.pos += 1
+            
+        if not seen:
+            raise GrammarError("expected a number")
+        return Number(total + current)
+    
+    def fraction(self):
+        """Digits after "point", spoken one at a time or written"""
+        kind, value = self.tokens[self.pos]
+        if kind == "number" and isinstance(value, int):
+            self.pos += 1
+            return float("0." + str(value))
+        digits = ""
+        while True:
+            kind, value = self.tokens[self.pos]
+            if kind != "numword" or value > 9:
+                break
+            digits += str(value)
+            self.pos += 1
+        if not digits:
+            raise GrammarError("expected digits after 'point'")
+        return float("0." + digits)
+
+def _apply_unit(tree, unit):
+    """Give every trig call without an explicit unit the command's unit"""
+    if isinstance(tree, Call):
+        argument = _apply_unit(tree.argument, unit)
+        if tree.name in _TRIG and tree.unit is None:
+            return Call(tree.name, argument, unit)
+        return tree._replace(argument=argument)
+    if isinstance(tree, BinaryOp):
+        return tree._replace(left=_apply_unit(tree.left, unit), right=_apply_unit(tree.right, unit))
+    if isinstance(tree, Negate):
+        return Negate(_apply_unit(tree.operand, unit))
+    if isinstance(tree, Log):
+        base = _apply_unit(tree.base, unit) if tree.base is not None else None
+        return Log(_apply_unit(tree.argument, unit), base)
+    if isinstance(tree, Shift):
+        return tree._replace(value=_apply_unit(tree.value, unit), positions=_apply_unit(tree.positions, unit))
+    if isinstance(tree, Range) and tree.name in _TRIG and tree.unit is None:
+        return tree._replace(unit=unit)
+    return tree
+
+@lru_cache(maxsize=256)
+def parse(command):
+    """Parse a spoken calculation into an expression tree (cached per command string)"""
+    return _Parser(*tokenize(command)).parse()
+
+def cache_key(tree):
+    """Return a hashable key for a tree that, unlike the tree itself, tells 2 and 2.0 apart"""
+    if isinstance(tree, Number):
+        return (type(tree.value), tree.value)
+    if isinstance(tree, tuple):
+        return (type(tree),) + tuple(cache_key(part) for part in tree)
+    return tree
+
+def _integer(value, what):
+    """Return value as an int, rejecting fractions"""
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise EvaluationError(f"{what} needs a whole number")
+        return int(value)
+    return value
+
+def _factorial(value, limits):
+    n = _integer(value, "factorial")
+    if n < 0:
+        raise EvaluationError("factorial of a negative number")
+    # log10(n!) from lgamma, so oversized results are refused before computing them
+    if n > 1 and math.lgamma(n + 1) / math.log(10) > limits.max_digits:
+        raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    return math.factorial(n)
+
+def _shift(direction, value, positions, limits):
+    value = _integer(value, "a shift")
+    positions = _integer(positions, "a shift")
+    if positions < 0:
+        raise EvaluationError("negative shift count")
+    if direction == "right":
+        return value >> positions
+    if value and value.bit_length() + positions > limits.max_bits:
+        raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    return value << positions
+
+_CALLS = {
+    "sqrt": lambda value, limits: math.sqrt(value),
+    "factorial": _factorial,
+    "binary": lambda value, limits: bin(_integer(value, "binary"))[2:],
+}
+
+def _evaluate(tree, limits):
+    if isinstance(tree, Number):
+        return tree.value
+    if isinstance(tree, BinaryOp):
+        return apply_operator(tree.op, _evaluate(tree.left, limits), _evaluate(tree.right, limits), limits)
+    if isinstance(tree, Negate):
+        return -_evaluate(tree.operand, limits)
+    if isinstance(tree, Call):
+        value = _evaluate(tree.argument, limits)
+        if isinstance(value, str):
+            raise EvaluationError("binary can't be used inside a calculation")
+        if tree.name in _TRIG:
+            angle = math.radians(value) if tree.unit == "deg" else value
+            return getattr(math, tree.name)(angle)
+        return check_size(_CALLS[tree.name](value, limits), limits)
+    if isinstance(tree, Log):
+        value = _evaluate(tree.argument, limits)
+        if tree.base is None:
+            return math.log10(value)
+        return math.log(value, _evaluate(tree.base, limits))
+    if isinstance(tree, Shift):
+        return _shift(tree.direction, _evaluate(tree.value, limits), _evaluate(tree.positions, limits), limits)
+    if isinstance(tree, Range):
+        raise EvaluationError("a range can't be used inside a calculation")
+    raise EvaluationError(f"unknown node {type(tree).__name__}")
+
+def evaluate(tree, limits=DEFAULT_LIMITS):
+    """Evaluate an expression tree; binary conversions return a string"""
+    try:
+        return _evaluate(tree, limits)
+    except EvaluationError:
+        raise
+    except (ArithmeticError, ValueError, TypeError, RecursionError) as e:
+        # ZeroDivisionError, OverflowError, math domain errors, ...
+        raise EvaluationError(str(e)) from e
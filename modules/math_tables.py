@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Math Tables Module - Vectorized function tables over ranges ("sine of 0 to 90 in steps of 15")
+
+import math
+import itertools
+import numpy as np
+from modules import math_grammar
+from modules.safe_eval import EvaluationError, LimitExceeded, DEFAULT_LIMITS
+from modules.heavy_math import describe
+
+# Most rows a single table may have
+MAX_ROWS = 1000
+
+# Whole-number tables are computed in int64
+_INT64_MAX = np.iinfo(np.int64).max
+
+# Column headings and spoken names per function
+_HEADINGS = {
+    "sin": "sin(x)", "cos": "cos(x)", "tan": "tan(x)", "sqrt": "sqrt(x)",
+    "log": "log10(x)", "ln": "ln(x)", "factorial": "x!", "binary": "binary",
+}
+_NAMES = {
+    "sin": "sine", "cos": "cosine", "tan": "tangent", "sqrt": "square root",
+    "log": "logarithm", "ln": "natural logarithm", "factorial": "factorial", "binary": "binary",
+}
+
+def _float_function(name, unit):
+    """Return the NumPy ufunc pipeline for a floating-point function"""
+    if name in ("sin", "cos", "tan"):
+        ufunc = getattr(np, name)
+        return (lambda x: ufunc(np.radians(x))) if unit == "deg" else ufunc
+    return {"sqrt": np.sqrt, "log": np.log10, "ln": np.log}[name]
+
+def arguments(tree):
+    """Return the x values of a Range as a NumPy array (int64 when every bound is whole)"""
+    start = math_grammar.evaluate(tree.start)
+    stop = math_grammar.evaluate(tree.stop)
+    step = abs(math_grammar.evaluate(tree.step))
+    if step == 0:
+        raise EvaluationError("the step can't be zero")
+    if stop < start:
+        step = -step
+        
+    # Whole-number bounds must fit in int64 and all others in a float
+    whole = all(isinstance(value, int) for value in (start, stop, step))
+    if whole and max(abs(start), abs(stop), abs(step)) > _INT64_MAX:
+        raise LimitExceeded("numbers too large for a table")
+    try:
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        if count > MAX_ROWS:
+            raise LimitExceeded(f"more than {MAX_ROWS} values")
+        
+        # start + step * i avoids the drift of repeatedly adding a float step
+        return start + step * np.arange(count, dtype=np.int64 if whole else np.float64)
+    except OverflowError as e:
+        raise LimitExceeded("numbers too large for a table") from e
+
+def _binary(x):
+    """Binary strings for a whole-number array, built from one bit matrix"""
+    if x.dtype.kind != "i":
+        raise EvaluationError("binary needs whole numbers")
+    if (x < 0).any():
+        raise EvaluationError("binary needs non-negative numbers")
+    width = max(int(x.max()).bit_length(), 1)
+    bits = (x[:, None] >> np.arange(width - 1, -1, -1)) & 1
+    # Rows of ASCII '0'/'1' bytes viewed as fixed-width strings
+    text = (bits + ord("0")).astype(np.uint8).view(f"S{width}").ravel()
+    stripped = np.char.lstrip(text, b"0")
+    return np.where(stripped == b"", b"0", stripped).astype(str)
+
+def _factorials(x, limits):
+    """Exact factorials from one running product up to the largest x"""
+    if x.dtype.kind != "i":
+        raise EvaluationError("factorial needs whole numbers")
+    if (x < 0).any():
+        raise EvaluationError("factorial of a negative number")
+    largest = int(x.max())
+    if largest > 1 and math.lgamma(largest + 1) / math.log(10) > limits.max_digits:
+        raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    table = [1] + list(itertools.accumulate(range(1, largest + 1), lambda a, b: a * b))
+    return np.array([table[n] for n in x.tolist()], dtype=object)
+
+def evaluate_range(tree, limits=DEFAULT_LIMITS):
+    """Evaluate a Range tree and return (x values, results) as arrays"""
+    x = arguments(tree)
+    if tree.name == "binary":
+        return x, _binary(x)
+    if tree.name == "factorial":
+        return x, _factorials(x, limits)
+    with np.errstate(all="ignore"):
+        # Out-of-domain values (sqrt of -1, log of 0) come back as nan/inf
+        return x, _float_function(tree.name, tree.unit)(x.astype(np.float64))
+
+def _format_values(values):
+    """Format a result column as strings"""
+    if values.dtype.kind == "f":
+        text = np.char.mod("%.4f", values)
+        big = np.abs(values) >= 1e6
+        if big.any():
+            text = np.where(big, np.char.mod("%.4g", values), text)
+        return np.where(np.isfinite(values), text, "undefined")
+    if values.dtype == object:
+        return np.array([describe(value) if value.bit_length() > 64 else str(value) for value in values])
+    return values.astype(str)
+
+def format_table(tree, x, values):
+    """Return a two-column text table for display"""
+    unit = "°" if tree.unit == "deg" else ""
+    left = np.char.add(np.char.mod("%g", x) if x.dtype.kind == "f" else x.astype(str), unit)
+    right = _format_values(values)
+    heading = _HEADINGS[tree.name]
+    left_width = max(1, int(np.char.str_len(left).max()))
+    right_width = max(len(heading), int(np.char.str_len(right).max()))
+    
+    lines = [f"{'x':>{left_width}} | {heading}", f"{'-' * left_width}-+-{'-' * right_width}"]
+    lines.extend(f"{a:>{left_width}} | {b}" for a, b in zip(left.tolist(), right.tolist()))
+    return "\n".join(lines)
+
+def spoken_summary(tree, x, values):
+    """Return a short sentence describing the table"""
+    unit = " degrees" if tree.unit == "deg" else ""
+    first, last = x[0].item(), x[-1].item()
+    summary = f"Here is the {_NAMES[tree.name]} of {first:g} to {last:g}{unit}, {len(x)} values"
+    if values.dtype.kind == "f":
+        finite = values[np.isfinite(values)]
+        if finite.size:
+            summary += f", ranging from {finite.min():.4g} to {finite.max():.4g}"
+    else:
+        summary += f". The last one is {describe(values[-1]) if values.dtype == object else values[-1]}"
+    return summary + "."
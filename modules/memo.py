@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Memo Module - Bounded LRU cache with hit, miss and eviction counters
+
+import threading
+from collections import OrderedDict, namedtuple
+
+# Counters reported by LRUCache.cache_info(), like functools' CacheInfo plus evictions
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions maxsize currsize")
+
+# Returned by get() on a miss (None is a valid cached value)
+MISSING = object()
+
+class LRUCache:
+    """Thread-safe least-recently-used cache holding at most maxsize entries"""
+    
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+    
+    def get(self, key):
+        """Return the value cached under key, or MISSING"""
+        with self._lock:
+            value = self._data.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        """Cache a value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() and caching its result on a miss
+        
+        Exceptions from compute() propagate and nothing is cached.
+        """
+        value = self.get(key)
+        if value is MISSING:
+            # Computed outside the lock: a slow calculation doesn't block other lookups
+            value = compute()
+            self.put(key, value)
+        return value
+    
+    def cache_info(self):
+        """Return the hit, miss and eviction counters and the current size"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+    
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
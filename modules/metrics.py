@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Metrics Module - Lightweight latency spans, histograms and exporters
+#
+# Tracing is off unless ASSISTANT_METRICS=1 (or enable() is called). While
+# disabled, span() hands back a shared no-op context manager, so instrumented
+# code pays one function call and a flag check.
+
+import os
+import json
+import time
+import bisect
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" values)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+class Histogram:
+    """Latency histogram with fixed buckets plus a window of recent samples for percentiles"""
+    
+    def __init__(self, window=2048):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+    
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+    
+    def percentile(self, p, samples=None):
+        """Return the p-th percentile (seconds) of the recent samples"""
+        samples = samples if samples is not None else sorted(self.recent)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+    
+    def summary(self):
+        """Return count, mean and p50/p95/p99/max in milliseconds"""
+        samples = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50, samples) * 1000,
+            "p95_ms": self.percentile(95, samples) * 1000,
+            "p99_ms": self.percentile(99, samples) * 1000,
+            "max_ms": self.max * 1000
+        }
+
+class MetricsRegistry:
+    """Named histograms shared by the whole process"""
+    
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+    
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+    
+    def snapshot(self):
+        """Return {span name: summary} for every histogram"""
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+    
+    def write_json(self, path):
+        """Write a snapshot to a JSON file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"timestamp": time.time(), "spans": self.snapshot()}, f, indent=4)
+    
+    def prometheus_text(self):
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = [
+            "# HELP assistant_span_seconds Time spent in each traced stage",
+            "# TYPE assistant_span_seconds histogram"
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'assistant_span_seconds_bucket{{span="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'assistant_span_seconds_sum{{span="{label}"}} {histogram.sum}')
+                lines.append(f'assistant_span_seconds_count{{span="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+_enabled = os.getenv('ASSISTANT_METRICS', '') == '1'
+
+class _NullSpan:
+    """Shared no-op span used while tracing is disabled"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+def span(name):
+    """Context manager that records the time spent in its block under name"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def observe(name, seconds):
+    """Record a latency measured elsewhere"""
+    if _enabled:
+        registry.observe(name, seconds)
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics (Prometheus text) and /metrics.json"""
+    
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = registry.prometheus_text().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+            
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Keep scrapes out of the assistant's console output
+        pass
+
+def start_http_server(port, host="127.0.0.1"):
+    """Serve metrics over HTTP from a daemon thread and return the server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http")
+    thread.daemon = True
+    thread.start()
+    return server
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# News Digest Module - Near-duplicate headline clustering with MinHash/LSH
+
+import re
+import zlib
+from collections import namedtuple
+import numpy as np
+
+# A story in the digest: the headline read out (without the " - Source"
+# suffix), its source, URL and category, the names of every source that
+# carried it and every article in its cluster
+Story = namedtuple("Story", "title source url category sources articles")
+
+# Headlines sharing at least this fraction of their words are the same story
+SIMILARITY = 0.4
+
+# 64 hash functions in 32 bands of 2 rows: pairs at SIMILARITY share a band
+# over 99% of the time. Looser pairs become candidates too, but headlines
+# about different things share almost no words, and every candidate is
+# checked exactly anyway
+NUM_PERM = 64
+BANDS = 32
+
+# Odd 64-bit multiplier for mixing a band's rows into one key (wraps around modulo 2 ** 64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# NewsAPI titles end with " - Source Name"
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]+$")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have he her his in is it its of on or say said she
+that the their they this to was were will with after over into new amid about more than
+""".split())
+
+def strip_source(title):
+    """Drop the " - Source Name" NewsAPI appends to a title"""
+    return _SOURCE_SUFFIX.sub("", title or "").strip()
+
+def headline_tokens(title):
+    """The words of a headline that say what it's about ("Fed Raises Rates - Reuters" -> {"fed", "raise", "rate"})"""
+    tokens = set()
+    for word in _WORD.findall(strip_source(title).lower()):
+        word = word.split("'")[0]
+        # Plurals and third person verbs ("rates", "raises") match their stem
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in _STOPWORDS:
+            tokens.add(word)
+    return frozenset(tokens)
+
+def jaccard(a, b):
+    """Similarity of two token sets"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+class HeadlineClusterer:
+    """Groups near-duplicate headlines without comparing every pair
+    
+    Each headline's token set gets a MinHash signature (computed for all
+    headlines at once with NumPy). Signatures are cut into bands and only
+    headlines with an identical band become candidate pairs. Candidates are
+    confirmed with the exact Jaccard similarity of their tokens and merged
+    with union-find, so a story is one cluster however many sources carry it.
+    """
+    
+    def __init__(self, threshold=SIMILARITY, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        # Multiply-shift hash functions: the top 32 bits of (a * x + b) mod 2 ** 64, a odd
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True)
+    
+    def signatures(self, token_sets):
+        """MinHash signatures as an (n, num_perm) array; empty sets get all-ones rows that match nothing"""
+        signatures = np.full((len(token_sets), self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        rows = [i for i, tokens in enumerate(token_sets) if tokens]
+        if not rows:
+            return signatures
+        
+        # Hash every token of every headline in one array, then take the
+        # minimum of each hash function over each headline's slice of it
+        hashes = np.fromiter((zlib.crc32(token.encode()) for i in rows for token in token_sets[i]), dtype=np.uint64)
+        starts = np.cumsum([0] + [len(token_sets[i]) for i in rows[:-1]])
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        signatures[rows] = np.minimum.reduceat(permuted, starts, axis=1).T
+        return signatures
+    
+    def candidate_pairs(self, signatures):
+        """Sorted pairs (i, j), i < j, whose signatures agree on at least one whole band"""
+        valid = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint64).max)
+        if len(valid) < 2:
+            return []
+        
+        # One 64-bit key per (headline, band): the band's rows mixed together
+        # with its number, so equal keys (almost always) mean an equal band.
+        # A rare collision only adds a candidate, which the exact check drops
+        rows = self.num_perm // self.bands
+        bands = signatures[valid].reshape(len(valid), self.bands, rows)
+        keys = np.arange(1, self.bands + 1, dtype=np.uint64)[None, :] * _MIX
+        for row in range(rows):
+            keys = (keys ^ bands[:, :, row]) * _MIX
+        keys = keys.reshape(-1)
+        
+        # Sort once and read off the runs of equal keys (buckets of 2 or more headlines)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        starts = np.flatnonzero(same & ~np.concatenate([[False], same[:-1]]))
+        ends = np.flatnonzero(same & ~np.concatenate([same[1:], [False]])) + 2
+        headlines = valid[order // self.bands]
+        
+        # Most buckets are a pair: those are paired up in one go, the rest one by one
+        count = len(signatures)
+        pair_starts = starts[ends - starts == 2]
+        first, second = headlines[pair_starts], headlines[pair_starts + 1]
+        codes = set((np.minimum(first, second) * count + np.maximum(first, second)).tolist())
+        listed = headlines.tolist()
+        for start, end in zip(starts[ends - starts > 2].tolist(), ends[ends - starts > 2].tolist()):
+            members = sorted(set(listed[start:end]))
+            codes.update(i * count + j for k, i in enumerate(members) for j in members[k + 1:])
+        return [(code // count, code % count) for code in sorted(codes) if code // count != code % count]
+    
+    def cluster(self, titles):
+        """Group headlines into stories; returns lists of indices, each in title order"""
+        token_sets = [headline_tokens(title) for title in titles]
+        parent = list(range(len(titles)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+            
+        for i, j in self.candidate_pairs(self.signatures(token_sets)):
+            root_i, root_j = find(i), find(j)
+            # Already joined through other headlines: no need to compare
+            if root_i != root_j and jaccard(token_sets[i], token_sets[j]) >= self.threshold:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+                
+        clusters = {}
+        for i in range(len(titles)):
+            clusters.setdefault(find(i), []).append(i)
+        return list(clusters.values())
+
+def story_from_article(article, category=None):
+    """A Story of one article (for headlines read a category at a time)"""
+    source = (article.get("source") or {}).get("name")
+    return Story(strip_source(article.get("title")), source, article.get("url"), category,
+                 [source] if source else [], [article])
+
+def build_digest(articles_by_category, clusterer=None):
+    """Cluster every category's articles into Stories, biggest and highest-ranked first
+    
+    articles_by_category maps a category to NewsAPI articles in their
+    ranked order. A story is read from its highest-ranked article.
+    """
+    clusterer = clusterer or HeadlineClusterer()
+    articles = []
+    for category, listed in articles_by_category.items():
+        for rank, article in enumerate(listed):
+            if article.get("title") and strip_source(article["title"]) != "[Removed]":
+                articles.append((rank, category, article))
+                
+    stories = []
+    for cluster in clusterer.cluster([article["title"] for _, _, article in articles]):
+        members = sorted((articles[i] for i in cluster), key=lambda entry: entry[0])
+        rank, category, article = members[0]
+        sources = []
+        for _, _, member in members:
+            name = (member.get("source") or {}).get("name")
+            if name and name not in sources:
+                sources.append(name)
+        stories.append((-len(sources), rank, Story(strip_source(article["title"]),
+                                                   (article.get("source") or {}).get("name"), article.get("url"), category, sources,
+                                                   [member for _, _, member in members])))
+    # Stories carried by the most sources first, then the highest-ranked
+    stories.sort(key=lambda entry: entry[:2])
+    return [story for _, _, story in stories]
@@ -12,10 +12,12 @@ from datetime import datetime
 import subprocess
 
 class SystemFunctions:
-    def __init__(self):
-        # Import speech engine
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # Create directories if they don't exist
         self.screenshots_dir = os.path.join("assets", "screenshots")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Phrase Cache Module - Pre-rendered speech for fixed responses
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+class PhraseCache:
+    """Disk-backed LRU cache of rendered audio keyed by (text, voice, rate)"""
+    
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.path.join("assets", "data", "tts_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+        # Size cap for the whole cache (TTS_CACHE_MAX_MB, 50 MB by default)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('TTS_CACHE_MAX_MB', '50')) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        
+        # Cached files, least recently used first: filename -> size in bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._load_index()
+    
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".wav") and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+        
+        # Least recently used (oldest mtime) first
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+            
+        self._evict()
+    
+    def _filename(self, text, voice, rate):
+        """Return the cache filename for a (text, voice, rate) key"""
+        key = f"{voice}\0{rate}\0{text}".encode("utf-8")
+        return hashlib.sha1(key).hexdigest() + ".wav"
+    
+    def _evict(self):
+        """Drop least recently used files until the cache fits its size cap"""
+        while self._entries and self._total_bytes > self.max_bytes:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+    
+    def get(self, text, voice, rate):
+        """Return the path of the rendered phrase, or None on a cache miss"""
+        name = self._filename(text, voice, rate)
+        path = os.path.join(self.cache_dir, name)
+        
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            
+            # Mark as most recently used, in memory and on disk
+            self._entries.move_to_end(name)
+            self.hits += 1
+            
+        try:
+            os.utime(path)
+        except OSError:
+            # The file was removed behind our back, forget it
+            with self._lock:
+                self._total_bytes -= self._entries.pop(name, 0)
+            return None
+            
+        return path
+    
+    def contains(self, text, voice, rate):
+        """Check whether a phrase is cached without touching its LRU position"""
+        with self._lock:
+            return self._filename(text, voice, rate) in self._entries
+    
+    def put(self, text, voice, rate, render):
+        """Render a phrase with render(path) and add it to the cache"""
+        name = self._filename(text, voice, rate)
+        path = os.path.join(self.cache_dir, name)
+        
+        render(path)
+        
+        # Some drivers silently produce nothing, don't cache empty files
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+            
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            size = os.path.getsize(path)
+            self._entries[name] = size
+            self._total_bytes += size
+            self._evict()
+            return path if name in self._entries else None
+    
+    def stats(self):
+        """Return cache size and hit statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
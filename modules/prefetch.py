@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Prefetch Module - Background warm-up of cached API responses
+
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# home_city: weather to keep warm; categories: news categories to keep warm;
+# interval: seconds between refresh rounds
+PrefetchConfig = namedtuple("PrefetchConfig", "home_city categories interval")
+
+# Refresh a little more often than the weather TTL, so the home city never goes stale
+DEFAULT_INTERVAL = 9 * 60
+
+def config_from_env():
+    """Read HOME_CITY, PREFETCH_NEWS (comma-separated categories) and PREFETCH_INTERVAL
+    
+    Returns None when there is nothing to prefetch or PREFETCH=0.
+    """
+    if os.getenv('PREFETCH', '1') == '0':
+        return None
+    home_city = os.getenv('HOME_CITY', '').strip()
+    categories = tuple(category.strip().lower() for category in os.getenv('PREFETCH_NEWS', '').split(",")
+                       if category.strip())
+    if not home_city and not categories:
+        return None
+    return PrefetchConfig(home_city, categories, float(os.getenv('PREFETCH_INTERVAL', DEFAULT_INTERVAL)))
+
+class Prefetcher:
+    """Runs warm-up jobs on a small thread pool at startup and then every interval seconds
+    
+    load_jobs() -> [(label, function), ...] is called once on the prefetch
+    thread, so whatever it needs (creating the utility module, opening the
+    cache) happens off the caller's thread too. A failing job is logged and
+    tried again next round.
+    """
+    
+    def __init__(self, load_jobs, interval, workers=2):
+        self.load_jobs = load_jobs
+        self.interval = interval
+        self.rounds = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._thread = threading.Thread(target=self._run, name="prefetch")
+        self._thread.daemon = True
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        """Run every job, wait for the next round, repeat until stopped"""
+        try:
+            jobs = self.load_jobs()
+        except Exception as e:
+            print(f"Prefetch error: {e}")
+            return
+            
+        while jobs and not self._stop.is_set():
+            try:
+                futures = [(label, self._executor.submit(job)) for label, job in jobs]
+            except RuntimeError:
+                # Stopped while submitting
+                return
+            wait([future for _, future in futures])
+            for label, future in futures:
+                if not future.cancelled() and future.exception() is not None:
+                    self.failures += 1
+                    print(f"Prefetch error ({label}): {future.exception()}")
+            self.rounds += 1
+            self._stop.wait(self.interval)
+    
+    def stop(self):
+        """Cancel pending jobs, wait for running ones (bounded by the HTTP deadlines) and stop"""
+        self._stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Recognition Module - Pluggable speech recognition backends
+
+import os
+import json
+import time
+import wave
+import hashlib
+import speech_recognition as sr
+from modules.listener import Phrase, StreamingListener
+
+class RecognitionBackend:
+    """Turns captured audio into text and provides the matching audio source"""
+    
+    name = None
+    
+    def create_listener(self, recognizer, is_playing=None):
+        """Return a listener with start(), stop() and get(timeout) methods
+        
+        is_playing tells whether the assistant is speaking, for listeners
+        that can hear it (see StreamingListener).
+        """
+        raise NotImplementedError
+    
+    def recognize(self, audio):
+        """Return the text for an sr.AudioData, or raise sr.UnknownValueError"""
+        raise NotImplementedError
+
+class GoogleBackend(RecognitionBackend):
+    """Google Web Speech API over the network, fed by the live microphone"""
+    
+    name = "google"
+    
+    def __init__(self, recognizer, language="en-US"):
+        self.recognizer = recognizer
+        self.language = language
+    
+    def create_listener(self, recognizer, is_playing=None):
+        microphone = sr.Microphone()
+        
+        # Calibrate recognizer for ambient noise
+        with microphone as source:
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            
+        return StreamingListener(microphone, recognizer, is_playing=is_playing)
+    
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+class CorpusBackend(RecognitionBackend):
+    """Offline stand-in that replays a WAV corpus and decodes it from a transcript map
+    
+    The corpus directory holds WAV files plus a transcripts.json mapping each
+    file name to its text. Audio is matched by a fingerprint of its raw frames,
+    so recognition is an exact, network-free lookup.
+    """
+    
+    name = "corpus"
+    
+    def __init__(self, corpus_dir, transcripts_file=None, loop=False):
+        self.corpus_dir = corpus_dir
+        self.loop = loop
+        
+        if transcripts_file is None:
+            transcripts_file = os.path.join(corpus_dir, "transcripts.json")
+        with open(transcripts_file) as f:
+            transcripts = json.load(f)
+        
+        # Load every utterance once: (audio, text) in file name order
+        self.utterances = []
+        self._texts = {}
+        for filename in sorted(transcripts):
+            audio = self._load_wav(os.path.join(corpus_dir, filename))
+            self.utterances.append((audio, transcripts[filename]))
+            self._texts[self.fingerprint(audio)] = transcripts[filename]
+    
+    def _load_wav(self, path):
+        """Read a WAV file into an sr.AudioData"""
+        with wave.open(path, "rb") as wav:
+            frames = wav.readframes(wav.getnframes())
+            return sr.AudioData(frames, wav.getframerate(), wav.getsampwidth())
+    
+    def fingerprint(self, audio):
+        """Identify audio by a hash of its raw frames"""
+        return hashlib.sha1(audio.frame_data).hexdigest()
+    
+    def create_listener(self, recognizer, is_playing=None):
+        # Replayed audio never contains the assistant's own speech
+        return CorpusListener(self.utterances, loop=self.loop)
+    
+    def recognize(self, audio):
+        text = self._texts.get(self.fingerprint(audio))
+        if text is None:
+            raise sr.UnknownValueError()
+        return text
+
+class CorpusListener:
+    """Serves corpus utterances as if they had just been spoken"""
+    
+    def __init__(self, utterances, loop=False):
+        self.utterances = utterances
+        self.loop = loop
+        self._position = 0
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def get(self, timeout=None):
+        """Return the next utterance as a Phrase, or None once the corpus is exhausted"""
+        if self._position >= len(self.utterances):
+            if not self.loop or not self.utterances:
+                # Behave like a quiet room once the corpus runs out
+                if timeout:
+                    time.sleep(timeout)
+                return None
+            self._position = 0
+            
+        audio, _ = self.utterances[self._position]
+        self._position += 1
+        return Phrase(audio, time.perf_counter())
+
+def create_backend(recognizer, name=None):
+    """Build the backend selected by name or the SPEECH_BACKEND setting"""
+    name = (name or os.getenv('SPEECH_BACKEND', 'google')).lower()
+    
+    if name == "google":
+        return GoogleBackend(recognizer, language=os.getenv('SPEECH_LANGUAGE', 'en-US'))
+        
+    if name == "corpus":
+        corpus_dir = os.getenv('SPEECH_CORPUS_DIR', os.path.join("assets", "data", "speech_corpus"))
+        return CorpusBackend(corpus_dir, loop=os.getenv('SPEECH_CORPUS_LOOP', '') == '1')
+        
+    raise ValueError(f"Unknown speech recognition backend: {name}")
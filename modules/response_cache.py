@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# Response Cache Module - Disk-backed TTL cache for API responses with stale-while-revalidate
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# ttl: seconds a response is fresh; max_stale: seconds it may still be
+# served instantly (while a background refresh fetches a new one)
+CachePolicy = namedtuple("CachePolicy", "ttl max_stale")
+
+POLICIES = {
+    "weather": CachePolicy(ttl=10 * 60, max_stale=3 * 3600),
+    "news": CachePolicy(ttl=15 * 60, max_stale=12 * 3600),
+}
+DEFAULT_POLICY = CachePolicy(ttl=5 * 60, max_stale=3600)
+
+CACHE_FILE = os.path.join("assets", "data", "response_cache.db")
+
+# Longest a lookup waits for a refresh of the same key that is already running
+# (the HTTP client's deadlines end it well before this)
+COALESCE_TIMEOUT = 20
+
+# A response from the cache or the network; state is "fresh", "stale" or "miss"
+CachedResponse = namedtuple("CachedResponse", "status data fetched_at state")
+
+# Counters for one source (or all of them)
+ResponseCacheInfo = namedtuple("ResponseCacheInfo", "hits stale_hits misses refreshes errors")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+"""
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+def normalize_key(text):
+    """Cache key for spoken text: case, punctuation and spacing don't matter ("New  York!" -> "new york")"""
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+class ResponseCache:
+    """API responses kept in SQLite, fresh for a per-source TTL
+    
+    get() answers from the cache while a response is fresh. Once it is
+    older than the TTL, but not older than max_stale, the stale response is
+    still returned at once and a refresh runs in the background, so only
+    the first request for a key ever waits for the network. Only 200
+    responses are stored.
+    """
+    
+    def __init__(self, path=CACHE_FILE, policies=None, workers=2):
+        self.policies = dict(POLICIES, **(policies or {}))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        
+        # Background refreshes, at most one queued per key, and an event per
+        # refresh in progress (set when it ends) for lookups to wait on
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-refresh")
+        self._refreshing = set()
+        self._inflight = {}
+        self._counters = {}
+        
+        self.prune()
+    
+    def policy(self, source):
+        return self.policies.get(source, DEFAULT_POLICY)
+    
+    def _count(self, source, counter):
+        with self._lock:
+            counters = self._counters.setdefault(source, dict.fromkeys(ResponseCacheInfo._fields, 0))
+            counters[counter] += 1
+    
+    def cache_info(self, source=None):
+        """Return the ResponseCacheInfo for one source, or summed over all of them"""
+        with self._lock:
+            sources = [self._counters.get(source, {})] if source else list(self._counters.values())
+            return ResponseCacheInfo(*(sum(counters.get(field, 0) for counters in sources)
+                                       for field in ResponseCacheInfo._fields))
+    
+    def sources(self):
+        """The sources requested so far"""
+        with self._lock:
+            return sorted(self._counters)
+    
+    def lookup(self, source, key):
+        """Return (fetched_at, data) for a stored response, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT fetched_at, data FROM responses WHERE source = ? AND key = ?",
+                                   (source, key)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+    
+    def store(self, source, key, data, fetched_at=None):
+        """Store a response body"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses (source, key, fetched_at, data) VALUES (?, ?, ?, ?)",
+                             (source, key, fetched_at or time.time(), json.dumps(data)))
+    
+    def get(self, source, key, fetch):
+        """Return a CachedResponse for (source, key); fetch() -> (status, data) is called when needed"""
+        policy = self.policy(source)
+        entry = self.lookup(source, key)
+        if entry is None or time.time() - entry[0] >= policy.max_stale:
+            # A refresh (e.g. the prefetcher's) is already fetching it: wait instead of fetching twice
+            with self._lock:
+                pending = self._inflight.get((source, key))
+            if pending is not None and pending.wait(COALESCE_TIMEOUT):
+                entry = self.lookup(source, key)
+        if entry is not None:
+            fetched_at, data = entry
+            age = time.time() - fetched_at
+            if age < policy.ttl:
+                self._count(source, "hits")
+                return CachedResponse(200, data, fetched_at, "fresh")
+            if age < policy.max_stale:
+                self._count(source, "stale_hits")
+                self.refresh_later(source, key, fetch)
+                return CachedResponse(200, data, fetched_at, "stale")
+                
+        self._count(source, "misses")
+        status, data = fetch()
+        fetched_at = time.time()
+        if status == 200:
+            self.store(source, key, data, fetched_at)
+        return CachedResponse(status, data, fetched_at, "miss")
+    
+    def refresh(self, source, key, fetch):
+        """Fetch and store a response now; returns the status code"""
+        self._count(source, "refreshes")
+        with self._lock:
+            done = self._inflight.setdefault((source, key), threading.Event())
+        try:
+            status, data = fetch()
+            if status == 200:
+                self.store(source, key, data)
+            else:
+                self._count(source, "errors")
+            return status
+        except Exception:
+            self._count(source, "errors")
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get((source, key)) is done:
+                    del self._inflight[(source, key)]
+            done.set()
+    
+    def warm(self, source, key, fetch, within=0):
+        """Refresh a response unless it will still be fresh in `within` seconds; returns the status or None"""
+        entry = self.lookup(source, key)
+        if entry is not None and time.time() + within - entry[0] < self.policy(source).ttl:
+            return None
+        return self.refresh(source, key, fetch)
+    
+    def refresh_later(self, source, key, fetch):
+        """Refresh a response in the background unless a refresh for it is already running"""
+        with self._lock:
+            if (source, key) in self._refreshing:
+                return None
+            self._refreshing.add((source, key))
+        try:
+            return self._executor.submit(self._background_refresh, source, key, fetch)
+        except RuntimeError:
+            # Shutting down
+            with self._lock:
+                self._refreshing.discard((source, key))
+            return None
+    
+    def _background_refresh(self, source, key, fetch):
+        try:
+            return self.refresh(source, key, fetch)
+        except Exception as e:
+            # The stale response keeps being served until max_stale
+            print(f"Cache refresh error ({source}, {key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((source, key))
+    
+    def prune(self):
+        """Delete responses too old to be served, whatever their source"""
+        now = time.time()
+        with self._lock:
+            for source, in self._db.execute("SELECT DISTINCT source FROM responses").fetchall():
+                self._db.execute("DELETE FROM responses WHERE source = ? AND fetched_at < ?",
+                                 (source, now - self.policy(source).max_stale))
+    
+    def close(self):
+        """Stop background refreshes and close the database"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._db.close()
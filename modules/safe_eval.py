@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Safe Eval Module - Size-limited arithmetic operators for the calculator
+
+import math
+import operator
+
+# Default limits: largest exponent accepted by ** (for integer and float
+# bases alike) and largest integer result in decimal digits (below the
+# 4300-digit int-to-str limit)
+MAX_EXPONENT = 100000
+MAX_RESULT_DIGITS = 4000
+
+class Limits:
+    """Exponent and result-size caps applied while evaluating"""
+    
+    def __init__(self, max_exponent=MAX_EXPONENT, max_digits=MAX_RESULT_DIGITS):
+        self.max_exponent = max_exponent
+        self.max_digits = max_digits
+        self.max_bits = int(max_digits * math.log2(10)) + 1
+
+DEFAULT_LIMITS = Limits()
+
+class EvaluationError(ValueError):
+    """The expression is invalid or could not be evaluated"""
+
+class LimitExceeded(EvaluationError):
+    """Evaluating the expression would exceed the exponent or result size limits"""
+
+def check_size(value, limits):
+    """Reject integers with more than limits.max_digits digits"""
+    if isinstance(value, int) and value.bit_length() > limits.max_bits:
+        raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    return value
+
+def _power(base, exponent, limits):
+    """Exponentiation that refuses results too large to compute quickly"""
+    if abs(exponent) > limits.max_exponent:
+        raise LimitExceeded(f"exponent larger than {limits.max_exponent}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        # Estimate the result's size before building it
+        if exponent * math.log10(abs(base)) > limits.max_digits:
+            raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise EvaluationError("result is not a real number")
+    return result
+
+def _multiply(left, right, limits):
+    """Multiplication that refuses integer results that are too large"""
+    if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right.bit_length() > limits.max_bits + 1:
+        raise LimitExceeded(f"result has more than {limits.max_digits} digits")
+    return left * right
+
+def _plain(apply):
+    """Adapt a two-argument operator to the (left, right, limits) signature"""
+    return lambda left, right, limits: apply(left, right)
+
+# Whitelisted operators by symbol
+OPERATORS = {
+    "+": _plain(operator.add),
+    "-": _plain(operator.sub),
+    "*": _multiply,
+    "/": _plain(operator.truediv),
+    "//": _plain(operator.floordiv),
+    "%": _plain(operator.mod),
+    "**": _power,
+}
+
+def apply_operator(symbol, left, right, limits=DEFAULT_LIMITS):
+    """Apply a whitelisted binary operator, refusing results that exceed the limits"""
+    return check_size(OPERATORS[symbol](left, right, limits), limits)
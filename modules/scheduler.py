@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Scheduler Module - Named timers and reminders run by one thread from a min-heap
+
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+from collections import namedtuple
+
+# A pending timer: due is wall-clock time (time.time()) so it means the same
+# after a restart; message is None for timers and the text of a reminder
+Timer = namedtuple("Timer", "name due message")
+
+# Where the assistant keeps its pending timers between runs
+TIMERS_FILE = os.path.join("assets", "data", "timers.json")
+
+# Seconds a change may wait before the timer file is rewritten, so a burst
+# of changes is saved once
+SAVE_DELAY = 0.25
+
+class TimerScheduler:
+    """Pending timers kept in a min-heap and fired by a single thread
+    
+    The thread sleeps on a condition variable until the earliest timer is
+    due or the timers change, so any number of timers costs one thread and
+    O(log n) per change. Cancelled and rescheduled timers leave stale heap
+    entries behind, which are skipped when they reach the top. on_fire(timer,
+    late) runs on the scheduler thread, late being how many seconds after
+    its due time the timer fired, and must not block.
+    """
+    
+    def __init__(self, path, on_fire):
+        self.path = path
+        self.on_fire = on_fire
+        self.last_fired = None
+        self._cond = threading.Condition()
+        # Heap of (due, sequence, name); name -> (Timer, sequence) for live entries
+        self._heap = []
+        self._timers = {}
+        self._sequence = itertools.count()
+        self._dirty_since = None
+        self._stopped = False
+        
+        # Timers that fell due while the assistant wasn't running fire straight away
+        for timer in _load(path):
+            self._push(timer)
+            
+        self._thread = threading.Thread(target=self._run, name="timer-scheduler")
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def __len__(self):
+        with self._cond:
+            return len(self._timers)
+    
+    def __contains__(self, name):
+        with self._cond:
+            return name in self._timers
+    
+    def _push(self, timer):
+        """Add or replace a timer (caller holds the lock)"""
+        sequence = next(self._sequence)
+        self._timers[timer.name] = (timer, sequence)
+        heapq.heappush(self._heap, (timer.due, sequence, timer.name))
+        
+        # Rebuild the heap once stale entries outnumber live ones
+        if len(self._heap) > 2 * len(self._timers) + 64:
+            self._heap = [(timer.due, sequence, name) for name, (timer, sequence) in self._timers.items()]
+            heapq.heapify(self._heap)
+    
+    def _changed(self):
+        """Note a change to save and wake the scheduler thread (caller holds the lock)"""
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        self._cond.notify()
+    
+    def schedule(self, name, seconds, message=None):
+        """Start a timer firing in seconds (replacing any timer with the same name)"""
+        timer = Timer(name, time.time() + seconds, message)
+        with self._cond:
+            self._push(timer)
+            self._changed()
+        return timer
+    
+    def cancel(self, name):
+        """Cancel a timer; returns it, or None if there is no such timer"""
+        with self._cond:
+            entry = self._timers.pop(name, None)
+            if entry is None:
+                return None
+            self._changed()
+            return entry[0]
+    
+    def cancel_all(self):
+        """Cancel every timer and return how many there were"""
+        with self._cond:
+            count = len(self._timers)
+            self._timers.clear()
+            self._heap = []
+            self._changed()
+            return count
+    
+    def snooze(self, name, seconds):
+        """Postpone a pending timer, or restart the last fired one, by seconds
+        
+        Returns the rescheduled Timer, or None if name is neither pending nor
+        the timer that fired last.
+        """
+        with self._cond:
+            entry = self._timers.get(name)
+            if entry is not None:
+                timer = entry[0]._replace(due=entry[0].due + seconds)
+            elif self.last_fired is not None and self.last_fired.name == name:
+                timer = self.last_fired._replace(due=time.time() + seconds)
+            else:
+                return None
+            self._push(timer)
+            self._changed()
+            return timer
+    
+    def get(self, name):
+        """Return the pending timer with this name, or None"""
+        with self._cond:
+            entry = self._timers.get(name)
+            return entry[0] if entry else None
+    
+    def pending(self):
+        """Return the pending timers, soonest first"""
+        with self._cond:
+            timers = [timer for timer, _ in self._timers.values()]
+        return sorted(timers, key=lambda timer: timer.due)
+    
+    def _pop_due(self, now):
+        """Remove and return the timers due by now, skipping stale entries (caller holds the lock)"""
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, name = heapq.heappop(self._heap)
+            entry = self._timers.get(name)
+            if entry is not None and entry[1] == sequence:
+                del self._timers[name]
+                fired.append(entry[0])
+        if fired:
+            self.last_fired = fired[-1]
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+        return fired
+    
+    def _run(self):
+        """Fire timers as they fall due and save changes, until closed"""
+        while True:
+            with self._cond:
+                fired = self._pop_due(time.time())
+                
+                # Save once the changes have settled (or on the way out)
+                snapshot = None
+                if self._dirty_since is not None and (
+                        self._stopped or time.monotonic() - self._dirty_since >= SAVE_DELAY):
+                    snapshot = [timer for timer, _ in self._timers.values()]
+                    self._dirty_since = None
+                    
+                if not fired and snapshot is None:
+                    if self._stopped:
+                        return
+                    # Sleep until the next timer, the next save, or a change
+                    timeouts = []
+                    if self._heap:
+                        timeouts.append(self._heap[0][0] - time.time())
+                    if self._dirty_since is not None:
+                        timeouts.append(self._dirty_since + SAVE_DELAY - time.monotonic())
+                    self._cond.wait(max(0, min(timeouts)) if timeouts else None)
+                    continue
+            
+            # Outside the lock, so commands aren't held up by callbacks or the
+            # disk, and firing first, so a save doesn't delay the alarm
+            for timer in fired:
+                try:
+                    self.on_fire(timer, max(0.0, time.time() - timer.due))
+                except Exception as e:
+                    print(f"Timer error: {e}")
+            if snapshot is not None:
+                try:
+                    _save(self.path, snapshot)
+                except OSError as e:
+                    print(f"Timer save error: {e}")
+    
+    def close(self):
+        """Stop the scheduler thread, saving the pending timers for the next start"""
+        with self._cond:
+            self._stopped = True
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._cond.notify()
+        self._thread.join(timeout=10)
+
+def _load(path):
+    """Read saved timers, ignoring a missing or damaged file"""
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+        return [Timer(str(entry["name"]), float(entry["due"]), entry.get("message")) for entry in entries]
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        if os.path.exists(path):
+            print(f"Timer load error: {e}")
+        return []
+
+def _save(path, timers):
+    """Write the timers atomically, or remove the file when there are none"""
+    if not timers:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+        
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, 'w') as f:
+        json.dump([timer._asdict() for timer in timers], f)
+    os.replace(temporary, path)
@@ -4,12 +4,38 @@
 import random
 import datetime
 import re
+from modules.intent_router import Intent, IntentRouter
+
+# Reply intents in precedence order; topic intents are named after their
+# key in SmartReply.about_responses
+REPLY_INTENTS = [
+    Intent("greeting", ["hello", "hi", "hey", "greetings"]),
+    Intent("farewell", ["bye", "goodbye", "see you", "farewell"]),
+    Intent("thanks", ["thank you", "thanks", "appreciate it"]),
+    Intent("apology", ["sorry", "apologize", "my fault"]),
+    Intent("identity", ["who are you", "what are you", "your name"]),
+    Intent("capability", ["what can you do", "your abilities", "help me with", "capable of"]),
+    Intent("compliment", ["good job", "well done", "you're great", "you're amazing", "smart", "clever"]),
+    Intent("birthday", ["birthday", "born"]),
+    Intent("name", ["your name"]),
+    Intent("creator", ["creator", "who made you"]),
+    Intent("favorite", ["favorite", "like best"]),
+    Intent("live", ["where do you live", "where are you"]),
+    Intent("age", ["how old", "your age"]),
+    Intent("time", ["current time", "time now", "what time"]),
+    Intent("date", ["today's date", "what day", "what date"]),
+]
+
+# Compiled once at import
+REPLY_ROUTER = IntentRouter(REPLY_INTENTS)
 
 class SmartReply:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # General responses for different types of queries
         self.greetings = [
@@ -77,80 +103,49 @@ class SmartReply:
             "live": "I exist as a software program running on your computer. I don't have a physical presence like humans do.",
             "age": "I don't have an age in the traditional sense. I'm a software program that was recently set up for you."
         }
+        
+        # Follow-up spoken after every unknown response
+        self.help_hint = "I can help you with web searches, playing videos, sending emails, creating files, and more. Just let me know what you need."
+        
+        # Reply intent -> list of responses to pick from
+        self._response_lists = {
+            "greeting": self.greetings,
+            "farewell": self.farewells,
+            "thanks": self.thank_you_responses,
+            "apology": self.apology_responses,
+            "identity": self.identity_responses,
+            "capability": self.capability_responses,
+            "compliment": self.compliment_responses
+        }
+        
+        # Pre-render the fixed responses so they play from the phrase cache
+        self.speech.warm_phrases(self.greetings + self.farewells + self.unknown_responses + [self.help_hint])
     
     def generate_response(self, query):
         """Generate a smart response based on the query type"""
         query = query.lower()
         
-        # Check for greetings
-        if any(greeting in query for greeting in ["hello", "hi", "hey", "greetings"]):
-            self.speech.speak(random.choice(self.greetings))
-            return
-        
-        # Check for farewells
-        elif any(farewell in query for farewell in ["bye", "goodbye", "see you", "farewell"]):
-            self.speech.speak(random.choice(self.farewells))
-            return
-        
-        # Check for thank you
-        elif any(thanks in query for thanks in ["thank you", "thanks", "appreciate it"]):
-            self.speech.speak(random.choice(self.thank_you_responses))
-            return
-        
-        # Check for apologies
-        elif any(apology in query for apology in ["sorry", "apologize", "my fault"]):
-            self.speech.speak(random.choice(self.apology_responses))
-            return
-        
-        # Check for identity questions
-        elif any(identity in query for identity in ["who are you", "what are you", "your name"]):
-            self.speech.speak(random.choice(self.identity_responses))
-            return
-        
-        # Check for capability questions
-        elif any(capability in query for capability in ["what can you do", "your abilities", "help me with", "capable of"]):
-            self.speech.speak(random.choice(self.capability_responses))
-            return
-        
-        # Check for compliments
-        elif any(compliment in query for compliment in ["good job", "well done", "you're great", "you're amazing", "smart", "clever"]):
-            self.speech.speak(random.choice(self.compliment_responses))
-            return
-        
-        # Check for specific topic questions
-        elif "birthday" in query or "born" in query:
-            self.speech.speak(self.about_responses["birthday"])
-            return
-        elif "your name" in query:
-            self.speech.speak(self.about_responses["name"])
-            return
-        elif "creator" in query or "who made you" in query:
-            self.speech.speak(self.about_responses["creator"])
-            return
-        elif "favorite" in query or "like best" in query:
-            self.speech.speak(self.about_responses["favorite"])
-            return
-        elif "where do you live" in query or "where are you" in query:
-            self.speech.speak(self.about_responses["live"])
-            return
-        elif "how old" in query or "your age" in query:
-            self.speech.speak(self.about_responses["age"])
-            return
-        
-        # Check for time queries
-        elif "current time" in query or "time now" in query or "what time" in query:
+        match = REPLY_ROUTER.route(query)
+        
+        # Responses picked at random from a list
+        if match.intent in self._response_lists:
+            self.speech.speak(random.choice(self._response_lists[match.intent]))
+        
+        # Specific topic questions
+        elif match.intent in self.about_responses:
+            self.speech.speak(self.about_responses[match.intent])
+        
+        # Time queries
+        elif match.intent == "time":
             current_time = datetime.datetime.now().strftime("%I:%M %p")
             self.speech.speak(f"The current time is {current_time}")
-            return
         
-        # Check for date queries
-        elif "today's date" in query or "what day" in query or "what date" in query:
+        # Date queries
+        elif match.intent == "date":
             current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
             self.speech.speak(f"Today is {current_date}")
-            return
         
         # Default response for unknown queries
         else:
             self.speech.speak(random.choice(self.unknown_responses))
-            self.speech.speak("I can help you with web searches, playing videos, sending emails, creating files, and more. Just let me know what you need.")
-            return
+            self.speech.speak(self.help_hint)
@@ -3,29 +3,105 @@
 
 import pyttsx3
 import speech_recognition as sr
+from playsound import playsound
 import random
+import time
+import queue
+import itertools
+import threading
+from collections import deque
+from modules.phrase_cache import PhraseCache
+from modules.recognition import create_backend
+from modules import metrics
+
+# Speech priorities (lower values are spoken first)
+PRIORITY_ALARM = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Queued after everything else to stop the output worker
+_PRIORITY_SHUTDOWN = 100
+
+# Commands that cut the assistant short; the only ones accepted from phrases
+# heard while it is speaking (anything else is likely its own voice)
+BARGE_IN_PHRASES = ("stop", "stop talking", "be quiet", "quiet", "shut up")
+
+# How long after playback ends the room may still echo it
+ECHO_TAIL_SECONDS = 0.5
+
+class SpeechHandle:
+    """Handle for a queued utterance, returned immediately by speak()"""
+    
+    def __init__(self, text, priority, action=None):
+        self.text = text
+        self.priority = priority
+        self.action = action
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.cancelled = False
+        self.interrupted = False
+        self._finished = threading.Event()
+    
+    def wait(self, timeout=None):
+        """Block until the utterance has been spoken, cancelled or interrupted"""
+        return self._finished.wait(timeout)
+    
+    def done(self):
+        """Return True once the utterance is no longer pending or playing"""
+        return self._finished.is_set()
+    
+    def cancel(self):
+        """Drop the utterance if it hasn't started, or cut it short if it has"""
+        self.cancelled = True
+    
+    @property
+    def time_to_first_audio(self):
+        """Seconds between queueing and the start of playback, or None"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.queued_at
 
 class SpeechEngine:
-    def __init__(self):
-        # Initialize text-to-speech engine
-        self.engine = pyttsx3.init()
+    def __init__(self, backend=None, mute=False):
+        # Muted engines print responses without synthesizing audio (benchmarks, tests)
+        self.muted = mute
         
-        # Set properties
-        self.engine.setProperty('rate', 180)  # Speed of speech
+        # Text-to-speech runs on a single output worker that owns the
+        # pyttsx3 engine, since the engine is not thread-safe
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._current = None
+        self._playback_ended_at = 0.0
         
-        # Get available voices
-        voices = self.engine.getProperty('voices')
+        # Utterances queued or playing (not phrase renders), for wait_until_done
+        self._unspoken = set()
+        self._unspoken_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._init_error = None
         
-        # Set default voice (index 0 is usually male, 1 is female)
-        self.engine.setProperty('voice', voices[0].id)
+        # Time-to-first-audio samples (seconds) for recent utterances
+        self.latencies = deque(maxlen=500)
+        
+        # End-of-speech to dispatch samples (seconds) for recent commands
+        self.dispatch_latencies = deque(maxlen=500)
         
-        # Initialize speech recognizer
+        # Pre-rendered audio for fixed phrases, used only by the output worker
+        self.phrase_cache = PhraseCache()
+        
+        self._worker = threading.Thread(target=self._output_worker, name="speech-output")
+        self._worker.daemon = True
+        self._worker.start()
+        self._ready.wait()
+        if self._init_error:
+            raise self._init_error
+        
+        # Initialize speech recognizer and its backend (SPEECH_BACKEND, Google by default)
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.backend = backend or create_backend(self.recognizer)
         
-        # Calibrate recognizer for ambient noise
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        # Background capture, started on the first call to recognize_speech
+        # (phrases heard while the assistant speaks are flagged as possible echo)
+        self.listener = self.backend.create_listener(self.recognizer, is_playing=self.is_playing)
         
         # Response variations for when speech isn't understood
         self.not_understood_responses = [
@@ -35,39 +111,216 @@ class SpeechEngine:
             "Sorry, I couldn't understand your command.",
             "I'm having trouble understanding you."
         ]
+        self.warm_phrases(self.not_understood_responses)
     
-    def speak(self, text):
-        """Convert text to speech"""
-        print(f"Assistant: {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+    def _init_engine(self):
+        """Create and configure the text-to-speech engine (output worker only)"""
+        self.engine = pyttsx3.init()
+        
+        # Set properties
+        self.engine.setProperty('rate', 180)  # Speed of speech
+        
+        # Get available voices
+        voices = self.engine.getProperty('voices')
+        
+        # Set default voice (index 0 is usually male, 1 is female)
+        self.engine.setProperty('voice', voices[0].id)
+        
+        # Track playback so we can measure latency and support barge-in
+        self.engine.connect('started-utterance', self._on_utterance_started)
+        self.engine.connect('started-word', self._on_word_started)
     
-    def recognize_speech(self):
-        """Convert speech to text"""
+    def _output_worker(self):
+        """Speak queued utterances one at a time, highest priority first"""
         try:
-            with self.microphone as source:
-                print("Listening...")
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+            if not self.muted:
+                self._init_engine()
+        except Exception as e:
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        
+        while True:
+            _, _, handle = self._queue.get()
+            if handle is None:
+                break
+                
+            try:
+                if handle.cancelled:
+                    continue
+                    
+                self._current = handle
+                if handle.action:
+                    handle.action()
+                else:
+                    print(f"Assistant: {handle.text}")
+                    with metrics.span("speak"):
+                        self._play(handle)
+                    
+            except Exception as e:
+                print(f"Error in speech output: {e}")
+                
+            finally:
+                self._current = None
+                if handle.action is None:
+                    self._playback_ended_at = time.perf_counter()
+                    with self._unspoken_lock:
+                        self._unspoken.discard(handle)
+                handle._finished.set()
+    
+    def _voice_key(self):
+        """Return the (voice, rate) pair that rendered audio depends on"""
+        return self.engine.getProperty('voice'), self.engine.getProperty('rate')
+    
+    def _play(self, handle):
+        """Play a cached rendering of the text if there is one, else synthesize it live"""
+        if self.muted:
+            self._on_utterance_started(None)
+            return
+            
+        voice, rate = self._voice_key()
+        path = self.phrase_cache.get(handle.text, voice, rate)
+        
+        if path:
+            # Cached phrases are short, so they play through without barge-in
+            self._on_utterance_started(None)
+            playsound(path)
+        else:
+            self.engine.say(handle.text)
+            self.engine.runAndWait()
+    
+    def _render(self, text):
+        """Render text to the phrase cache unless it is already there"""
+        voice, rate = self._voice_key()
+        if self.phrase_cache.contains(text, voice, rate):
+            return
+        
+        def render(path):
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            
+        self.phrase_cache.put(text, voice, rate, render)
+    
+    def warm_phrases(self, phrases):
+        """Pre-render fixed phrases in the background so later calls play from the cache"""
+        if self.muted:
+            return
+            
+        for text in phrases:
+            self._enqueue(SpeechHandle(None, PRIORITY_LOW, action=lambda text=text: self._render(text)))
+    
+    def _on_utterance_started(self, name):
+        """Record time-to-first-audio for the utterance being played"""
+        # Actions (rendering phrases to the cache) also run the engine, but play nothing
+        handle = self._current
+        if handle is not None and handle.action is None and handle.started_at is None:
+            handle.started_at = time.perf_counter()
+            self.latencies.append(handle.time_to_first_audio)
+            metrics.observe("speak.time_to_first_audio", handle.time_to_first_audio)
+    
+    def _on_word_started(self, name, location, length):
+        """Stop playback between words when the utterance was interrupted"""
+        handle = self._current
+        if handle is not None and (handle.cancelled or handle.interrupted):
+            self.engine.stop()
+    
+    def _enqueue(self, handle):
+        """Queue a handle, preempting lower-priority speech that is playing"""
+        current = self._current
+        if current is not None and current.action is None and handle.priority < current.priority:
+            current.interrupted = True
+        if handle.action is None:
+            with self._unspoken_lock:
+                self._unspoken.add(handle)
+        self._queue.put((handle.priority, next(self._sequence), handle))
+        return handle
+    
+    def speak(self, text, priority=PRIORITY_NORMAL):
+        """Queue text to be spoken and return a SpeechHandle immediately"""
+        return self._enqueue(SpeechHandle(text, priority))
+    
+    def stop_speaking(self):
+        """Interrupt the current utterance and drop pending non-alarm speech"""
+        with self._queue.mutex:
+            for _, _, handle in self._queue.queue:
+                if handle is not None and handle.action is None and handle.priority > PRIORITY_ALARM:
+                    handle.cancel()
+                    
+        current = self._current
+        if current is not None and current.action is None:
+            current.cancel()
+    
+    def is_playing(self):
+        """Return True while an utterance plays, and for ECHO_TAIL_SECONDS after it ends"""
+        current = self._current
+        if current is not None and current.action is None:
+            return True
+        return time.perf_counter() - self._playback_ended_at < ECHO_TAIL_SECONDS
+    
+    def wait_until_done(self, timeout=None):
+        """Block until everything queued so far has been spoken; returns False on timeout
+        
+        Only utterances are waited for: phrases still being rendered to the
+        cache in the background (warm_phrases) don't hold up a prompt.
+        """
+        with self._unspoken_lock:
+            pending = list(self._unspoken)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for handle in pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not handle.wait(remaining):
+                return False
+        return True
+    
+    def latency_stats(self):
+        """Summarize time-to-first-audio (in milliseconds) for recent utterances"""
+        return _summarize(self.latencies)
+    
+    def dispatch_latency_stats(self):
+        """Summarize end-of-speech to dispatch latency (in milliseconds) for recent commands"""
+        return _summarize(self.dispatch_latencies)
+    
+    def recognize_speech(self, timeout=5):
+        """Convert the next phrase from the background listener to text"""
+        phrase = None
+        try:
+            # (Re)start capture; a no-op while the listener is already running
+            self.listener.start()
+            
+            phrase = self.listener.get(timeout=timeout)
+            if phrase is None:
+                # Timeout occurred while waiting for a phrase
+                print("Timeout: No speech detected")
+                return None
                 
             print("Recognizing...")
-            text = self.recognizer.recognize_google(audio)
+            with metrics.span("recognize_speech"):
+                text = self.backend.recognize(phrase.audio)
+            
+            # Heard over the assistant's own speech: only a barge-in command counts
+            if phrase.during_playback and text.lower().strip(" .!") not in BARGE_IN_PHRASES:
+                print(f"Ignored while speaking: {text}")
+                return None
             print(f"User: {text}")
-            return text
             
-        except sr.WaitTimeoutError:
-            # Timeout occurred while waiting for phrase to start
-            print("Timeout: No speech detected")
-            return None
+            # The caller dispatches the command as soon as we return
+            latency = time.perf_counter() - phrase.ended_at
+            self.dispatch_latencies.append(latency)
+            metrics.observe("recognize_speech.end_of_speech_to_dispatch", latency)
+            return text
             
         except sr.UnknownValueError:
-            # Speech was unintelligible
+            # Speech was unintelligible (stay quiet if it was heard over our own voice)
+            if phrase is not None and phrase.during_playback:
+                return None
             response = random.choice(self.not_understood_responses)
             self.speak(response)
             return None
             
         except sr.RequestError as e:
-            # Could not request results from Google Speech Recognition service
-            error_msg = f"Could not request results from Google Speech Recognition service; {e}"
+            # Could not request results from the recognition service
+            error_msg = f"Could not request results from the {self.backend.name} speech recognition service; {e}"
             print(error_msg)
             self.speak("I'm having trouble connecting to my speech recognition service.")
             return None
@@ -77,12 +330,69 @@ class SpeechEngine:
             self.speak("I encountered an error with speech recognition.")
             return None
     
+    def show(self, text):
+        """Display text (such as a table) that is too long to speak"""
+        print(text)
+    
+    def ask(self, prompt):
+        """Get a follow-up answer from the user (typed at the console for simplicity)"""
+        # Let the spoken question finish before prompting
+        self.wait_until_done()
+        return input(prompt)
+    
     def change_voice(self, gender="male"):
         """Change the voice of the assistant"""
-        voices = self.engine.getProperty('voices')
+        def set_voice():
+            if self.muted:
+                return
+            voices = self.engine.getProperty('voices')
+            index = 1 if gender.lower() == "female" and len(voices) > 1 else 0
+            self.engine.setProperty('voice', voices[index].id)
+        
+        # Engine properties may only be touched from the output worker
+        self._enqueue(SpeechHandle(None, PRIORITY_NORMAL, action=set_voice))
         if gender.lower() == "female":
-            self.engine.setProperty('voice', voices[1].id)
             self.speak("I've changed to a female voice.")
         else:
-            self.engine.setProperty('voice', voices[0].id)
             self.speak("I've changed to a male voice.")
+    
+    def close(self):
+        """Stop listening, finish pending speech, then stop the output worker"""
+        self.listener.stop()
+        self._queue.put((_PRIORITY_SHUTDOWN, next(self._sequence), None))
+        self._worker.join(timeout=10)
+
+
+def _summarize(samples):
+    """Return count, mean and percentiles (in milliseconds) for latency samples in seconds"""
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+        
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "max_ms": samples[-1] * 1000
+    }
+
+# Shared engine used by every module unless one is injected explicitly
+_shared_engine = None
+
+def get_speech_engine():
+    """Return the shared speech engine, creating it on first use"""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = SpeechEngine()
+    return _shared_engine
+
+def shutdown_speech_engine():
+    """Close the shared speech engine so the next call creates a fresh one"""
+    global _shared_engine
+    if _shared_engine is not None:
+        _shared_engine.close()
+        _shared_engine = None
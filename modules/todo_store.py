@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# Todo Store Module - SQLite (WAL) storage for the todo list
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from collections import namedtuple
+
+TodoItem = namedtuple("TodoItem", "id item timestamp completed")
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    item TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS todos_completed ON todos (completed, timestamp);
+CREATE INDEX IF NOT EXISTS todos_timestamp ON todos (timestamp);
+"""
+
+_COLUMNS = "id, item, timestamp, completed"
+
+# PRAGMA user_version once todo_list.json has been imported
+_MIGRATED = 1
+
+class TodoStore:
+    """Todo items in an SQLite database
+    
+    Each change is one small transaction appended to the write-ahead log,
+    so adding, completing or deleting an item costs the same however long
+    the list is, and a crash can't leave a half-written list behind.
+    Pending items are read through the (completed, timestamp) index.
+    """
+    
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode: every statement outside "with self._transaction()" commits itself
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints and still can't corrupt the database
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        
+        if legacy_json and os.path.exists(legacy_json):
+            self.migrate(legacy_json)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run a block in one transaction (rolled back on error) under the store lock"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+    
+    def migrate(self, json_path):
+        """Import a todo_list.json file and rename it to *.migrated; returns the number of items"""
+        with open(json_path, 'r') as f:
+            items = json.load(f)
+            
+        rows = [(entry["item"], entry.get("timestamp") or _now(), int(bool(entry.get("completed"))))
+                for entry in items]
+        with self._transaction() as db:
+            # user_version is set in the same transaction, so a crash before
+            # the rename below can't import the file twice
+            if db.execute("PRAGMA user_version").fetchone()[0] < _MIGRATED:
+                db.executemany("INSERT INTO todos (item, timestamp, completed) VALUES (?, ?, ?)", rows)
+                db.execute(f"PRAGMA user_version = {_MIGRATED}")
+        
+        # Renamed, not deleted, so the old list stays around as a backup
+        os.replace(json_path, json_path + ".migrated")
+        return len(rows)
+    
+    def add(self, item, timestamp=None):
+        """Add an item and return its id"""
+        with self._lock:
+            cursor = self._db.execute("INSERT INTO todos (item, timestamp) VALUES (?, ?)",
+                                      (item, timestamp or _now()))
+            return cursor.lastrowid
+    
+    def add_many(self, items):
+        """Add several items in one transaction"""
+        timestamp = _now()
+        with self._transaction() as db:
+            db.executemany("INSERT INTO todos (item, timestamp) VALUES (?, ?)",
+                           ((item, timestamp) for item in items))
+    
+    def get(self, item_id):
+        """Return the TodoItem with this id, or None"""
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM todos WHERE id = ?", (item_id,)).fetchone()
+        return _item(row) if row else None
+    
+    def complete(self, item_id):
+        """Mark an item as completed; returns False if there is no such pending item"""
+        with self._lock:
+            cursor = self._db.execute("UPDATE todos SET completed = 1 WHERE id = ? AND completed = 0", (item_id,))
+            return cursor.rowcount > 0
+    
+    def delete(self, item_id):
+        """Delete an item; returns False if there is no such item"""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM todos WHERE id = ?", (item_id,))
+            return cursor.rowcount > 0
+    
+    def pending(self, limit=None):
+        """Return the items not yet completed, oldest first"""
+        query = f"SELECT {_COLUMNS} FROM todos WHERE completed = 0 ORDER BY timestamp, id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [_item(row) for row in self._db.execute(query)]
+    
+    def items(self):
+        """Return every item, oldest first"""
+        with self._lock:
+            return [_item(row) for row in self._db.execute(f"SELECT {_COLUMNS} FROM todos ORDER BY timestamp, id")]
+    
+    def count(self, completed=None):
+        """Count all items, or only completed (True) or pending (False) ones"""
+        with self._lock:
+            if completed is None:
+                return self._db.execute("SELECT COUNT(*) FROM todos").fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM todos WHERE completed = ?", (int(completed),)).fetchone()[0]
+    
+    def close(self):
+        """Checkpoint the write-ahead log and close the database"""
+        with self._lock:
+            self._db.close()
+
+def _now():
+    """The current time as a todo timestamp"""
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+def _item(row):
+    """Build a TodoItem from a database row"""
+    return TodoItem(row[0], row[1], row[2], bool(row[3]))
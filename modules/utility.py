@@ -2,33 +2,126 @@
 # Utility Module - Miscellaneous helper functions
 
 import os
-import json
 import random
 import time
-import threading
-import requests
-from datetime import datetime
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.speech_engine import PRIORITY_ALARM
+from modules.todo_store import TodoStore
+from modules.scheduler import TimerScheduler, TIMERS_FILE
+from modules.response_cache import ResponseCache, normalize_key
+
+# Weather and news APIs
+WEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+NEWS_URL = "https://newsapi.org/v2/top-headlines"
+
+# "weather in Paris", "what's the weather like in New York today"
+_WEATHER_CITY = re.compile(r"\b(?:in|for|at)\s+(.+?)(?:\s+(?:today|tonight|tomorrow|now|right now|please))*[\s?.!]*$")
+
+NEWS_CATEGORIES = ("business", "entertainment", "general", "health", "science", "sports", "technology")
+
+# Stories read out by the news digest (one per cluster of near-duplicate headlines)
+DIGEST_STORIES = 8
+
+# Paragraphs read from an article, and the longest wait for one still downloading
+ARTICLE_PARAGRAPHS = 5
+ARTICLE_WAIT = 10
+
+# Most todo items read out by "show my list"
+SPOKEN_TODO_ITEMS = 10
+
+# How far ahead of the runner-up a fuzzy match must score to be acted on
+FUZZY_MARGIN = 0.15
+
+# Most timers read out by "list my timers", and the default snooze
+SPOKEN_TIMERS = 5
+SNOOZE_SECONDS = 300
+
+# Timers that fire this late (they fell due while the assistant wasn't running) say when they were due
+LATE_TIMER_SECONDS = 60
+
+# "5 minutes", "an hour", "for 30 secs", "and 10 seconds", "2 and a half minutes",
+# "an hour and a quarter", "half an hour", "a quarter of an hour"
+_UNIT = r"(hours?|hrs?|minutes?|mins?|seconds?|secs?)\b"
+_DURATION = re.compile(r"(?:\b(?:in|for|after|and)\s+)?\b(?:"
+                       r"(\d+(?:\.\d+)?|an?|one)(?:\s+and\s+an?\s+(half|quarter))?\s*" + _UNIT +
+                       r"(?:\s+and\s+an?\s+(half|quarter)\b)?|"
+                       r"(?:an?\s+)?(half|quarter)\s+(?:of\s+)?(?:an?\s+|one\s+)?" + _UNIT + ")")
+_UNIT_SECONDS = {"h": 3600, "m": 60, "s": 1}
+_FRACTIONS = {"half": 0.5, "quarter": 0.25, "": 0}
+
+# Fractions left over once the durations are read ("three quarters of an hour") make the time unclear
+_UNREAD_FRACTION = re.compile(r"\b(?:half|halves|quarters?)\b")
+
+# Timer names ("... called pasta", "a pasta timer") and reminder wording
+_TIMER_NAME = re.compile(r"\b(?:called|named)\s+(.+?)(?:\s+timer)?$")
+_TIMER_ADJECTIVE = re.compile(r"\b(?:a|an|the|my)\s+([a-z][a-z ]*?)\s+timer\b")
+_REMINDER_WORDS = re.compile(r"^(?:please\s+)?(?:set\s+a\s+reminder|remind\s+me)(?:\s+to)?\s*")
+_TIMER_COMMAND = re.compile(r"^(?:please\s+)?(?:cancel|stop|delete|remove|snooze)(?:\s+(?:the|my))?\b|"
+                            r"\b(?:for|by)$")
+_NUMBER_WORDS = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]
+_ORDINALS = ["", "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"]
+_TIMER_KIND_SUFFIX = re.compile(r"\s+(?:timer|reminder|alarm)$")
+_TIMER_KIND_PREFIX = re.compile(r"^(?:timer|reminder)\s+(?:to\s+)?")
+
+# Command words around the item in "mark item 3 as done", "remove the milk from my list", ...
+_TODO_PREFIX = re.compile(r"^(?:please\s+)?(?:mark|complete|finish|tick off|cross off|remove|delete|find|"
+                          r"what's|what is|is there|is|do i have)(?:\s+|$)(?:item\s+)?(?:the\s+)?")
+_TODO_SUFFIX = re.compile(r"(?:^|\s+)(?:as\s+(?:done|completed?|finished)|(?:from|off|on|in)\s+(?:my\s+)?(?:todo\s+)?list)$")
 
 class Utility:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # Create directories if they don't exist
         self.data_dir = os.path.join("assets", "data")
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialize todo list file
+        # Todo list database (an existing todo_list.json is imported once)
         self.todo_file = os.path.join(self.data_dir, "todo_list.json")
-        if not os.path.exists(self.todo_file):
-            with open(self.todo_file, 'w') as f:
-                json.dump([], f)
+        self.todo_store = TodoStore(os.path.join(self.data_dir, "todo.db"), legacy_json=self.todo_file)
+        
+        # Trigram index of the items' text and the ids of completed ones,
+        # built in the background from the start (a long list takes seconds)
+        # so the first command that looks an item up by name needn't wait.
+        # Changes made meanwhile are kept and applied once it is built
+        self._todo_fuzzy = None
+        self._todo_done = set()
+        self._todo_changes = []
+        self._todo_lock = threading.Lock()
+        self._todo_ready = threading.Event()
+        threading.Thread(target=self._build_todo_index, name="todo-index", daemon=True).start()
+        
+        # Timers and reminders, fired by one scheduler thread and saved
+        # across restarts (pending ones start counting again at once)
+        self.timers = TimerScheduler(TIMERS_FILE, self._timer_fired)
+        
+        # Weather and news responses cached on disk (fresh for a while, then
+        # served instantly while a background refresh fetches new ones)
+        self.responses = ResponseCache()
+        
+        # The news digest fetches every category at once and reads one
+        # headline per story; the stories last read are kept for follow-ups
+        self._news_pool = ThreadPoolExecutor(max_workers=len(NEWS_CATEGORIES), thread_name_prefix="news")
+        self.last_headlines = []
+        
+        # The HTTP client (requests), the clusterer (NumPy) and the article
+        # reader are created by the first command that needs them
+        self._headline_clusterer = None
+        self._articles = None
+        self._lazy_lock = threading.Lock()
         
         # OpenWeatherMap API key (you'll need to sign up for one)
         self.weather_api_key = os.getenv('WEATHER_API_KEY', '')
         
+        # City used when the weather is asked for without one (and kept warm by the prefetcher)
+        self.home_city = os.getenv('HOME_CITY', '').strip()
+        
         # News API key (you'll need to sign up for one)
         self.news_api_key = os.getenv('NEWS_API_KEY', '')
         
@@ -45,85 +138,177 @@ class Utility:
             "Did you hear about the guy who invented the knock-knock joke? He won the 'no-bell' prize!",
             "I used to be a baker, but I couldn't make enough dough."
         ]
+        
+        # Pre-render the jokes so they play from the phrase cache
+        self.speech.warm_phrases(self.jokes)
+    
+    @property
+    def http(self):
+        """The pooled HTTP client shared with the other modules (timeouts, retries, circuit breaking)"""
+        from modules.http_client import get_http_client
+        return get_http_client()
+    
+    @property
+    def headline_clusterer(self):
+        """The clusterer grouping near-duplicate headlines for the news digest"""
+        with self._lazy_lock:
+            if self._headline_clusterer is None:
+                from modules.news_digest import HeadlineClusterer
+                self._headline_clusterer = HeadlineClusterer()
+            return self._headline_clusterer
+    
+    @property
+    def articles(self):
+        """The reader downloading the articles behind the headlines while they are read"""
+        http = self.http
+        with self._lazy_lock:
+            if self._articles is None:
+                from modules.article_reader import ArticleReader
+                self._articles = ArticleReader(http)
+            return self._articles
+    
+    def set_timer(self, command):
+        """Set a timer, optionally named ("set a pasta timer for 10 minutes")"""
+        seconds, rest = _parse_duration(command)
+        if not seconds:
+            self.speech.speak("I couldn't understand the time. Please try again.")
+            return
+        
+        # "... called pasta" or "a pasta timer"; otherwise "timer", "second timer", ...
+        match = _TIMER_NAME.search(rest) or _TIMER_ADJECTIVE.search(rest)
+        if match and match.group(1) not in ("new", "another"):
+            name = f"{match.group(1)} timer"
+            article = "the"
+        else:
+            name, number = "timer", 1
+            while name in self.timers:
+                number += 1
+                name = f"{_ORDINALS[number]} timer" if number < len(_ORDINALS) else f"timer {number}"
+            article = "a"
+        
+        self.timers.schedule(name, seconds)
+        self.speech.speak(f"Setting {article} {name} for {_describe_duration(seconds)}")
+    
+    def set_reminder(self, command):
+        """Set a reminder ("remind me to call mom in 10 minutes")"""
+        seconds, rest = _parse_duration(command)
+        text = _REMINDER_WORDS.sub("", rest).strip(" ?.!")
+        if not seconds:
+            self.speech.speak("When should I remind you? For example: remind me to call mom in 10 minutes.")
+            return
+        if not text:
+            self.speech.speak("What should I remind you about?")
+            return
+        
+        self.timers.schedule(text, seconds, message=text)
+        self.speech.speak(f"I'll remind you to {text} in {_describe_duration(seconds)}")
     
-    def set_timer(self, time_str):
-        """Set a timer for a specified amount of time"""
-        # Extract time components
-        minutes, seconds = 0, 0
-        
-        # Try to parse the time string
-        if "minute" in time_str and "second" in time_str:
-            match = re.search(r'(\d+)\s*minute.*?(\d+)\s*second', time_str)
-            if match:
-                minutes, seconds = int(match.group(1)), int(match.group(2))
-        elif "minute" in time_str:
-            match = re.search(r'(\d+)\s*minute', time_str)
-            if match:
-                minutes = int(match.group(1))
-        elif "second" in time_str:
-            match = re.search(r'(\d+)\s*second', time_str)
-            if match:
-                seconds = int(match.group(1))
+    def _timer_fired(self, timer, late):
+        """Announce a timer or reminder (runs on the scheduler thread)"""
+        # Timers that went off while the assistant wasn't running say so
+        missed = ""
+        if late > LATE_TIMER_SECONDS:
+            missed = f" It was due at {time.strftime('%I:%M %p', time.localtime(timer.due))}."
+        
+        # Alarms jump the speech queue and interrupt any chit-chat
+        if timer.message is not None:
+            self.speech.speak(f"Reminder: {timer.message}.{missed}", priority=PRIORITY_ALARM)
         else:
-            # Try to directly extract numbers
-            numbers = re.findall(r'\d+', time_str)
-            if len(numbers) == 1:
-                # Assume seconds if just one number
-                seconds = int(numbers[0])
-            elif len(numbers) >= 2:
-                # Assume minutes and seconds if two or more numbers
-                minutes, seconds = int(numbers[0]), int(numbers[1])
-        
-        # Calculate total seconds
-        total_seconds = minutes * 60 + seconds
-        
-        if total_seconds <= 0:
+            title = timer.name.capitalize()
+            self.speech.speak(f"{title} is up! {title} is up!{missed}", priority=PRIORITY_ALARM)
+            self.speech.speak(f"Your {timer.name} has finished!", priority=PRIORITY_ALARM)
+    
+    def _find_timer(self, text):
+        """Return the pending timer named by text (see _timer_text), or None after saying why"""
+        pending = self.timers.pending()
+        if not pending:
+            self.speech.speak("You don't have any timers or reminders.")
+            return None
+        
+        # A bare "cancel the timer" is fine when only one is running
+        if not text or text in ("timer", "reminder", "alarm"):
+            if len(pending) == 1:
+                return pending[0]
+            names = ", ".join(_timer_label(timer) for timer in pending[:SPOKEN_TIMERS])
+            self.speech.speak(f"You have {len(pending)} timers and reminders: {names}. Which one?")
+            return None
+        
+        # "pasta", "pasta timer", "pasta alarm", "timer 2", "the call mom reminder", "my reminder to call mom"
+        for name in (text, f"{text} timer", f"timer {text}", _TIMER_KIND_SUFFIX.sub("", text),
+                     _TIMER_KIND_SUFFIX.sub(" timer", text), _TIMER_KIND_PREFIX.sub("", text)):
+            timer = self.timers.get(name)
+            if timer is not None:
+                return timer
+        self.speech.speak(f"I couldn't find a timer or reminder called {text}.")
+        return None
+    
+    def cancel_timer(self, command):
+        """Cancel the timer or reminder named in the command, or all of them"""
+        if re.search(r"\b(?:all|every|everything)\b", command):
+            count = self.timers.cancel_all()
+            if count:
+                self.speech.speak(f"Cancelled {count} timer{'s' if count != 1 else ''} and reminder{'s' if count != 1 else ''}.")
+            else:
+                self.speech.speak("You don't have any timers or reminders.")
+            return
+            
+        timer = self._find_timer(_timer_text(command))
+        if timer is not None and self.timers.cancel(timer.name):
+            self.speech.speak(f"Cancelled the {_timer_label(timer)}.")
+    
+    def list_timers(self):
+        """Say how long is left on each pending timer, soonest first"""
+        pending = self.timers.pending()
+        if not pending:
+            self.speech.speak("You don't have any timers or reminders.")
+            return
+            
+        if len(pending) > SPOKEN_TIMERS:
+            self.speech.speak(f"You have {len(pending)} timers and reminders. The next {SPOKEN_TIMERS} are:")
+        now = time.time()
+        for timer in pending[:SPOKEN_TIMERS]:
+            left = _describe_duration(max(1, round(timer.due - now)))
+            self.speech.speak(f"The {_timer_label(timer)} has {left} left.")
+    
+    def snooze_timer(self, command):
+        """Snooze the timer that went off last, or postpone the one named, by a few minutes"""
+        seconds = _parse_duration(command)[0]
+        if seconds is None:
             self.speech.speak("I couldn't understand the time. Please try again.")
             return
+        seconds = seconds or SNOOZE_SECONDS
+        text = _timer_text(command)
         
-        # Speak confirmation
-        time_msg = ""
-        if minutes > 0:
-            time_msg += f"{minutes} minute{'s' if minutes != 1 else ''}"
-        if seconds > 0:
-            if time_msg:
-                time_msg += " and "
-            time_msg += f"{seconds} second{'s' if seconds != 1 else ''}"
-        
-        self.speech.speak(f"Setting a timer for {time_msg}")
-        
-        # Start the timer in a separate thread
-        timer_thread = threading.Thread(target=self._run_timer, args=(total_seconds,))
-        timer_thread.daemon = True
-        timer_thread.start()
-    
-    def _run_timer(self, seconds):
-        """Run the timer in a separate thread"""
-        time.sleep(seconds)
-        self.speech.speak("Timer is up! Timer is up!")
-        
-        # Additional alerts
-        for _ in range(2):
-            time.sleep(1)
-            self.speech.speak("Your timer has finished!")
-    
-    def get_weather(self, city=None):
-        """Get current weather information"""
+        # Plain "snooze" means the timer that went off last
+        last = self.timers.last_fired
+        timer = last if last is not None and text in ("", "it", "that", "timer", "reminder", "alarm") else self._find_timer(text)
+        if timer is None:
+            return
+            
+        if self.timers.snooze(timer.name, seconds) is None:
+            self.speech.speak(f"The {_timer_label(timer)} has already finished.")
+        else:
+            self.speech.speak(f"Snoozed the {_timer_label(timer)} for {_describe_duration(seconds)}.")
+    
+    def get_weather(self, command=""):
+        """Get current weather information for the city named in the command, else the home city"""
+        from modules.http_client import ServiceUnavailable
         if not self.weather_api_key:
             self.speech.speak("Weather API key is not configured. Please set up your OpenWeatherMap API key.")
             return
         
+        named = _WEATHER_CITY.search(command.lower())
+        city = named.group(1).title() if named else self.home_city
         if not city:
             self.speech.speak("What city would you like the weather for?")
-            city = input("City: ")  # For simplicity, using input() instead of speech recognition
+            city = self.speech.ask("City: ")
         
         try:
-            # Make API request
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={self.weather_api_key}&units=metric"
-            response = requests.get(url)
-            data = response.json()
+            # From the response cache when it has the city, otherwise from the API
+            response = self.responses.get("weather", normalize_key(city), lambda: self._fetch_weather(city))
+            status, data = response.status, response.data
             
-            if response.status_code == 200:
+            if status == 200:
                 # Extract weather information
                 temp = data['main']['temp']
                 feels_like = data['main']['feels_like']
@@ -132,67 +317,207 @@ class Utility:
                 wind_speed = data['wind']['speed']
                 
                 # Prepare and speak weather report
-                weather_report = f"Current weather in {city}: {desc}. "
+                if response.state == "stale":
+                    weather_report = f"Weather in {city} as of {_describe_age(response.fetched_at)}: {desc}. "
+                else:
+                    weather_report = f"Current weather in {city}: {desc}. "
                 weather_report += f"The temperature is {temp:.1f}°C, but it feels like {feels_like:.1f}°C. "
                 weather_report += f"Humidity is {humidity}% and wind speed is {wind_speed} meters per second."
                 
                 self.speech.speak(weather_report)
             else:
                 # Handle errors
-                if response.status_code == 404:
+                if status == 404:
                     self.speech.speak(f"I couldn't find weather information for {city}. Please check the city name.")
                 else:
                     self.speech.speak("I couldn't retrieve the weather information. Please try again later.")
                 
+        except ServiceUnavailable as e:
+            self.speech.speak("The weather service isn't responding right now. Please try again in a little while.")
+            print(f"Weather API error: {e}")
         except Exception as e:
             self.speech.speak("An error occurred while fetching the weather information.")
             print(f"Weather API error: {e}")
     
+    def _fetch_weather(self, city):
+        """Request the current weather for a city; returns (status code, JSON)"""
+        return self.http.get_json("weather", WEATHER_URL,
+                                  params={"q": city, "appid": self.weather_api_key, "units": "metric"})
+    
+    def _fetch_news(self, category):
+        """Request the top headlines in a category; returns (status code, JSON)"""
+        return self.http.get_json("news", NEWS_URL,
+                                  params={"country": "us", "category": category, "apiKey": self.news_api_key})
+    
+    def prefetch_jobs(self, city=None, categories=(), within=0):
+        """(label, function) pairs that warm the cached weather for a city and news for categories
+        
+        Each function refreshes its response unless it will still be fresh
+        in `within` seconds (the time until the next prefetch round).
+        """
+        jobs = []
+        if city and self.weather_api_key:
+            jobs.append((f"weather in {city}", lambda: self.responses.warm(
+                "weather", normalize_key(city), lambda: self._fetch_weather(city), within)))
+        if self.news_api_key:
+            # "all" keeps every category warm (for the news digest)
+            if "all" in categories:
+                categories = NEWS_CATEGORIES
+            for category in categories:
+                jobs.append((f"{category} news", lambda category=category: self.responses.warm(
+                    "news", category, lambda: self._fetch_news(category), within)))
+        return jobs
+    
     def get_news(self, category=None):
         """Get the latest news headlines"""
+        from modules.http_client import ServiceUnavailable
+        from modules.news_digest import story_from_article
         if not self.news_api_key:
             self.speech.speak("News API key is not configured. Please set up your News API key.")
             return
         
-        categories = ["business", "entertainment", "general", "health", "science", "sports", "technology"]
-        
         if not category:
-            self.speech.speak("What category of news would you like? Business, entertainment, health, science, sports, or technology?")
-            category = input("Category: ").lower()  # For simplicity, using input() instead of speech recognition
+            self.speech.speak("What category of news would you like? Business, entertainment, health, science, sports, technology, or all of them?")
+            category = self.speech.ask("Category: ").lower()
         
-        if category not in categories:
+        if category.strip(" .!") in ("all", "all of them", "everything"):
+            return self.get_news_digest()
+        if category not in NEWS_CATEGORIES:
             category = "general"
         
         try:
-            # Make API request
-            url = f"https://newsapi.org/v2/top-headlines?country=us&category={category}&apiKey={self.news_api_key}"
-            response = requests.get(url)
-            data = response.json()
+            # From the response cache when it has the category, otherwise from the API
+            response = self.responses.get("news", category, lambda: self._fetch_news(category))
+            status, data = response.status, response.data
             
-            if response.status_code == 200 and data["status"] == "ok":
+            if status == 200 and data and data.get("status") == "ok":
                 articles = data["articles"]
                 
                 if articles:
-                    self.speech.speak(f"Here are the top {min(5, len(articles))} {category} news headlines:")
+                    # Start downloading the articles now, so "tell me more" doesn't wait for them
+                    self.last_headlines = [story_from_article(article, category) for article in articles[:5]]
+                    self.articles.prefetch([story.url for story in self.last_headlines])
+                    
+                    as_of = f" as of {_describe_age(response.fetched_at)}" if response.state == "stale" else ""
+                    self.speech.speak(f"Here are the top {min(5, len(articles))} {category} news headlines{as_of}:")
                     
                     for i, article in enumerate(articles[:5]):
                         headline = article["title"]
                         source = article["source"]["name"]
                         
                         self.speech.speak(f"Headline {i+1}: {headline}. From: {source}")
-                        time.sleep(0.5)  # Pause between headlines
                     
-                    # Ask if user wants to hear more about any headline
-                    self.speech.speak("Would you like me to tell you more about any of these headlines? If yes, say the headline number.")
+                    # Offer to read the article behind any headline
+                    self._offer_article("headline")
                 else:
                     self.speech.speak(f"I couldn't find any {category} news headlines at the moment.")
             else:
                 self.speech.speak("I couldn't retrieve the news. Please try again later.")
                 
+        except ServiceUnavailable as e:
+            self.speech.speak("The news service isn't responding right now. Please try again in a little while.")
+            print(f"News API error: {e}")
         except Exception as e:
             self.speech.speak("An error occurred while fetching the news.")
             print(f"News API error: {e}")
     
+    def get_news_digest(self):
+        """Read the top stories across every news category, each story once however many sources carry it"""
+        from modules.http_client import ServiceUnavailable
+        from modules.news_digest import build_digest
+        if not self.news_api_key:
+            self.speech.speak("News API key is not configured. Please set up your News API key.")
+            return
+        
+        # Every category at once, each from the response cache when it has it
+        futures = [(category, self._news_pool.submit(self.responses.get, "news", category,
+                                                     lambda category=category: self._fetch_news(category)))
+                   for category in NEWS_CATEGORIES]
+        listed = {}
+        oldest_stale = None
+        unavailable = False
+        for category, future in futures:
+            try:
+                response = future.result()
+            except ServiceUnavailable as e:
+                unavailable = True
+                print(f"News API error ({category}): {e}")
+                continue
+            except Exception as e:
+                print(f"News API error ({category}): {e}")
+                continue
+            if response.status == 200 and response.data and response.data.get("status") == "ok":
+                listed[category] = response.data["articles"]
+                if response.state == "stale":
+                    oldest_stale = min(oldest_stale or response.fetched_at, response.fetched_at)
+                    
+        if not listed:
+            if unavailable:
+                self.speech.speak("The news service isn't responding right now. Please try again in a little while.")
+            else:
+                self.speech.speak("I couldn't retrieve the news. Please try again later.")
+            return
+        
+        # Cluster near-duplicate headlines, start downloading the articles
+        # behind them and read the biggest stories first
+        self.last_headlines = build_digest(listed, self.headline_clusterer)[:DIGEST_STORIES]
+        if not self.last_headlines:
+            self.speech.speak("I couldn't find any news headlines at the moment.")
+            return
+        self.articles.prefetch([story.url for story in self.last_headlines])
+        
+        as_of = f" as of {_describe_age(oldest_stale)}" if oldest_stale else ""
+        self.speech.speak(f"Here are the top {len(self.last_headlines)} stories across {len(listed)} news categories{as_of}:")
+        for i, story in enumerate(self.last_headlines):
+            others = len(story.sources) - 1
+            also = f" and {others} other source{'s' if others != 1 else ''}" if others > 0 else ""
+            self.speech.speak(f"Story {i+1}: {story.title}. From: {story.source or 'an unknown source'}{also}")
+            
+        self._offer_article("story")
+    
+    def _offer_article(self, kind):
+        """Offer to read the article behind one of the headlines just read (asked for with a read_article command)"""
+        self.speech.speak(f"Would you like me to tell you more about any of these {kind}s? "
+                          f"Just say, tell me more about {kind} 1.")
+    
+    def read_article(self, command):
+        """Read the article behind a headline named in the command ("tell me more about story 2")"""
+        number = _spoken_number(command.lower())
+        if number is None and len(self.last_headlines) == 1:
+            number = 1
+        if number is None and self.last_headlines:
+            self.speech.speak(f"Which one? Say a number from 1 to {len(self.last_headlines)}.")
+            number = _spoken_number(self.speech.ask("Headline number: ").lower())
+            if number is None:
+                return
+        self.read_headline(number)
+    
+    def read_headline(self, number):
+        """Read the start of the article behind the numbered headline of the last news or digest"""
+        if not self.last_headlines:
+            self.speech.speak("I haven't read you any headlines yet. Ask me for the news first.")
+            return
+        if not 1 <= number <= len(self.last_headlines):
+            self.speech.speak(f"Please pick a number from 1 to {len(self.last_headlines)}.")
+            return
+        
+        # Normally downloaded while the headlines were being read
+        story = self.last_headlines[number - 1]
+        article = self.articles.get(story.url, timeout=ARTICLE_WAIT) if story.url else None
+        if article and article.paragraphs:
+            paragraphs = article.paragraphs[:ARTICLE_PARAGRAPHS]
+        else:
+            # No readable text: fall back to the page's or the API's summary
+            summary = (article.description if article else None) or story.articles[0].get("description")
+            if not summary:
+                self.speech.speak(f"Sorry, I couldn't load the article about {story.title}.")
+                return
+            paragraphs = [summary]
+            
+        self.speech.speak(f"{story.title}, from {story.source or 'an unknown source'}.")
+        for paragraph in paragraphs:
+            self.speech.speak(paragraph)
+    
     def tell_joke(self):
         """Tell a random joke"""
         joke = random.choice(self.jokes)
@@ -202,26 +527,12 @@ class Utility:
         """Add an item to the todo list"""
         if not item:
             self.speech.speak("What would you like to add to your list?")
-            item = input("Todo item: ")  # For simplicity, using input() instead of speech recognition
+            item = self.speech.ask("Todo item: ")
         
         try:
-            # Load existing todo list
-            with open(self.todo_file, 'r') as f:
-                todo_list = json.load(f)
-            
-            # Add new item with timestamp
-            new_item = {
-                "item": item,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "completed": False
-            }
-            
-            todo_list.append(new_item)
-            
-            # Save updated list
-            with open(self.todo_file, 'w') as f:
-                json.dump(todo_list, f, indent=4)
-            
+            # One insert, whatever the length of the list
+            item_id = self.todo_store.add(item)
+            self._todo_changed(lambda index, done: index.add(item_id, item))
             self.speech.speak(f"Added to your list: {item}")
             
         except Exception as e:
@@ -231,32 +542,149 @@ class Utility:
     def show_todo(self):
         """Show the current todo list"""
         try:
-            # Load todo list
-            with open(self.todo_file, 'r') as f:
-                todo_list = json.load(f)
-            
-            if not todo_list:
-                self.speech.speak("Your todo list is empty.")
-                return
+            # The count and the oldest items come straight from the index
+            pending = self.todo_store.count(completed=False)
             
-            # Filter incomplete items
-            incomplete_items = [item for item in todo_list if not item["completed"]]
-            
-            if not incomplete_items:
-                self.speech.speak("You've completed all items on your todo list. Congratulations!")
+            if not pending:
+                if not self.todo_store.count():
+                    self.speech.speak("Your todo list is empty.")
+                else:
+                    self.speech.speak("You've completed all items on your todo list. Congratulations!")
                 return
             
-            # Speak todo items
-            self.speech.speak(f"You have {len(incomplete_items)} items on your todo list:")
+            # Speak todo items by id, so they can be completed or removed by number
+            if pending > SPOKEN_TODO_ITEMS:
+                self.speech.speak(f"You have {pending} items on your todo list. The oldest {SPOKEN_TODO_ITEMS} are:")
+            else:
+                self.speech.speak(f"You have {pending} items on your todo list:")
             
-            for i, item in enumerate(incomplete_items):
-                self.speech.speak(f"Item {i+1}: {item['item']}")
-                time.sleep(0.3)  # Pause between items
+            for item in self.todo_store.pending(limit=SPOKEN_TODO_ITEMS):
+                self.speech.speak(f"Item {item.id}: {item.item}")
                 
         except Exception as e:
             self.speech.speak("An error occurred while reading your todo list.")
             print(f"Todo list error: {e}")
     
+    def _build_todo_index(self):
+        """Build the fuzzy index over the todo items, then apply the changes made meanwhile"""
+        try:
+            # NumPy is only loaded by the build
+            from modules.fuzzy_index import TrigramIndex
+            items = self.todo_store.items()
+            index = TrigramIndex((item.id, item.item) for item in items)
+            index.prepare()
+            done = {item.id for item in items if item.completed}
+            
+            # Changes are replayed in order; any already in the items read are harmless to repeat
+            with self._todo_lock:
+                for change in self._todo_changes:
+                    change(index, done)
+                self._todo_changes = []
+                self._todo_fuzzy, self._todo_done = index, done
+        finally:
+            self._todo_ready.set()
+    
+    def _todo_changed(self, change):
+        """Apply change(index, done) to the fuzzy index, or keep it for the build if that is still running"""
+        with self._todo_lock:
+            if self._todo_fuzzy is None:
+                self._todo_changes.append(change)
+            else:
+                change(self._todo_fuzzy, self._todo_done)
+    
+    def _todo_index(self):
+        """Return the fuzzy index over the todo items, waiting for the background build if need be"""
+        self._todo_ready.wait()
+        if self._todo_fuzzy is None:
+            # The background build failed: try again here, so the error reaches the command
+            self._build_todo_index()
+        return self._todo_fuzzy
+    
+    def _resolve_todo(self, command, pending_only=False):
+        """Return the todo item a command names by number or by approximate text
+        
+        Returns None after saying why when nothing matches or the best
+        matches are too close to call.
+        """
+        text = _todo_text(command)
+        if not text:
+            self.speech.speak("Which item do you mean?")
+            return None
+        if text.isdigit():
+            item = self.todo_store.get(int(text))
+            if item is None:
+                self.speech.speak(f"There is no item {text} on your list.")
+            return item
+        
+        # Only matches within FUZZY_MARGIN of the best come back
+        matches = self._todo_index().search(text, limit=3, exclude=self._todo_done if pending_only else None,
+                                            margin=FUZZY_MARGIN)
+        if not matches:
+            self.speech.speak(f"I couldn't find {text} on your list.")
+            return None
+        
+        # Act on a clear winner (or the oldest of identical items); otherwise ask
+        best = matches[0]
+        if all(match.text == best.text for match in matches):
+            return self.todo_store.get(best.key)
+        options = ", or ".join(f"item {match.key}, {match.text}" for match in matches)
+        self.speech.speak(f"Did you mean {options}? Please say it again with the item number.")
+        return None
+    
+    def complete_todo(self, command):
+        """Mark the todo item named in the command (by number or approximate text) as completed"""
+        item = self._resolve_todo(command, pending_only=True)
+        if item is None:
+            return
+            
+        if self.todo_store.complete(item.id):
+            self._todo_changed(lambda index, done: done.add(item.id))
+            self.speech.speak(f"Marked as done: {item.item}")
+        else:
+            self.speech.speak(f"{item.item} is already done.")
+    
+    def remove_todo(self, command):
+        """Delete the todo item named in the command (by number or approximate text)"""
+        item = self._resolve_todo(command)
+        if item is None:
+            return
+            
+        if not self.todo_store.delete(item.id):
+            self.speech.speak(f"There is no item {item.id} on your list.")
+            return
+        
+        def forget(index, done):
+            index.remove(item.id)
+            done.discard(item.id)
+        self._todo_changed(forget)
+        self.speech.speak(f"Removed from your list: {item.item}")
+    
+    def find_todo(self, command):
+        """Read out the todo items that best match the text in the command"""
+        text = _todo_text(command)
+        if not text:
+            self.show_todo()
+            return
+            
+        matches = self._todo_index().search(text, limit=3, margin=2 * FUZZY_MARGIN)
+        if not matches:
+            self.speech.speak(f"I couldn't find {text} on your list.")
+            return
+            
+        self.speech.speak(f"I found {len(matches)} matching {'item' if len(matches) == 1 else 'items'}:")
+        for match in matches:
+            done = " (done)" if match.key in self._todo_done else ""
+            self.speech.speak(f"Item {match.key}: {match.text}{done}")
+    
+    def close(self):
+        """Stop the timer scheduler (saving pending timers) and close the todo and response databases"""
+        self.timers.close()
+        self._news_pool.shutdown(wait=True, cancel_futures=True)
+        if self._articles is not None:
+            self._articles.close()
+        self.todo_store.close()
+        self.responses.close()
+    
     def coin_toss(self):
         """Simulate a coin toss"""
         result = random.choice(["heads", "tails"])
@@ -272,3 +700,67 @@ class Utility:
         result = random.randint(1, sides)
         self.speech.speak(f"I rolled a {sides}-sided dice and got: {result}")
         return result
+
+def _todo_text(command):
+    """Strip the command words around a todo item ("mark buy milk as done" -> "buy milk")"""
+    text = _TODO_PREFIX.sub("", command.lower().strip(" ?.!"))
+    return _TODO_SUFFIX.sub("", text).strip()
+
+def _parse_duration(text):
+    """Return the seconds in "5 minutes and 30 seconds", "an hour", ... and the text without them
+    
+    The seconds are None when the text has a fraction that isn't part of a
+    duration it understands, rather than a guess without it.
+    """
+    seconds = 0.0
+    for amount, fraction, unit, trailing, fraction_of, unit_of in _DURATION.findall(text):
+        if unit:
+            whole = float(amount) if amount[0].isdigit() else 1
+            seconds += (whole + _FRACTIONS[fraction] + _FRACTIONS[trailing]) * _UNIT_SECONDS[unit[0]]
+        else:
+            seconds += _FRACTIONS[fraction_of] * _UNIT_SECONDS[unit_of[0]]
+    rest = _DURATION.sub(" ", text)
+    if _UNREAD_FRACTION.search(rest):
+        return None, re.sub(r"\s+", " ", rest).strip()
+    
+    if not seconds:
+        # Bare numbers: one is seconds, two are minutes and seconds
+        numbers = re.findall(r'\d+', text)
+        if len(numbers) == 1:
+            seconds = int(numbers[0])
+        elif len(numbers) >= 2:
+            seconds = int(numbers[0]) * 60 + int(numbers[1])
+        rest = re.sub(r'(?:\b(?:in|for|after)\s+)?\d+', " ", text)
+    return int(round(seconds)), re.sub(r"\s+", " ", rest).strip()
+
+def _describe_duration(seconds):
+    """Spell out a number of seconds ("1 hour, 5 minutes and 3 seconds")"""
+    parts = [f"{count} {unit}{'s' if count != 1 else ''}"
+             for count, unit in ((seconds // 3600, "hour"), (seconds // 60 % 60, "minute"), (seconds % 60, "second"))
+             if count]
+    return ", ".join(parts[:-1]) + " and " + parts[-1] if len(parts) > 1 else parts[0]
+
+def _spoken_number(text):
+    """The first number in text, as digits, a word or an ordinal ("the second one" -> 2), or None"""
+    for word in re.findall(r"[a-z]+|\d+", text):
+        if word.isdigit():
+            return int(word)
+        if word in _NUMBER_WORDS:
+            return _NUMBER_WORDS.index(word)
+        if word in _ORDINALS[1:]:
+            return _ORDINALS.index(word)
+    return None
+
+def _describe_age(fetched_at):
+    """How long ago a response was fetched, to the minute ("25 minutes ago")"""
+    minutes = max(1, round((time.time() - fetched_at) / 60))
+    return f"{_describe_duration(minutes * 60)} ago"
+
+def _timer_text(command):
+    """Strip the command words and durations around a timer's name ("cancel the pasta timer" -> "pasta timer")"""
+    text = _parse_duration(command.lower().strip(" ?.!"))[1]
+    return _TIMER_COMMAND.sub("", text).strip()
+
+def _timer_label(timer):
+    """How a timer is spoken of: "pasta timer", "timer 2", "reminder to call mom\""""
+    return timer.name if timer.message is None else f"reminder to {timer.message}"
@@ -7,10 +7,12 @@ import platform
 import random
 
 class WebAutomation:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
         
         # Create directories if they don't exist
         self.projects_dir = os.path.join("assets", "projects")
@@ -172,7 +174,7 @@ document.addEventListener('DOMContentLoaded', function() {
         """Create a simple HTML project with HTML, CSS, and JavaScript files"""
         # Ask for project name
         self.speech.speak("What would you like to name your HTML project?")
-        project_name = input("Project name: ")  # For simplicity, using input() instead of speech recognition
+        project_name = self.speech.ask("Project name: ")
         
         # Create a valid directory name
         dir_name = project_name.strip().replace(" ", "_").lower()
@@ -185,7 +187,7 @@ document.addEventListener('DOMContentLoaded', function() {
         # Check if project already exists
         if os.path.exists(project_dir):
             self.speech.speak(f"A project named {dir_name} already exists. Would you like to overwrite it? Say yes or no.")
-            confirmation = input("Overwrite (yes/no): ").lower()  # For simplicity, using input() instead of speech recognition
+            confirmation = self.speech.ask("Overwrite (yes/no): ").lower()
             
             if confirmation != "yes":
                 self.speech.speak("Project creation cancelled.")
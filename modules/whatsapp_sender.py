@@ -7,10 +7,12 @@ import webbrowser
 import re
 
 class WhatsAppSender:
-    def __init__(self):
-        # Import speech engine here to avoid circular imports
-        from modules.speech_engine import SpeechEngine
-        self.speech = SpeechEngine()
+    def __init__(self, speech=None):
+        # Use the shared speech engine unless one is injected
+        if speech is None:
+            from modules.speech_engine import get_speech_engine
+            speech = get_speech_engine()
+        self.speech = speech
     
     def validate_phone_number(self, phone):
         """Validate phone number format"""
@@ -54,20 +56,20 @@ class WhatsAppSender:
         self.speech.speak("What is the phone number you want to send a WhatsApp message to?")
         self.speech.speak("Please include the country code.")
         
-        phone_number = input("Phone number (with country code): ")  # For simplicity, using input() instead of speech recognition
+        phone_number = self.speech.ask("Phone number (with country code): ")
         
         if not self.validate_phone_number(phone_number):
             self.speech.speak("The phone number format is not valid. Please try again.")
             return
         
         self.speech.speak("What message would you like to send?")
-        message = input("Message: ")  # For simplicity, using input() instead of speech recognition
+        message = self.speech.ask("Message: ")
         
         # Confirm before sending
         self.speech.speak(f"I'm about to open WhatsApp to send a message to {phone_number}")
         self.speech.speak("Should I proceed? Say yes or no.")
         
-        confirmation = input("Confirm (yes/no): ").lower()  # For simplicity, using input() instead of speech recognition
+        confirmation = self.speech.ask("Confirm (yes/no): ").lower()
         
         if confirmation == "yes":
             if self.send_whatsapp_message(phone_number, message):
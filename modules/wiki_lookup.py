@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Wiki Lookup Module - Single-request Wikipedia summaries with an SQLite cache of pages and aliases
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from modules.http_client import ServiceUnavailable
+from modules.response_cache import normalize_key
+
+WIKI_API = "https://en.wikipedia.org/w/api.php"
+
+WIKI_CACHE_FILE = os.path.join("assets", "data", "wiki_cache.db")
+
+# Summaries are answered from the cache for a month; older ones are looked up
+# again, but still answer when Wikipedia can't be reached
+WIKI_TTL = 30 * 24 * 3600
+
+# Sentences in a summary, and options named for a disambiguation page
+SUMMARY_SENTENCES = 3
+DISAMBIGUATION_OPTIONS = 20
+
+# A page's summary (None for disambiguation pages), URL, the pages a
+# disambiguation page lists, when it was fetched, and where it came from:
+# "fresh" (cache), "miss" (Wikipedia), "stale" (cache, Wikipedia unreachable)
+# or "offline" (the local abstracts index, see wiki_offline.py)
+WikiPage = namedtuple("WikiPage", "title summary url disambiguation options fetched_at state")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    title TEXT PRIMARY KEY,
+    summary TEXT,
+    url TEXT NOT NULL,
+    disambiguation INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    title TEXT NOT NULL
+);
+"""
+
+class WikiLookup:
+    """Wikipedia lookups in one API request, remembered in SQLite
+    
+    A query goes to the MediaWiki API once: the top search result, with
+    redirects followed, comes back with its intro extract, URL,
+    disambiguation flag and links together. Pages are stored by title,
+    and every spelling that led to one (the query as asked, the page title
+    and the titles that redirect to it, all normalized) is stored as an
+    alias, so asking again in any of those ways needs no request.
+    """
+    
+    def __init__(self, http, path=WIKI_CACHE_FILE, ttl=WIKI_TTL, url=WIKI_API):
+        self.http = http
+        self.ttl = ttl
+        self.url = url
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run a block in one transaction (rolled back on error) under the cache lock"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+    
+    def cached(self, query):
+        """Return the stored WikiPage an alias leads to (state "fresh" or "stale" by age), or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.title, p.summary, p.url, p.disambiguation, p.options, p.fetched_at "
+                "FROM aliases a JOIN pages p ON p.title = a.title WHERE a.alias = ?",
+                (normalize_key(query),)).fetchone()
+        if row is None:
+            return None
+        title, summary, url, disambiguation, options, fetched_at = row
+        state = "fresh" if time.time() - fetched_at < self.ttl else "stale"
+        return WikiPage(title, summary, url, bool(disambiguation), json.loads(options), fetched_at, state)
+    
+    def lookup(self, query):
+        """Return the WikiPage for a query, or None if Wikipedia has nothing for it
+        
+        Raises ServiceUnavailable when Wikipedia can't be reached and the
+        query has never been looked up.
+        """
+        page = self.cached(query)
+        if page is not None and page.state == "fresh":
+            return page
+        try:
+            fetched = self.fetch(query)
+        except ServiceUnavailable:
+            # Offline: an old answer beats none
+            if page is not None:
+                return page
+            raise
+        return fetched
+    
+    def fetch(self, query):
+        """Look a query up on Wikipedia (one request) and store the result"""
+        params = {
+            "action": "query", "format": "json", "formatversion": 2, "redirects": 1,
+            # The top search result, as wikipedia.page() picks it
+            "generator": "search", "gsrsearch": query, "gsrlimit": 1,
+            "prop": "extracts|info|pageprops|links",
+            "exintro": 1, "explaintext": 1, "exsentences": SUMMARY_SENTENCES,
+            "inprop": "url", "ppprop": "disambiguation",
+            "plnamespace": 0, "pllimit": DISAMBIGUATION_OPTIONS,
+        }
+        status, data = self.http.get_json("wikipedia", self.url, params=params)
+        if status != 200 or not data or "error" in data:
+            raise ServiceUnavailable("wikipedia", f"wikipedia returned {status}")
+            
+        result = data.get("query") or {}
+        pages = [page for page in result.get("pages", []) if not page.get("missing")]
+        if not pages:
+            return None
+        page = pages[0]
+        disambiguation = "disambiguation" in (page.get("pageprops") or {})
+        page = WikiPage(page["title"], None if disambiguation else (page.get("extract") or "").strip(),
+                        page.get("fullurl") or f"https://en.wikipedia.org/wiki/{page['title'].replace(' ', '_')}",
+                        disambiguation, [link["title"] for link in page.get("links", [])] if disambiguation else [],
+                        time.time(), "miss")
+        
+        # The query, the title and every title redirected to it lead here
+        aliases = {query, page.title}
+        aliases.update(redirect["from"] for redirect in result.get("redirects", []))
+        aliases.update(entry["from"] for entry in result.get("normalized", []))
+        self.store(page, aliases)
+        return page
+    
+    def store(self, page, aliases=()):
+        """Store a page and the aliases that lead to it"""
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO pages (title, summary, url, disambiguation, options, fetched_at) "
+                       "VALUES (?, ?, ?, ?, ?, ?)",
+                       (page.title, page.summary, page.url, int(page.disambiguation), json.dumps(page.options),
+                        page.fetched_at))
+            db.executemany("INSERT OR REPLACE INTO aliases (alias, title) VALUES (?, ?)",
+                           [(normalize_key(alias), page.title) for alias in aliases if normalize_key(alias)])
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
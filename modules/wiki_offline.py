@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# Wiki Offline Module - Full-text index of a Wikipedia abstracts dump, for answers without a network
+#
+# Build the index from a dump (https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz):
+#
+#   python -m modules.wiki_offline enwiki-latest-abstract.xml.gz
+
+import os
+import re
+import bz2
+import gzip
+import time
+import sqlite3
+import argparse
+import threading
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+from modules.response_cache import normalize_key
+from modules.wiki_lookup import WikiPage
+
+WIKI_INDEX_FILE = os.path.join("assets", "data", "wiki_index.db")
+
+# Articles inserted per transaction while importing
+IMPORT_BATCH = 5000
+
+# A word in an article's title counts this many times as much as one in its abstract
+TITLE_WEIGHT = 10.0
+
+# Best matches compared against the question for an exact title
+CANDIDATES = 10
+
+# The abstract dump titles every article "Wikipedia: <title>"
+_TITLE_PREFIX = "Wikipedia: "
+
+# Abstracts that are no answer: disambiguation lists and leftover template markup
+_NOT_AN_ANSWER = re.compile(r"(may|commonly|usually|also|can)? ?refers? to:?$|^[|{!]", re.I)
+
+_WORD = re.compile(r"\w+")
+
+# Words of a question that say nothing about what is asked for
+_QUESTION_WORDS = frozenset(
+    "a an the is was are were who what whats where when which tell me about search for on of please "
+    "look up find".split())
+
+# Only single words (quoted) are matched, so where each word appears in a
+# column need not be stored (detail=column): a tenth smaller, ranked the same
+_SCHEMA = """
+CREATE VIRTUAL TABLE abstracts USING fts5(
+    title, abstract, url UNINDEXED,
+    tokenize = 'porter unicode61 remove_diacritics 2', detail = column
+);
+"""
+
+def read_abstracts(source):
+    """Yield (title, abstract, url) for each article in an abstracts dump (.xml, .xml.gz or .xml.bz2)
+    
+    The dump is parsed as a stream: each <doc> is dropped from the tree once
+    read, so memory use stays flat however large the dump is.
+    """
+    opener = gzip.open if source.endswith(".gz") else bz2.open if source.endswith(".bz2") else open
+    with opener(source, "rb") as f:
+        events = iterparse(f, events=("start", "end"))
+        _, feed = next(events)
+        for event, element in events:
+            if event != "end" or element.tag != "doc":
+                continue
+            title = (element.findtext("title") or "").strip()
+            if title.startswith(_TITLE_PREFIX):
+                title = title[len(_TITLE_PREFIX):]
+            abstract = " ".join((element.findtext("abstract") or "").split())
+            url = (element.findtext("url") or "").strip()
+            feed.clear()
+            if title and abstract and not _NOT_AN_ANSWER.search(abstract):
+                yield title, abstract, url
+
+def build_index(source, path=WIKI_INDEX_FILE, batch=IMPORT_BATCH, progress=None):
+    """Index an abstracts dump into a new SQLite FTS5 database at path; returns the articles indexed
+    
+    The index is built next to path and moved into place when complete, so
+    an existing index keeps answering until then. progress, if given, is
+    called with the running count after each batch.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    building = path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+        
+    db = sqlite3.connect(building, isolation_level=None)
+    try:
+        # A half-built index is thrown away, so nothing needs journaling or syncing
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.executescript(_SCHEMA)
+        
+        # Insert in batches, one transaction each, straight from the parser
+        articles = read_abstracts(source)
+        count = 0
+        while True:
+            rows = list(islice(articles, batch))
+            if not rows:
+                break
+            db.execute("BEGIN")
+            db.executemany("INSERT INTO abstracts (title, abstract, url) VALUES (?, ?, ?)", rows)
+            db.execute("COMMIT")
+            count += len(rows)
+            if progress:
+                progress(count)
+        
+        # Merge the per-batch segments into one b-tree and drop the free pages
+        db.execute("INSERT INTO abstracts (abstracts) VALUES ('optimize')")
+        db.execute("VACUUM")
+    finally:
+        db.close()
+    os.replace(building, path)
+    return count
+
+def query_words(query):
+    """The words of a question worth searching for"""
+    words = [word for word in _WORD.findall(query.lower()) if word not in _QUESTION_WORDS]
+    return words or _WORD.findall(query.lower())
+
+class OfflineWiki:
+    """Answers from a local full-text index of Wikipedia abstracts
+    
+    Articles are ranked with BM25 (FTS5's bm25()), a word in the title
+    weighing TITLE_WEIGHT times one in the abstract. Every word of the
+    question must match; if no article has them all, any may. Among the best
+    CANDIDATES, an article titled exactly as asked comes first.
+    """
+    
+    def __init__(self, path=WIKI_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    
+    def search(self, query, limit=1):
+        """Return up to limit WikiPages (state "offline") for a query, best first"""
+        words = query_words(query)
+        if not words:
+            return []
+        terms = ['"' + word.replace('"', '""') + '"' for word in words]
+        rows = []
+        with self._lock:
+            for match in (" ".join(terms), " OR ".join(terms)):
+                rows = self._db.execute(
+                    "SELECT title, abstract, url FROM abstracts WHERE abstracts MATCH ? "
+                    "ORDER BY bm25(abstracts, ?, 1.0) LIMIT ?",
+                    (match, TITLE_WEIGHT, max(limit, CANDIDATES))).fetchall()
+                if rows or len(terms) == 1:
+                    break
+        
+        # The article named exactly as asked for beats a better-scored mention
+        asked = normalize_key(query)
+        rows.sort(key=lambda row: normalize_key(row[0]) not in (asked, " ".join(words)))
+        return [WikiPage(title, abstract, url, False, [], None, "offline") for title, abstract, url in rows[:limit]]
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline Wikipedia index from an abstracts dump")
+    parser.add_argument("dump", help="enwiki-latest-abstract.xml (.gz or .bz2 read as is)")
+    parser.add_argument("--index", default=WIKI_INDEX_FILE, help=f"index to write (default {WIKI_INDEX_FILE})")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    count = build_index(args.dump, args.index, progress=lambda count: print(f"\r{count} articles", end="", flush=True))
+    print(f"\r{count} articles indexed in {time.perf_counter() - start:.0f} s, "
+          f"{os.path.getsize(args.index) / 2 ** 20:.1f} MB at {args.index}")
+
+if __name__ == "__main__":
+    main()